@@ -1,72 +1,149 @@
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from mysql import connector
+from mysql.connector import errorcode, pooling
+from mysql.connector.errors import PoolError
+from InsertData.migrations import apply_migrations
+
+DATABASE_NAME = "MY_CUSTOM_BOT"
+
+# Connection pool settings (override in .env)
+DEFAULT_POOL_SIZE = 5       # Connections kept open per process
+DEFAULT_POOL_TIMEOUT = 10   # Seconds to wait for a free connection
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _connection_config() -> dict:
+    """Connection arguments shared by the pool and schema bootstrap"""
+    load_dotenv()
+    return {
+        "host": "localhost",
+        "user": "root",
+        "password": os.getenv("DB_PASSWORD"),
+        "charset": "utf8mb4"
+    }
+
+def create_schema(database_name: str = DATABASE_NAME, migrate: bool = True):
+    """
+    Create the database and tables, then apply pending migrations.
+    This is a once-per-deployment step:
+
+        python -m InsertData.DataBase
+    """
+    database = connector.connect(**_connection_config())
+    try:
+        cursor = database.cursor()
+        cursor.execute(
+            f"CREATE DATABASE IF NOT EXISTS {database_name} CHARACTER SET utf8mb4")
+        cursor.execute(f"USE {database_name}")
+
+        # Create necessary tables with updated schema
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS SearchQuery (
+                SearchQueryID INT AUTO_INCREMENT PRIMARY KEY,
+                Query VARCHAR(1000),
+                TotalUrls INT, 
+                UniqueUrls INT,
+                Count_Dups INT,
+                Count_Ads INT,
+                TimeStamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_urls (
+                UrlID INT AUTO_INCREMENT PRIMARY KEY,
+                SearchQueryID INT,
+                SearchEngine VARCHAR(50),
+                Url VARCHAR(1000),
+                Type ENUM('HTML', 'IMAGE') NOT NULL,
+                Domain VARCHAR(255),
+                Title VARCHAR(500),
+                Description Text,
+                IsScrappable BOOLEAN DEFAULT FALSE,
+                TimeStamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY (SearchQueryID, Url(255)),
+                FOREIGN KEY (SearchQueryID) REFERENCES SearchQuery(SearchQueryID) ON DELETE CASCADE
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS KeyWords (
+                KeyWordID INT AUTO_INCREMENT PRIMARY KEY,
+                UrlID INT,
+                KeyWordInSearchQuery VARCHAR(255),
+                Occurrence INT,
+                ContentType ENUM('TEXT', 'IMAGE') DEFAULT 'TEXT',
+                FOREIGN KEY (UrlID) REFERENCES search_urls(UrlID) ON DELETE CASCADE,
+                UNIQUE KEY unique_keyword_url (UrlID, KeyWordInSearchQuery(255))
+            )
+        """)
+        database.commit()
+        cursor.close()
+        if migrate:
+            apply_migrations(database)
+        print("Database initialized with updated schema.")
+    finally:
+        database.close()
+
+def get_pool() -> pooling.MySQLConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = _connection_config()
+                pool_size = int(os.getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE))
+                try:
+                    _pool = pooling.MySQLConnectionPool(
+                        pool_name="my_custom_bot",
+                        pool_size=pool_size,
+                        pool_reset_session=True,
+                        database=DATABASE_NAME,
+                        **config
+                    )
+                except connector.Error as e:
+                    if e.errno == errorcode.ER_BAD_DB_ERROR:
+                        print(f"Database {DATABASE_NAME} not found. Run 'python -m InsertData.DataBase' first.")
+                    raise
+                print(f"Connected to MySQL with a pool of {pool_size} connections.")
+    return _pool
+
+def _borrow_connection():
+    """Take a connection from the pool, waiting while all are in use, and make sure it is alive"""
+    pool = get_pool()
+    timeout = float(os.getenv("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT))
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = pool.get_connection()
+            break
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+    # Health check: reconnect if the server dropped an idle connection
+    try:
+        connection.ping(reconnect=True, attempts=3, delay=1)
+    except connector.Error:
+        connection.close()
+        raise
+    return connection
 
 class MY_CUSTOM_BOT:
     def __init__(self):
-        load_dotenv()
-        db_password = os.getenv("DB_PASSWORD")
-
         self.database = None
         self.cursor = None
 
         try:
-            # Establish a persistent database connection
-            self.database = connector.connect(
-                host="localhost",
-                user="root",
-                password=db_password,
-                charset="utf8mb4"
-            )
+            # Borrow a pooled connection; close() hands it back
+            self.database = _borrow_connection()
             self.cursor = self.database.cursor()
 
-            self.cursor.execute(
-                "CREATE DATABASE IF NOT EXISTS MY_CUSTOM_BOT CHARACTER SET utf8mb4")
-            self.cursor.execute("USE MY_CUSTOM_BOT")
-
-            # Create necessary tables with updated schema
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS SearchQuery (
-                    SearchQueryID INT AUTO_INCREMENT PRIMARY KEY,
-                    Query VARCHAR(1000),
-                    TotalUrls INT, 
-                    UniqueUrls INT,
-                    Count_Dups INT,
-                    Count_Ads INT,
-                    TimeStamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS search_urls (
-                    UrlID INT AUTO_INCREMENT PRIMARY KEY,
-                    SearchQueryID INT,
-                    SearchEngine VARCHAR(50),
-                    Url VARCHAR(1000),
-                    Type ENUM('HTML', 'IMAGE') NOT NULL,
-                    Domain VARCHAR(255),
-                    Title VARCHAR(500),
-                    Description Text,
-                    IsScrappable BOOLEAN DEFAULT FALSE,
-                    TimeStamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE KEY (SearchQueryID, Url(255)),
-                    FOREIGN KEY (SearchQueryID) REFERENCES SearchQuery(SearchQueryID) ON DELETE CASCADE
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS KeyWords (
-                    KeyWordID INT AUTO_INCREMENT PRIMARY KEY,
-                    UrlID INT,
-                    KeyWordInSearchQuery VARCHAR(255),
-                    Occurrence INT,
-                    ContentType ENUM('TEXT', 'IMAGE') DEFAULT 'TEXT',
-                    FOREIGN KEY (UrlID) REFERENCES search_urls(UrlID) ON DELETE CASCADE,
-                    UNIQUE KEY unique_keyword_url (UrlID, KeyWordInSearchQuery(255))
-                )
-            """)
-            print("Connected to MySQL and database initialized with updated schema.")
-
         except connector.Error as e:
             print(f"Database connection error: {e}")
             self.close()
@@ -100,6 +177,15 @@ class MY_CUSTOM_BOT:
             print(f"Query execution error: {e}")
             raise
 
+    def insert_many(self, sql_prefix, rows, sql_suffix="", auto_commit=True):
+        """Insert many rows with a single multi-row INSERT ... VALUES (...), (...) statement.
+        The statement is atomic: on error no row of the batch is written."""
+        if not rows:
+            return
+        row_placeholder = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        sql_query = f"{sql_prefix} VALUES {', '.join([row_placeholder] * len(rows))} {sql_suffix}"
+        self.query(sql_query, [value for row in rows for value in row], auto_commit=auto_commit)
+
     def begin_transaction(self):
         """Start a transaction"""
         self.database.start_transaction()
@@ -113,11 +199,15 @@ class MY_CUSTOM_BOT:
         self.database.rollback()
 
     def close(self):
-        """Close the database connection."""
+        """Return the connection to the pool, discarding any uncommitted work."""
         if self.cursor:
             self.cursor.close()
             self.cursor = None
-        if self.database and self.database.is_connected():
+        if self.database:
+            if self.database.is_connected() and self.database.in_transaction:
+                self.database.rollback()
             self.database.close()
             self.database = None
-            print("Database connection closed.")
\ No newline at end of file
+
+if __name__ == "__main__":
+    create_schema()
\ No newline at end of file
@@ -1,25 +1,28 @@
-import json
 from collections import defaultdict
 import os
+from urllib.parse import urlsplit
+from InsertData.url_canonical import canonical_url, clean_url, preferred_url
+from WebScraping.results import SearchResults
 
-def consolidate_search_results():
-    """Consolidates search results from multiple search engine JSON files,
-    preserving URLs, their sources, one title, one description, and statistics. Removes duplicates"""
+def consolidate_search_results(results=None):
+    """Consolidates search results from multiple search engines,
+    preserving URLs, their sources, one title, one description, and statistics. Removes duplicates,
+    counting URLs as the same page when their canonical_url matches (scheme, www., trailing slash,
+    fragment, tracking parameters, redirect wrappers and OCR debris aside)
     
-    folder_path = os.path.join("WebScraping", "URL_JSON")
-    
-    # Get all JSON files in the folder
-    search_engine_files = [
-        os.path.join(folder_path, f)
-        for f in os.listdir(folder_path)
-        if f.endswith("_results.json")
-    ]
+    Args:
+        results: SearchResults accumulated by scrape_web; without it the
+            {engine}_results.json files in WebScraping/URL_JSON are read instead
+    """
+    if results is None:
+        results = SearchResults.load(os.path.join("WebScraping", "URL_JSON"))
 
     url_info = defaultdict(lambda: {
+        "url": None,         # Cleaned URL to fetch and store (see preferred_url)
+        "variants": set(),   # Distinct URL strings the engines reported for this page
         "search_engines": [],
         "title": None,        # Store only one title
         "description": None, # Store only one description
-        "domain": None,      # Store only one domain
         "count": 0
     })
     
@@ -28,64 +31,56 @@ def consolidate_search_results():
         "total_original_urls": 0,
         "total_unique_urls": 0,
         "total_occurrences": 0,
+        "total_collapsed_urls": 0,  # URL strings merged into another's canonical URL (fetches saved)
         "files_processed": []
     }
 
-    for engine_file in search_engine_files:
-        try:
-            with open(engine_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Update statistics
-                total_stats["total_ads_removed"] += data.get("statistics", {}).get("ad_urls_removed", 0)
-                total_stats["total_original_urls"] += data.get("statistics", {}).get("total_urls_found", 0)
-                total_stats["files_processed"].append(os.path.basename(engine_file))
+    for engine_results in results.snapshot():
+        engine_name = engine_results.engine
+        
+        # Update statistics
+        total_stats["total_ads_removed"] += engine_results.ad_urls_removed
+        total_stats["total_original_urls"] += engine_results.total_urls_found
+        total_stats["files_processed"].append(f"{engine_name}_results.json")
+        
+        # Process each search result
+        for result in engine_results.results:
+            url = clean_url(result.url)
+            info = url_info[canonical_url(url)]
+            info["url"] = preferred_url(info["url"], url)
+            info["variants"].add(result.url)
+            
+            # Add engine to sources if not already present
+            if engine_name not in info["search_engines"]:
+                info["search_engines"].append(engine_name)
+            
+            # Store only the first title and description encountered
+            if info["title"] is None:
+                info["title"] = result.title
+            if info["description"] is None:
+                info["description"] = result.description
                 
-                # Process each search result
-                for result in data.get("results", []):
-                    if url := result.get("url", ""):
-                        engine_name = os.path.basename(engine_file).replace("_results.json", "")
-                        
-                        # Add engine to sources if not already present
-                        if engine_name not in url_info[url]["search_engines"]:
-                            url_info[url]["search_engines"].append(engine_name)
-                        
-                        # Store only the first title encountered
-                        if url_info[url]["title"] is None:
-                            url_info[url]["title"] = result.get("title")
-                        
-                        # Store only the first description encountered
-                        if url_info[url]["description"] is None:
-                            url_info[url]["description"] = result.get("description")
-                            
-                        # Store only the first domain encountered
-                        if url_info[url]["domain"] is None:
-                            url_info[url]["domain"] = result.get("domain")
-                            
-                        url_info[url]["count"] += 1
-                        
-        except FileNotFoundError:
-            print(f"Warning: File {engine_file} not found. Skipping.")
-        except json.JSONDecodeError:
-            print(f"Warning: Could not parse {engine_file}. Skipping.")
-        except Exception as e:
-            print(f"Warning: Error processing {engine_file}: {str(e)}. Skipping.")
+            info["count"] += 1
 
     # Prepare the final output with single title and description
     unique_urls = [
         {
-            "url": url,
+            "url": info["url"],
             "title": info["title"],            # Single title
-            "domain": info["domain"],          # Single domain
+            "domain": urlsplit(info["url"]).netloc,  # Domain of the URL kept, not of a redirect wrapper
             "source_search_engines": info["search_engines"],
             "description": info["description"], # Single description
             "duplicate_count": info["count"]
         }
-        for url, info in url_info.items()
+        for info in url_info.values()
     ]
 
     total_stats["total_unique_urls"] = len(unique_urls)
     total_stats["total_occurrences"] = sum(info["count"] for info in url_info.values())
+    total_stats["total_collapsed_urls"] = sum(len(info["variants"]) - 1 for info in url_info.values())
+    if total_stats["total_collapsed_urls"]:
+        print(f"Canonical URLs: {total_stats['total_collapsed_urls']} URL variants collapsed into "
+              f"{len(unique_urls)} pages ({total_stats['total_collapsed_urls']} fetches saved)")
 
     return {
         "unique_urls": unique_urls,
@@ -0,0 +1,38 @@
+from typing import List, Set
+from InsertData.DataBase import MY_CUSTOM_BOT
+
+# URLs scored within this many days count as fresh coverage for a query
+COVERAGE_MAX_AGE_DAYS = 7
+
+def fresh_scored_urls(keywords: List[str], max_age_days: int = COVERAGE_MAX_AGE_DAYS) -> Set[str]:
+    """
+    URLs scored within max_age_days on which every one of the keywords occurs.
+
+    Args:
+        keywords: Normalized keywords from extract_keywords
+        max_age_days: Oldest KeyWords.ScoredAt still considered fresh
+
+    Returns:
+        Set of URLs (empty if there are no keywords)
+    """
+    keywords = list(dict.fromkeys(keywords))
+    if not keywords:
+        return set()
+
+    bot_db = MY_CUSTOM_BOT()
+    try:
+        rows = bot_db.query(
+            f"""SELECT su.Url
+                FROM KeyWords kw
+                JOIN search_urls su ON su.UrlID = kw.UrlID
+                WHERE kw.KeyWordInSearchQuery IN ({', '.join(['%s'] * len(keywords))})
+                  AND kw.Occurrence > 0
+                  AND kw.ScoredAt >= NOW() - INTERVAL %s DAY
+                GROUP BY su.UrlID, su.Url
+                HAVING COUNT(DISTINCT kw.KeyWordInSearchQuery) = %s""",
+            tuple(keywords) + (max_age_days, len(keywords)),
+            fetch=True
+        ) or []
+        return {row[0] for row in rows}
+    finally:
+        bot_db.close()
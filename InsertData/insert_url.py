@@ -1,16 +1,19 @@
 from InsertData.DataBase import MY_CUSTOM_BOT
-import requests
-from urllib.parse import urlparse, urljoin
-from re import search
+from InsertData.nlp_models import get_nlp
+from InsertData.robots_cache import get_robots_cache
+from InsertData.page_fetch import PageFetcher
+from InsertData.result_cache import get_result_cache
+from InsertData.inverted_index import mark_keywords_changed
+from InsertData.url_canonical import canonical_hash, canonical_url
+from urllib.parse import urlparse
 import validators
-import spacy
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from typing import Callable, Dict, Iterable, List, Optional
 from PIL import Image, ImageEnhance
 from io import BytesIO
 import pytesseract
 import sys
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Image extensions (must appear at end of URL path)
 IMAGE_EXTENSIONS = {
@@ -18,6 +21,11 @@ IMAGE_EXTENSIONS = {
     '.webp', '.ico', '.jfif', '.pjpeg', '.pjp', '.avif'
 }
 
+# Threads fetching and counting pages in insert_search_results (1 = serial)
+INSERT_WORKERS = 1
+# URLs / KeyWords rows per multi-row statement in insert_search_results (0 = row at a time)
+INSERT_BATCH_SIZE = 0
+
 # Comprehensive list of filler words to ignore in keyword extraction
 FILLER_WORDS = {
     'a', 'an', 'the', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'at', 'for',
@@ -71,17 +79,16 @@ def preprocess_image(image: Image.Image) -> Image.Image:
     enhancer = ImageEnhance.Sharpness(image)
     return enhancer.enhance(2.0)
 
-def extract_text_from_image_url(image_url: str) -> Optional[str]:
+def extract_text_from_image_url(image_url: str, fetcher: Optional[PageFetcher] = None) -> Optional[str]:
     """Extract text from image URLs ending with image extensions"""
     if not is_image_url(image_url):
         return None
         
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(image_url, headers=headers, timeout=15)
-        response.raise_for_status()
+        page = (fetcher or PageFetcher()).get(image_url, timeout=15, kind="image")
+        page.raise_for_status()
         
-        img = Image.open(BytesIO(response.content))
+        img = Image.open(BytesIO(page.content))
         img = preprocess_image(img)
         text = pytesseract.image_to_string(img, config='--oem 3 --psm 6')
         return text.strip() if text.strip() else None
@@ -97,25 +104,18 @@ def get_text_frequencies(text: str, word_list: List[str]) -> Dict[str, int]:
     text_lower = text.lower()
     return {word.lower(): text_lower.count(word.lower()) for word in word_list}
 
-def get_html_frequencies(url: str, word_list: List[str]) -> Dict[str, int]:
+def get_html_frequencies(url: str, word_list: List[str], fetcher: Optional[PageFetcher] = None) -> Dict[str, int]:
     """Extract word frequencies from HTML pages"""
     try:
         result = {word.lower(): 0 for word in word_list}
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
+        page = (fetcher or PageFetcher()).get(url)
         
-        if response.status_code == 404:
+        if page.status_code == 404:
             return {"error": "404 Not Found"}
             
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        for element in soup(['script', 'style', 'nav', 'footer', 'header', 'iframe']):
-            element.decompose()
+        page.raise_for_status()
         
-        text = soup.get_text(separator=' ', strip=True).lower()
-        nlp = spacy.load("en_core_web_sm")
-        doc = nlp(text)
+        doc = get_nlp("page")(page.text)
         
         for token in doc:
             if token.is_alpha and not token.is_stop:
@@ -140,7 +140,7 @@ def extract_keywords(query: str, top_n: int = 10, split_phrases: bool = True) ->
     if not query.strip():
         return []
 
-    nlp = spacy.load("en_core_web_sm")
+    nlp = get_nlp("query")
     doc = nlp(query.lower())
     
     # Parts of speech to consider
@@ -211,44 +211,413 @@ def extract_keywords(query: str, top_n: int = 10, split_phrases: bool = True) ->
     return final_keywords
 
 def can_scrape(url: str, user_agent: str = "*") -> bool:
-    """Check robots.txt for scraping permissions"""
+    """Check robots.txt for scraping permissions (parsed rules are cached per host)"""
     if not validators.url(url):
         return False
-    parsed = urlparse(url)
-    robots_url = urljoin(f"{parsed.scheme}://{parsed.netloc}", "/robots.txt")
-    try:
-        response = requests.get(robots_url, timeout=10)
-        if response.status_code != 200:
-            return True
-        current_agent = None
-        for line in response.text.splitlines():
-            line = line.strip().lower()
-            if line.startswith("user-agent:"):
-                current_agent = line.split(":")[1].strip()
-                if current_agent not in ["*", user_agent.lower()]:
-                    current_agent = None
-            if current_agent and line.startswith("disallow:"):
-                path = line.split(":")[1].strip()
-                if path and search(path, parsed.path):
-                    return False
-    except Exception:
-        return True
-    return True
+    return get_robots_cache().allowed(url, user_agent)
 
-def get_page_title(url: str) -> str:
+def get_page_title(url: str, fetcher: Optional[PageFetcher] = None) -> str:
     """Fetch HTML page title with fallback to domain"""
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title = soup.title.string.strip() if soup.title else ""
+        page = (fetcher or PageFetcher()).get(url)
+        page.raise_for_status()
+        title = page.title
         return title[:500] if title else urlparse(url).netloc
     except Exception:
         return urlparse(url).netloc
 
-def insert_search_results(json_data: Dict, query: str) -> List[str]:
-    """Insert search results with robust error handling and schema compatibility"""
+def fetch_url_keywords(url: str, url_type: str, title: str, key_words: List[str], is_new_url: bool,
+                       fetcher: Optional[PageFetcher] = None) -> Dict:
+    """
+    Network stage for one URL: robots check, page title and keyword counts.
+    Touches no database state, so it is safe to run in worker threads.
+    Title and keyword counting share one download through the run's PageFetcher.
+
+    Returns:
+        Dictionary with is_scrappable, title, keyword_data and not_found
+    """
+    is_scrappable = can_scrape(url)
+    keyword_data = {}
+    not_found = False
+
+    if is_scrappable:
+        try:
+            # Only fetch HTML title for new URLs we don't have one for from JSON
+            if is_new_url and url_type == 'HTML' and not title:
+                title = get_page_title(url, fetcher)[:500]
+
+            # Get keyword frequencies based on content type
+            if url_type == 'HTML':
+                freq_result = get_html_frequencies(url, word_list=key_words, fetcher=fetcher)
+                if isinstance(freq_result, dict) and not freq_result.get('error'):
+                    keyword_data = freq_result
+                elif is_new_url and freq_result.get('error') == "404 Not Found":
+                    not_found = True
+            else:  # IMAGE processing
+                extracted_text = extract_text_from_image_url(url, fetcher)
+                if extracted_text:
+                    keyword_data = get_text_frequencies(extracted_text, key_words)
+        except Exception as e:
+            if is_new_url:
+                print(f"\nError processing {url}: {str(e)}")
+                is_scrappable = False
+            else:
+                print(f"\nError processing keywords for existing URL {url}: {str(e)}")
+
+    if fetcher:
+        fetcher.release(url)
+
+    return {
+        "is_scrappable": is_scrappable,
+        "title": title,
+        "keyword_data": keyword_data,
+        "not_found": not_found
+    }
+
+def _plan_url(url_data: Dict) -> Optional[Dict]:
+    """Validate one consolidated URL entry; returns None for malformed entries"""
+    # Validate URL data structure
+    if not isinstance(url_data, dict) or "url" not in url_data:
+        return None
+
+    url = url_data["url"]
+    if not url or not isinstance(url, str):
+        return None
+
+    # Handle search engines with proper validation
+    search_engines = url_data.get("source_search_engines", [])
+    search_engine = search_engines[0] if search_engines else "unknown"
+
+    return {
+        "url_data": url_data,
+        "url": url,
+        "title": url_data.get("title", ""),  # Priority: JSON data > HTML title > domain
+        "url_type": 'IMAGE' if is_image_url(url) else 'HTML',
+        "search_engine": search_engine[:50],
+        "existing": None  # (UrlID, SearchEngine) once looked up, if the URL is already stored
+    }
+
+def _lookup_url(bot_db: MY_CUSTOM_BOT, url: str) -> Optional[tuple]:
+    """Check for existing URL (using URL only, not SearchQueryID); any stored variant
+    with the same canonical URL counts"""
+    existing_url = bot_db.query(
+        """SELECT UrlID, SearchEngine FROM search_urls 
+           WHERE CanonicalHash = %s
+           ORDER BY UrlID LIMIT 1""",
+        (canonical_hash(url),),
+        fetch=True
+    )
+    return existing_url[0] if existing_url and existing_url[0] else None
+
+def _lookup_urls(bot_db: MY_CUSTOM_BOT, urls: List[str]) -> Dict[str, tuple]:
+    """Resolve many URLs against search_urls (by canonical URL) in one round trip"""
+    if not urls:
+        return {}
+    hashes = {url: canonical_hash(url) for url in urls}
+    unique_hashes = list(set(hashes.values()))
+    rows = bot_db.query(
+        f"""SELECT CanonicalHash, UrlID, SearchEngine FROM search_urls
+            WHERE CanonicalHash IN ({', '.join(['%s'] * len(unique_hashes))})
+            ORDER BY UrlID""",
+        tuple(unique_hashes),
+        fetch=True
+    ) or []
+
+    # Keep the lowest UrlID per canonical URL like the single lookup
+    by_hash = {}
+    for row_hash, url_id, engine in rows:
+        by_hash.setdefault(bytes(row_hash), (url_id, engine))
+    return {url: by_hash[url_hash] for url, url_hash in hashes.items() if url_hash in by_hash}
+
+def _save_robots_cache():
+    """Persist the robots cache; a failed write only costs re-fetching robots.txt next run"""
+    try:
+        get_robots_cache().save()
+    except Exception as e:
+        print(f"\nError saving robots cache: {str(e)}")
+
+def _keyword_rows(url_id: int, url_type: str, keyword_data: Dict[str, int], key_words: List[str]) -> List[tuple]:
+    """KeyWords rows for one URL, with 0 counts for keywords that were not found"""
+    # Initialize with 0 counts for all keywords if no data was collected
+    if not keyword_data:
+        keyword_data = {kw: 0 for kw in key_words}
+
+    # Ensure all keywords are present in the data (even with 0 counts)
+    for kw in key_words:
+        if kw not in keyword_data:
+            keyword_data[kw] = 0
+
+    content_type = 'IMAGE' if url_type == 'IMAGE' else 'TEXT'
+    return [(url_id, keyword[:255], freq, content_type) for keyword, freq in keyword_data.items()]
+
+KEYWORD_INSERT = """INSERT INTO KeyWords 
+                    (UrlID, KeyWordInSearchQuery, Occurrence, ContentType)"""
+KEYWORD_UPSERT = """ON DUPLICATE KEY UPDATE 
+                    Occurrence = VALUES(Occurrence),
+                    ContentType = VALUES(ContentType),
+                    ScoredAt = CURRENT_TIMESTAMP"""
+URL_INSERT = """INSERT INTO search_urls 
+                (SearchQueryID, SearchEngine, Url, Type, Domain, Title, Description, IsScrappable, CanonicalHash)"""
+
+def _write_batch(bot_db: MY_CUSTOM_BOT, search_query_id: int, items: List[tuple],
+                 key_words: List[str], batch_size: int, counts: Dict, not_found_urls: List[str]):
+    """
+    Batched writer for one chunk of (plan, fetched) pairs: one multi-row INSERT for new
+    search_urls rows, one lookup of their UrlIDs and multi-row KeyWords upserts.
+    A failing batch statement writes nothing, so it is retried row by row to keep
+    the same error accounting as the row-at-a-time path.
+    """
+    new_rows = []      # search_urls rows to insert, in input order
+    keyword_jobs = []  # (UrlID or index into new_rows, is_new, url, url_type, keyword_data)
+
+    for plan, fetched in items:
+        url = plan["url"]
+        url_type = plan["url_type"]
+        try:
+            if plan["existing"]:
+                counts["duplicates"] += 1
+                url_id, existing_engine = plan["existing"]
+
+                # Update search engine if missing
+                if not existing_engine:
+                    bot_db.query(
+                        "UPDATE search_urls SET SearchEngine = %s WHERE UrlID = %s",
+                        (plan["search_engine"], url_id),
+                        auto_commit=False
+                    )
+                keyword_jobs.append((url_id, False, url, url_type, fetched["keyword_data"]))
+            else:
+                if fetched["not_found"]:
+                    not_found_urls.append(url)
+                new_rows.append((search_query_id, plan["search_engine"], url, url_type,
+                                 urlparse(url).netloc[:255],
+                                 fetched["title"], plan["url_data"].get("description", "")[:500],
+                                 fetched["is_scrappable"], canonical_hash(url)))
+                keyword_jobs.append((len(new_rows) - 1, True, url, url_type, fetched["keyword_data"]))
+        except Exception as e:
+            counts["errors"] += 1
+            print(f"\nError processing URL {url}: {str(e)}")
+
+    # Insert new URLs, then read their ids back (this SearchQueryID belongs to our transaction)
+    new_ids = [None] * len(new_rows)
+    if new_rows:
+        try:
+            bot_db.insert_many(URL_INSERT, new_rows, auto_commit=False)
+            batch_inserted = True
+        except Exception:
+            batch_inserted = False
+
+        if batch_inserted:
+            new_ids = [row[0] for row in bot_db.query(
+                """SELECT UrlID FROM search_urls
+                   WHERE SearchQueryID = %s AND UrlID > %s ORDER BY UrlID""",
+                (search_query_id, counts["last_url_id"]),
+                fetch=True
+            )]
+            if len(new_ids) != len(new_rows):
+                raise ValueError("Inserted search_urls rows do not match the batch")
+        else:
+            for k, row in enumerate(new_rows):
+                try:
+                    bot_db.insert_many(URL_INSERT, [row], auto_commit=False)
+                    new_ids[k] = bot_db.cursor.lastrowid
+                except Exception as e:
+                    counts["errors"] += 1
+                    print(f"\nError processing URL {row[2]}: {str(e)}")
+        inserted = [url_id for url_id in new_ids if url_id]
+        counts["inserted"] += len(inserted)
+        if inserted:
+            counts["last_url_id"] = max(counts["last_url_id"], max(inserted))
+
+    # Upsert keyword counts for both new and existing URLs
+    keyword_rows = []
+    for ref, is_new, url, url_type, keyword_data in keyword_jobs:
+        url_id = new_ids[ref] if is_new else ref
+        if url_id and key_words:
+            keyword_rows.extend((row, url) for row in _keyword_rows(url_id, url_type, keyword_data, key_words))
+
+    for start in range(0, len(keyword_rows), batch_size):
+        chunk = keyword_rows[start:start + batch_size]
+        try:
+            bot_db.insert_many(KEYWORD_INSERT, [row for row, _ in chunk], KEYWORD_UPSERT, auto_commit=False)
+        except Exception:
+            for row, url in chunk:
+                try:
+                    bot_db.insert_many(KEYWORD_INSERT, [row], KEYWORD_UPSERT, auto_commit=False)
+                except Exception as e:
+                    print(f"\nError inserting keyword '{row[1]}' for URL {url}: {str(e)}")
+                    counts["errors"] += 1
+
+def _process_urls(bot_db: MY_CUSTOM_BOT, search_query_id: int, unique_urls: List[Dict],
+                  key_words: List[str], fetcher: PageFetcher, pool: Optional[ThreadPoolExecutor],
+                  batch_size: int, counts: Dict[str, int], not_found_urls: List[str],
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  on_written: Optional[Callable[[], None]] = None):
+    """
+    Plan, fetch and write one list of consolidated URL entries under search_query_id.
+    Adds to counts and not_found_urls in place; the caller owns the transaction.
+
+    on_written, if given, is called after each URL (row mode) or each batch is written.
+    """
+    start_time = datetime.now()
+    total_urls = len(unique_urls)
+
+    # Resolve every URL against the DB up front so workers know new vs existing
+    plans = []
+    for url_data in unique_urls:
+        plan = _plan_url(url_data)
+        if plan and not batch_size:
+            try:
+                plan["existing"] = _lookup_url(bot_db, plan["url"])
+            except Exception as e:
+                plan = None
+                print(f"\nError processing URL {url_data['url']}: {str(e)}")
+        if plan is None:
+            counts["errors"] += 1
+        plans.append(plan)
+
+    if batch_size:
+        valid_plans = [plan for plan in plans if plan]
+        for start in range(0, len(valid_plans), batch_size):
+            chunk = valid_plans[start:start + batch_size]
+            existing = _lookup_urls(bot_db, [plan["url"] for plan in chunk])
+            for plan in chunk:
+                plan["existing"] = existing.get(plan["url"])
+
+    # Fan the network stage out to the worker pool; serial mode runs it inline below
+    pending = []  # (plan, fetched) pairs waiting for the next batched write
+    futures = [
+        pool.submit(fetch_url_keywords, plan["url"], plan["url_type"], plan["title"],
+                    key_words, plan["existing"] is None, fetcher)
+        if pool and plan else None
+        for plan in plans
+    ]
+
+    for i, (plan, future) in enumerate(zip(plans, futures), 1):
+        if batch_size and len(pending) >= batch_size:
+            _write_batch(bot_db, search_query_id, pending, key_words, batch_size, counts, not_found_urls)
+            pending = []
+            if on_written:
+                on_written()
+
+        print_progress(i, total_urls, start_time)
+        if progress:
+            progress(i, total_urls)
+        if plan is None:
+            continue
+
+        url = plan["url"]
+        url_type = plan["url_type"]
+        try:
+            is_new_url = plan["existing"] is None
+            if future:
+                fetched = future.result()
+            else:
+                fetched = fetch_url_keywords(url, url_type, plan["title"], key_words, is_new_url, fetcher)
+
+            if batch_size:
+                pending.append((plan, fetched))
+                continue
+
+            url_id = None
+            if not is_new_url:
+                counts["duplicates"] += 1
+                url_id, existing_engine = plan["existing"]
+                
+                # Update search engine if missing
+                if not existing_engine:
+                    bot_db.query(
+                        "UPDATE search_urls SET SearchEngine = %s WHERE UrlID = %s",
+                        (plan["search_engine"], url_id),
+                        auto_commit=False
+                    )
+            else:
+                if fetched["not_found"]:
+                    not_found_urls.append(url)
+
+                # Insert URL record
+                bot_db.query(
+                    URL_INSERT + " VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    (search_query_id, plan["search_engine"], url, url_type,
+                     urlparse(url).netloc[:255],
+                     fetched["title"], plan["url_data"].get("description", "")[:500],
+                     fetched["is_scrappable"], canonical_hash(url)),
+                    auto_commit=False
+                )
+                
+                url_id = bot_db.cursor.lastrowid
+                counts["inserted"] += 1
+            
+            # Process keywords for both new and existing URLs
+            if url_id and key_words:  # Ensure we have keywords to process
+                # Insert/update all keywords (including 0 counts)
+                for row in _keyword_rows(url_id, url_type, fetched["keyword_data"], key_words):
+                    keyword = row[1]
+                    try:
+                        bot_db.query(
+                            KEYWORD_INSERT + " VALUES (%s, %s, %s, %s) " + KEYWORD_UPSERT,
+                            row,
+                            auto_commit=False
+                        )
+                    except Exception as e:
+                        print(f"\nError inserting keyword '{keyword}' for URL {url}: {str(e)}")
+                        counts["errors"] += 1
+            
+        except Exception as e:
+            counts["errors"] += 1
+            print(f"\nError processing URL {url}: {str(e)}")
+            continue
+
+        if on_written:
+            on_written()
+
+    if pending:
+        _write_batch(bot_db, search_query_id, pending, key_words, batch_size, counts, not_found_urls)
+        if on_written:
+            on_written()
+
+def _print_summary(total_urls: int, counts: Dict[str, int], not_found_urls: List[str],
+                   fetcher: PageFetcher, start_time: datetime):
+    print(f"\n\nInsertion complete. Results:")
+    print(f"- Total URLs processed: {total_urls}")
+    print(f"- New URLs inserted: {counts['inserted']}")
+    print(f"- Existing URLs processed: {counts['duplicates']}")
+    print(f"- Errors encountered: {counts['errors']}")
+    print(f"- 404 Not Found URLs: {len(not_found_urls)}")
+    fetch_stats = fetcher.stats()
+    print(f"- Page downloads: {fetch_stats['fetches']} ({fetch_stats['fetches_avoided']} avoided by reuse)")
+    print(f"- Downloaded {fetch_stats['bytes_downloaded'] / (1024 * 1024):.1f} MB "
+          f"({fetch_stats['truncated']} pages cut at the size cap, {fetch_stats['rejected']} skipped as "
+          f"non-HTML or oversized), {fetch_stats['parse_seconds']:.2f}s parsing")
+    robots_stats = get_robots_cache().stats()
+    print(f"- robots.txt cache: {robots_stats['hits']} hits, {robots_stats['misses']} misses")
+    print(f"Total processing time: {(datetime.now() - start_time).total_seconds():.1f} seconds")
+    
+    if not_found_urls:
+        print("\nURLs that returned 404:")
+        for url in not_found_urls[:10]:
+            print(f"- {url}")
+        if len(not_found_urls) > 10:
+            print(f"- ...and {len(not_found_urls) - 10} more")
+
+def _new_counts() -> Dict[str, int]:
+    return {"inserted": 0, "duplicates": 0, "errors": 0, "last_url_id": 0}
+
+def insert_search_results(json_data: Dict, query: str, workers: int = INSERT_WORKERS,
+                          batch_size: int = INSERT_BATCH_SIZE,
+                          progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+    """
+    Insert search results with robust error handling and schema compatibility.
+
+    With workers > 1, page fetching and keyword counting run in a thread pool
+    while this thread stays the single writer on the MY_CUSTOM_BOT connection.
+    Results are applied in input order, so inserts and statistics match serial mode.
+
+    With batch_size > 0, existing URLs are resolved batch_size at a time with one
+    query, and search_urls/KeyWords rows are written with multi-row inserts.
+
+    progress, if given, is called with (urls_done, total_urls) as each URL is applied.
+    """
     # Validate input data
     if not json_data or not isinstance(json_data, dict):
         print("Error: Invalid JSON data provided")
@@ -269,12 +638,11 @@ def insert_search_results(json_data: Dict, query: str) -> List[str]:
         return []  # Return early if no keywords
     
     bot_db = MY_CUSTOM_BOT()
+    fetcher = PageFetcher()
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
     not_found_urls = []
     start_time = datetime.now()
-    total_urls = len(json_data["unique_urls"])
-    inserted_count = 0
-    duplicates_count = 0
-    error_count = 0
+    counts = _new_counts()
 
     try:
         # Begin transaction
@@ -296,178 +664,125 @@ def insert_search_results(json_data: Dict, query: str) -> List[str]:
         if not search_query_id:
             raise ValueError("Failed to insert search query")
 
-        for i, url_data in enumerate(json_data["unique_urls"], 1):
-            try:
-                print_progress(i, total_urls, start_time)
-                
-                # Validate URL data structure
-                if not isinstance(url_data, dict) or "url" not in url_data:
-                    error_count += 1
-                    continue
-                
-                url = url_data["url"]
-                if not url or not isinstance(url, str):
-                    error_count += 1
-                    continue
-                
-                # Get title with priority: JSON data > HTML title > domain
-                title = url_data.get("title", "")
-                url_type = 'IMAGE' if is_image_url(url) else 'HTML'
-                
-                # Handle search engines with proper validation
-                search_engines = url_data.get("source_search_engines", [])
-                search_engine = search_engines[0] if search_engines else "unknown"
-                if len(search_engine) > 50:
-                    search_engine = search_engine[:50]
-                
-                # Check for existing URL (using URL only, not SearchQueryID)
-                existing_url = bot_db.query(
-                    """SELECT UrlID, SearchEngine FROM search_urls 
-                       WHERE Url = %s LIMIT 1""",
-                    (url,),
-                    fetch=True
-                )
-                
-                url_id = None
-                is_new_url = False
-                if existing_url and existing_url[0]:
-                    duplicates_count += 1
-                    url_id = existing_url[0][0]
-                    existing_engine = existing_url[0][1]
-                    
-                    # Update search engine if missing
-                    if not existing_engine:
-                        bot_db.query(
-                            "UPDATE search_urls SET SearchEngine = %s WHERE UrlID = %s",
-                            (search_engine, url_id),
-                            auto_commit=False
-                        )
-                else:
-                    # Process new URL
-                    is_scrappable = can_scrape(url)
-                    keyword_data = {}
-                    
-                    if is_scrappable:
-                        try:
-                            parsed_url = urlparse(url)
-                            domain = parsed_url.netloc[:255]
-                            
-                            # Only fetch HTML title if we don't have one from JSON
-                            if url_type == 'HTML' and not title:
-                                title = get_page_title(url)[:500]
-                            
-                            # Get keyword frequencies based on content type
-                            if url_type == 'HTML':
-                                freq_result = get_html_frequencies(url, word_list=key_words)
-                                if isinstance(freq_result, dict) and not freq_result.get('error'):
-                                    keyword_data = freq_result
-                                elif freq_result.get('error') == "404 Not Found":
-                                    not_found_urls.append(url)
-                            else:  # IMAGE processing
-                                extracted_text = extract_text_from_image_url(url)
-                                if extracted_text:
-                                    keyword_data = get_text_frequencies(extracted_text, key_words)
-                        except Exception as e:
-                            print(f"\nError processing {url}: {str(e)}")
-                            is_scrappable = False
-                    
-                    # Insert URL record
-                    bot_db.query(
-                        """INSERT INTO search_urls 
-                           (SearchQueryID, SearchEngine, Url, Type, Domain, Title, Description, IsScrappable)
-                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-                        (search_query_id, search_engine, url, url_type, 
-                         domain if 'domain' in locals() else urlparse(url).netloc[:255], 
-                         title, url_data.get("description", "")[:500], is_scrappable),
-                        auto_commit=False
-                    )
-                    
-                    url_id = bot_db.cursor.lastrowid
-                    inserted_count += 1
-                    is_new_url = True
-                
-                # Process keywords for both new and existing URLs
-                if url_id and key_words:  # Ensure we have keywords to process
-                    # For existing URLs, we need to get fresh keyword data
-                    if not is_new_url:
-                        is_scrappable = can_scrape(url)
-                        keyword_data = {}
-                        if is_scrappable:
-                            try:
-                                if url_type == 'HTML':
-                                    freq_result = get_html_frequencies(url, word_list=key_words)
-                                    if isinstance(freq_result, dict) and not freq_result.get('error'):
-                                        keyword_data = freq_result
-                                else:
-                                    extracted_text = extract_text_from_image_url(url)
-                                    if extracted_text:
-                                        keyword_data = get_text_frequencies(extracted_text, key_words)
-                            except Exception as e:
-                                print(f"\nError processing keywords for existing URL {url}: {str(e)}")
-                    
-                    # Initialize with 0 counts for all keywords if no data was collected
-                    if not keyword_data:
-                        keyword_data = {kw: 0 for kw in key_words}
-                    
-                    # Ensure all keywords are present in the data (even with 0 counts)
-                    for kw in key_words:
-                        if kw not in keyword_data:
-                            keyword_data[kw] = 0
-                    
-                    # Insert/update all keywords (including 0 counts)
-                    for keyword, freq in keyword_data.items():
-                        content_type = 'IMAGE' if url_type == 'IMAGE' else 'TEXT'
-                        try:
-                            bot_db.query(
-                                """INSERT INTO KeyWords 
-                                   (UrlID, KeyWordInSearchQuery, Occurrence, ContentType)
-                                   VALUES (%s, %s, %s, %s)
-                                   ON DUPLICATE KEY UPDATE 
-                                   Occurrence = VALUES(Occurrence),
-                                   ContentType = VALUES(ContentType)""",
-                                (url_id, keyword[:255], freq, content_type),
-                                auto_commit=False
-                            )
-                        except Exception as e:
-                            print(f"\nError inserting keyword '{keyword}' for URL {url}: {str(e)}")
-                            error_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                print(f"\nError processing URL {url}: {str(e)}")
-                continue
+        _process_urls(bot_db, search_query_id, json_data["unique_urls"], key_words, fetcher, pool,
+                      batch_size, counts, not_found_urls, progress)
         
         # Update duplicate count in SearchQuery
         bot_db.query(
             "UPDATE SearchQuery SET Count_Dups = %s WHERE SearchQueryID = %s",
-            (duplicates_count, search_query_id),
+            (counts["duplicates"], search_query_id),
             auto_commit=False
         )
         
         bot_db.commit()
-        print(f"\n\nInsertion complete. Results:")
-        print(f"- Total URLs processed: {total_urls}")
-        print(f"- New URLs inserted: {inserted_count}")
-        print(f"- Existing URLs processed: {duplicates_count}")
-        print(f"- Errors encountered: {error_count}")
-        print(f"- 404 Not Found URLs: {len(not_found_urls)}")
-        print(f"Total processing time: {(datetime.now() - start_time).total_seconds():.1f} seconds")
-        
-        if not_found_urls:
-            print("\nURLs that returned 404:")
-            for url in not_found_urls[:10]:
-                print(f"- {url}")
-            if len(not_found_urls) > 10:
-                print(f"- ...and {len(not_found_urls) - 10} more")
+        # Rankings cached for any of these keywords no longer reflect the corpus
+        get_result_cache().invalidate_keywords(key_words)
+        mark_keywords_changed(key_words)
+        _print_summary(len(json_data["unique_urls"]), counts, not_found_urls, fetcher, start_time)
         
     except Exception as e:
         bot_db.rollback()
         print(f"\nTransaction failed: {str(e)}")
         raise
     finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        _save_robots_cache()
         bot_db.close()
     
     return key_words
 
+def insert_search_results_incremental(batches: Iterable[Dict], query: str, workers: int = INSERT_WORKERS,
+                                      batch_size: int = INSERT_BATCH_SIZE,
+                                      on_commit: Optional[Callable[[], None]] = None,
+                                      progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+    """
+    Insert search results that arrive a piece at a time (e.g. one engine after another).
+
+    Each item of batches is consolidated JSON data as taken by insert_search_results.
+    Items may repeat URLs from earlier items; only URLs whose canonical URL was not
+    seen earlier in this run are processed. Everything is recorded under one SearchQuery row whose statistics
+    come from the last item.
+
+    Work is committed after every URL (every batch_size URLs in batch mode) and
+    on_commit is called after each commit, so the ranking can be read while the
+    rest is still being fetched. If a later step fails, rows already committed stay.
+    """
+    key_words = extract_keywords(query)
+    if not key_words:
+        print("Warning: No keywords extracted from query")
+        return []
+
+    bot_db = MY_CUSTOM_BOT()
+    fetcher = PageFetcher()
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    not_found_urls = []
+    start_time = datetime.now()
+    counts = _new_counts()
+    seen_urls = set()
+    total_urls = 0
+    statistics = {}
+
+    def commit():
+        bot_db.commit()
+        get_result_cache().invalidate_keywords(key_words)
+        mark_keywords_changed(key_words)
+        if on_commit:
+            on_commit()
+
+    try:
+        search_query_id = bot_db.query(
+            """INSERT INTO SearchQuery 
+               (Query, TotalUrls, UniqueUrls, Count_Dups, Count_Ads)
+               VALUES (%s, %s, %s, %s, %s)""",
+            (query, 0, 0, 0, 0)
+        )
+        if not search_query_id:
+            raise ValueError("Failed to insert search query")
+
+        for json_data in batches:
+            if not isinstance(json_data, dict) or not isinstance(json_data.get("unique_urls"), list):
+                print("Error: Missing or invalid 'unique_urls' in JSON data")
+                continue
+            statistics = json_data.get("statistics", statistics)
+
+            new_urls = []
+            for url_data in json_data["unique_urls"]:
+                url = url_data.get("url") if isinstance(url_data, dict) else None
+                key = canonical_url(url) if url and isinstance(url, str) else None
+                if key in seen_urls:
+                    continue
+                if key:
+                    seen_urls.add(key)
+                new_urls.append(url_data)
+            total_urls += len(new_urls)
+
+            _process_urls(bot_db, search_query_id, new_urls, key_words, fetcher, pool,
+                          batch_size, counts, not_found_urls, progress, on_written=commit)
+
+        bot_db.query(
+            """UPDATE SearchQuery
+               SET TotalUrls = %s, UniqueUrls = %s, Count_Dups = %s, Count_Ads = %s
+               WHERE SearchQueryID = %s""",
+            (statistics.get("total_original_urls", 0),
+             statistics.get("total_unique_urls", 0),
+             counts["duplicates"],
+             statistics.get("total_ads_removed", 0),
+             search_query_id)
+        )
+        _print_summary(total_urls, counts, not_found_urls, fetcher, start_time)
+
+    except Exception as e:
+        bot_db.rollback()
+        print(f"\nIncremental insert failed: {str(e)}")
+        raise
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        _save_robots_cache()
+        bot_db.close()
+
+    return key_words
+
 #prints urls that returned 404
 #return key_words from search query
\ No newline at end of file
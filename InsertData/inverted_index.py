@@ -0,0 +1,242 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the SQL ranking engine is used
+    np = None
+
+# Scoring modes: "sum" matches SQL SUM(Occurrence); "bm25" is length-normalized TF-IDF
+INDEX_SCORING = os.getenv("RANKING_SCORING", "sum")
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Seconds between polls for KeyWords rows inserted by other processes
+INDEX_REFRESH_INTERVAL = 30
+# Seconds between full reloads. The poll only sees new KeyWordIDs, so rows other
+# processes update in place (ON DUPLICATE KEY UPDATE) or commit under a lower ID
+# than one already polled show up here at the latest.
+INDEX_FULL_RELOAD_INTERVAL = 600
+
+class PostingList:
+    """Column arrays for one keyword, sorted by UrlID"""
+
+    __slots__ = ("url_ids", "occurrences")
+
+    def __init__(self, url_ids, occurrences):
+        order = np.argsort(url_ids, kind="stable")
+        self.url_ids = url_ids[order]
+        self.occurrences = occurrences[order]
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple]) -> "PostingList":
+        """Build from (UrlID, Occurrence) rows; later rows win for a repeated UrlID"""
+        latest = dict(rows)
+        url_ids = np.fromiter(latest.keys(), dtype=np.int32, count=len(latest))
+        occurrences = np.fromiter(latest.values(), dtype=np.int32, count=len(latest))
+        return cls(url_ids, occurrences)
+
+    def rows(self) -> List[tuple]:
+        return list(zip(self.url_ids.tolist(), self.occurrences.tolist()))
+
+class InvertedIndex:
+    """
+    KeyWords table held as per-keyword posting lists. Inserts in this process mark
+    their keywords stale; rows other processes insert are picked up by polling
+    KeyWordID. Both are applied incrementally on the next ranking call. Other
+    processes' updates to existing rows are only seen by the full reload every
+    INDEX_FULL_RELOAD_INTERVAL seconds, which builds the new posting lists without
+    holding the lock, so rankings keep using the current ones until the swap.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, PostingList] = {}
+        self.doc_lengths = np.zeros(0, dtype=np.int64)  # Summed occurrences per UrlID
+        self.max_keyword_id = 0
+        self.loaded = False
+        self._stale = set()
+        self._marked_during_load = None  # Keywords marked stale while load() builds, else None
+        self._last_poll = 0.0
+        self._last_load = 0.0
+        self._lock = threading.RLock()
+        self._load_lock = threading.RLock()  # One full load at a time
+
+    def _grow(self, max_url_id: int):
+        if max_url_id >= len(self.doc_lengths):
+            grown = np.zeros(max(max_url_id + 1, 2 * len(self.doc_lengths)), dtype=np.int64)
+            grown[:len(self.doc_lengths)] = self.doc_lengths
+            self.doc_lengths = grown
+
+    def _set_posting(self, keyword: str, posting: Optional[PostingList]):
+        """Replace one keyword's posting list, keeping document lengths in step"""
+        old = self.postings.pop(keyword, None)
+        if old is not None:
+            np.subtract.at(self.doc_lengths, old.url_ids, old.occurrences)
+        if posting is not None and len(posting.url_ids):
+            self._grow(int(posting.url_ids.max()))
+            np.add.at(self.doc_lengths, posting.url_ids, posting.occurrences)
+            self.postings[keyword] = posting
+
+    def _apply_rows(self, rows: Iterable[tuple], replace: bool):
+        """Group (KeyWordID, UrlID, keyword, Occurrence) rows into posting lists"""
+        grouped: Dict[str, List[tuple]] = {}
+        for keyword_id, url_id, keyword, occurrence in rows:
+            if url_id is None or keyword is None:
+                continue
+            grouped.setdefault(keyword.lower(), []).append((int(url_id), int(occurrence or 0)))
+            self.max_keyword_id = max(self.max_keyword_id, int(keyword_id))
+
+        for keyword, new_rows in grouped.items():
+            if not replace and keyword in self.postings:
+                new_rows = self.postings[keyword].rows() + new_rows
+            self._set_posting(keyword, PostingList.from_rows(new_rows))
+        return grouped
+
+    def load(self, bot_db):
+        """Build the whole index from KeyWords and swap it in"""
+        with self._load_lock:
+            start = time.perf_counter()
+            started = time.monotonic()
+            with self._lock:
+                self._marked_during_load = set()
+            try:
+                rows = bot_db.query(
+                    """SELECT KeyWordID, UrlID, KeyWordInSearchQuery, Occurrence
+                       FROM KeyWords""",
+                    fetch=True
+                ) or []
+                built = InvertedIndex()
+                built._apply_rows(rows, replace=True)
+            except BaseException:
+                with self._lock:
+                    self._marked_during_load = None
+                raise
+            with self._lock:
+                self.postings = built.postings
+                self.doc_lengths = built.doc_lengths
+                self.max_keyword_id = built.max_keyword_id
+                # Keywords are marked after their commit, so earlier marks are in the rows
+                # read above; ones marked since may not be
+                self._stale = self._marked_during_load
+                self._marked_during_load = None
+                self.loaded = True
+                self._last_poll = self._last_load = started
+            print(f"Inverted index loaded: {len(rows)} rows, {len(built.postings)} keywords "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+    def mark_stale(self, keywords: Iterable[str]):
+        """Record keywords whose rows were inserted or updated since the last refresh"""
+        with self._lock:
+            keywords = {kw.lower().strip() for kw in keywords if kw}
+            self._stale.update(keywords)
+            if self._marked_during_load is not None:
+                self._marked_during_load.update(keywords)
+
+    def _reload_due(self) -> bool:
+        return not self.loaded or time.monotonic() - self._last_load >= INDEX_FULL_RELOAD_INTERVAL
+
+    def refresh(self, bot_db):
+        """
+        Reload stale keywords and merge rows other processes inserted; rebuild
+        everything once INDEX_FULL_RELOAD_INTERVAL has passed
+        """
+        # Until the first load finishes there is nothing to rank with, so callers wait
+        # for it; a periodic reload runs in one caller while the others use the old lists
+        if self._reload_due() and self._load_lock.acquire(blocking=not self.loaded):
+            try:
+                if self._reload_due():
+                    self.load(bot_db)
+                    return
+            finally:
+                self._load_lock.release()
+
+        with self._lock:
+            if self._stale:
+                stale = sorted(self._stale)
+                self._stale.clear()
+                rows = bot_db.query(
+                    f"""SELECT KeyWordID, UrlID, KeyWordInSearchQuery, Occurrence
+                        FROM KeyWords
+                        WHERE KeyWordInSearchQuery IN ({', '.join(['%s'] * len(stale))})""",
+                    tuple(stale),
+                    fetch=True
+                ) or []
+                reloaded = self._apply_rows(rows, replace=True)
+                for keyword in stale:
+                    if keyword not in reloaded:
+                        self._set_posting(keyword, None)
+
+            if time.monotonic() - self._last_poll >= INDEX_REFRESH_INTERVAL:
+                rows = bot_db.query(
+                    """SELECT KeyWordID, UrlID, KeyWordInSearchQuery, Occurrence
+                       FROM KeyWords WHERE KeyWordID > %s""",
+                    (self.max_keyword_id,),
+                    fetch=True
+                ) or []
+                self._apply_rows(rows, replace=False)
+                self._last_poll = time.monotonic()
+
+    def rank(self, keywords: List[str], scoring: str = INDEX_SCORING) -> List[int]:
+        """
+        Score every URL matching any keyword and return UrlIDs best first
+        (ties broken by UrlID, like the SQL engine).
+
+        Args:
+            keywords: Normalized keywords
+            scoring: "sum" for summed occurrences, "bm25" for length-normalized TF-IDF
+        """
+        with self._lock:
+            postings = [self.postings[kw] for kw in keywords if kw in self.postings]
+            if not postings:
+                return []
+
+            if scoring == "bm25":
+                # Every query keyword gets a row per URL, 0 where it never appears; only
+                # the rows where it does appear are documents containing the term
+                found = [p.occurrences > 0 for p in postings]
+                url_ids = np.concatenate([p.url_ids[mask] for p, mask in zip(postings, found)])
+                tf = np.concatenate([p.occurrences[mask] for p, mask in zip(postings, found)]).astype(np.float64)
+                if not len(url_ids):
+                    return []
+                # Document length is the URL's summed occurrences over every stored keyword
+                doc_lengths = self.doc_lengths[url_ids].astype(np.float64)
+                nonzero = self.doc_lengths[self.doc_lengths > 0]
+                num_docs = max(len(nonzero), 1)
+                avg_length = float(nonzero.mean()) if len(nonzero) else 1.0
+                doc_freqs = [int(np.count_nonzero(mask)) for mask in found]
+                idf = np.concatenate([
+                    np.full(df, math.log(1 + (num_docs - df + 0.5) / (df + 0.5))) for df in doc_freqs
+                ])
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avg_length)
+                row_scores = idf * tf * (BM25_K1 + 1) / (tf + norm)
+            else:
+                # Zero-occurrence rows stay: SQL SUM ranking lists those URLs too
+                url_ids = np.concatenate([p.url_ids for p in postings])
+                row_scores = np.concatenate([p.occurrences for p in postings]).astype(np.float64)
+
+            unique_ids, inverse = np.unique(url_ids, return_inverse=True)
+            scores = np.bincount(inverse, weights=row_scores)
+            order = np.lexsort((unique_ids, -scores))
+            return unique_ids[order].tolist()
+
+_index: Optional[InvertedIndex] = None
+_index_lock = threading.Lock()
+
+def index_available() -> bool:
+    return np is not None
+
+def get_inverted_index() -> InvertedIndex:
+    """Return the process-wide index (loaded lazily on the first refresh)"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = InvertedIndex()
+    return _index
+
+def mark_keywords_changed(keywords: Iterable[str]):
+    """Tell a built index that rows for these keywords changed; no-op if it isn't in use"""
+    if _index is not None and _index.loaded:
+        _index.mark_stale(keywords)
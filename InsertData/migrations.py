@@ -0,0 +1,145 @@
+from typing import Callable, List, Optional, Tuple
+from InsertData.url_canonical import canonical_hash
+
+# Versioned schema changes applied after the base tables exist. Each step checks
+# information_schema before changing anything, so re-running a migration is a no-op.
+
+# Rows per UPDATE batch when a migration backfills a column from Python
+BACKFILL_BATCH_SIZE = 1000
+
+def _index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute(
+        """SELECT COUNT(*) FROM information_schema.STATISTICS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s""",
+        (table, index)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        """SELECT COUNT(*) FROM information_schema.COLUMNS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s""",
+        (table, column)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _keyword_covering_index(cursor):
+    """Ranking filters KeyWords by keyword and reads UrlID/Occurrence/ContentType;
+    a keyword-first index answers that without touching the table rows."""
+    if not _index_exists(cursor, "KeyWords", "idx_keywords_keyword_url"):
+        cursor.execute("""
+            CREATE INDEX idx_keywords_keyword_url
+            ON KeyWords (KeyWordInSearchQuery, UrlID, Occurrence, ContentType)
+        """)
+
+def _url_hash_column(cursor):
+    """Fixed-width MD5 of Url with its own index for exact URL lookups. The column is
+    STORED and generated, so existing rows are backfilled by the ALTER itself."""
+    if not _column_exists(cursor, "search_urls", "UrlHash"):
+        cursor.execute("""
+            ALTER TABLE search_urls
+            ADD COLUMN UrlHash BINARY(16) AS (UNHEX(MD5(Url))) STORED
+        """)
+    if not _index_exists(cursor, "search_urls", "idx_search_urls_urlhash"):
+        cursor.execute("CREATE INDEX idx_search_urls_urlhash ON search_urls (UrlHash)")
+
+def _store_canonical_hashes(cursor, rows):
+    """Set CanonicalHash from Url for (UrlID, Url) rows, BACKFILL_BATCH_SIZE per UPDATE batch"""
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        cursor.executemany(
+            "UPDATE search_urls SET CanonicalHash = %s WHERE UrlID = %s",
+            [(canonical_hash(url or ""), url_id) for url_id, url in rows[start:start + BACKFILL_BATCH_SIZE]]
+        )
+
+def _canonical_hash_column(cursor):
+    """MD5 of the canonical URL (InsertData.url_canonical), so lookups match a stored
+    page whatever scheme, www., trailing slash or tracking parameters it was seen with.
+    Canonicalization runs in Python, so existing rows are backfilled here in batches."""
+    if not _column_exists(cursor, "search_urls", "CanonicalHash"):
+        cursor.execute("ALTER TABLE search_urls ADD COLUMN CanonicalHash BINARY(16)")
+    cursor.execute("SELECT UrlID, Url FROM search_urls WHERE CanonicalHash IS NULL")
+    rows = cursor.fetchall()
+    _store_canonical_hashes(cursor, rows)
+    if rows:
+        print(f"Backfilled CanonicalHash for {len(rows)} search_urls rows")
+    if not _index_exists(cursor, "search_urls", "idx_search_urls_canonicalhash"):
+        cursor.execute("CREATE INDEX idx_search_urls_canonicalhash ON search_urls (CanonicalHash)")
+
+def _drop_url_hash_column(cursor):
+    """URL lookups match on CanonicalHash since migration 3, so UrlHash and its index
+    only cost every insert; drop both."""
+    if _index_exists(cursor, "search_urls", "idx_search_urls_urlhash"):
+        cursor.execute("DROP INDEX idx_search_urls_urlhash ON search_urls")
+    if _column_exists(cursor, "search_urls", "UrlHash"):
+        cursor.execute("ALTER TABLE search_urls DROP COLUMN UrlHash")
+
+def _rehash_canonical(cursor):
+    """clean_url no longer trims trailing punctuation (only OCR-read URLs are trimmed, before
+    storage), and hashes written under the old rule were taken of an already-trimmed Url that
+    trimming changed again, so they miss new inserts of the same page. Recompute every row;
+    running it twice writes the same values."""
+    cursor.execute("SELECT UrlID, Url FROM search_urls")
+    rows = cursor.fetchall()
+    _store_canonical_hashes(cursor, rows)
+    print(f"Recomputed CanonicalHash for {len(rows)} search_urls rows")
+
+def _keyword_scored_at(cursor):
+    """When each KeyWords row was last scored; the keyword upsert sets it on every write, so
+    coverage checks see re-fetched pages as fresh. Existing rows start at their URL's insert time."""
+    if not _column_exists(cursor, "KeyWords", "ScoredAt"):
+        cursor.execute("ALTER TABLE KeyWords ADD COLUMN ScoredAt DATETIME DEFAULT CURRENT_TIMESTAMP")
+        cursor.execute("""
+            UPDATE KeyWords kw JOIN search_urls su ON su.UrlID = kw.UrlID
+            SET kw.ScoredAt = su.TimeStamp
+        """)
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "Keyword-first covering index on KeyWords", _keyword_covering_index),
+    (2, "Hashed URL lookup column on search_urls", _url_hash_column),
+    (3, "Canonical URL hash column on search_urls", _canonical_hash_column),
+    (4, "Drop the unused UrlHash column from search_urls", _drop_url_hash_column),
+    (5, "Recompute search_urls.CanonicalHash after the canonical URL fix", _rehash_canonical),
+    (6, "Last scoring time on KeyWords", _keyword_scored_at),
+]
+
+def applied_versions(cursor) -> List[int]:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            Version INT PRIMARY KEY,
+            Description VARCHAR(255),
+            AppliedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT Version FROM schema_migrations ORDER BY Version")
+    return [row[0] for row in cursor.fetchall()]
+
+def apply_migrations(database, target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations in version order on an open connection
+    (with the MY_CUSTOM_BOT database selected).
+
+    Args:
+        database: mysql.connector connection
+        target: Highest version to apply (default: all)
+
+    Returns:
+        Versions applied by this call
+    """
+    cursor = database.cursor()
+    try:
+        done = set(applied_versions(cursor))
+        applied = []
+        for version, description, migrate in MIGRATIONS:
+            if version in done or (target is not None and version > target):
+                continue
+            migrate(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (Version, Description) VALUES (%s, %s)",
+                (version, description)
+            )
+            database.commit()
+            applied.append(version)
+            print(f"Applied migration {version}: {description}")
+        return applied
+    finally:
+        cursor.close()
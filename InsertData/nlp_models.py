@@ -0,0 +1,50 @@
+import threading
+import time
+from typing import Dict
+import spacy
+
+MODEL_NAME = "en_core_web_sm"
+
+# Pipeline variants and the components each one can do without.
+# "query" backs extract_keywords, which needs POS tags and noun_chunks (parser).
+# "page" backs page keyword counting, which only needs lemmas and stop words.
+PIPELINE_VARIANTS = {
+    "query": ("ner",),
+    "page": ("parser", "ner"),
+}
+
+_models: Dict[str, "spacy.language.Language"] = {}
+_load_times: Dict[str, float] = {}
+_lock = threading.Lock()
+
+def get_nlp(variant: str = "query") -> "spacy.language.Language":
+    """
+    Return the spaCy pipeline for a variant, loading it once per process.
+
+    Args:
+        variant: Key of PIPELINE_VARIANTS
+
+    Returns:
+        Loaded spaCy Language object shared by all callers
+    """
+    nlp = _models.get(variant)
+    if nlp is not None:
+        return nlp
+
+    if variant not in PIPELINE_VARIANTS:
+        raise ValueError(f"Unknown spaCy pipeline variant: {variant}")
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        nlp = _models.get(variant)
+        if nlp is None:
+            start = time.perf_counter()
+            nlp = spacy.load(MODEL_NAME, disable=list(PIPELINE_VARIANTS[variant]))
+            _load_times[variant] = time.perf_counter() - start
+            _models[variant] = nlp
+            print(f"Loaded spaCy pipeline '{variant}' ({MODEL_NAME}) in {_load_times[variant]:.2f}s")
+    return nlp
+
+def get_model_load_times() -> Dict[str, float]:
+    """Return load time in seconds for each pipeline variant loaded so far"""
+    return dict(_load_times)
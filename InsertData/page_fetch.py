@@ -0,0 +1,349 @@
+import codecs
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+import requests
+
+try:
+    from lxml import html as lxml_html
+    from lxml import etree
+except ImportError:  # Optional: without lxml pages are parsed with the stdlib HTMLParser
+    lxml_html = None
+
+try:
+    from charset_normalizer import from_bytes as detect_charset
+    from charset_normalizer.utils import is_multi_byte_encoding
+except ImportError:  # Optional: without it undeclared non-UTF-8 pages are read as windows-1252
+    detect_charset = None
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+# Elements dropped before counting keywords in page text
+NON_CONTENT_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'iframe']
+
+# Bytes kept of an HTML page; the rest is never downloaded and the prefix is parsed
+MAX_PAGE_BYTES = int(os.getenv("MAX_PAGE_BYTES", str(2 * 1024 * 1024)))
+# Images larger than this are rejected (a partial image cannot be OCR'd)
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+# "lxml" or "html.parser"; lxml is used whenever it is installed
+PARSER = "lxml" if lxml_html is not None else "html.parser"
+
+# Content-Type media types downloaded per kind of fetch; a missing or generic
+# type is decided from the first bytes instead
+ACCEPTED_CONTENT_TYPES = {
+    "html": ("text/html", "application/xhtml+xml", "text/plain"),
+    "image": ("image/",),
+}
+UNLABELLED_CONTENT_TYPES = ("", "application/octet-stream", "binary/octet-stream")
+# Leading bytes of formats that are never HTML, whatever the server claims
+BINARY_SIGNATURES = (
+    b"%PDF", b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"PK\x03\x04", b"\x1f\x8b", b"Rar!",
+    b"ID3", b"OggS", b"RIFF", b"\x1a\x45\xdf\xa3", b"fLaC", b"\x00\x00\x01\xba",
+)
+# <meta charset=...> / <meta http-equiv content="...; charset=..."> near the top of a page
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+# Bytes looked at for a <meta> charset and by charset detection
+CHARSET_SNIFF_BYTES = 64 * 1024
+# What browsers assume for an undeclared page that is not UTF-8 (charset detection
+# only overrides it with a multi-byte encoding; it misreads Western single-byte text)
+FALLBACK_ENCODING = "windows-1252"
+
+class UnsupportedContent(requests.RequestException):
+    """The response is not what the fetch asked for (wrong type, binary body or too large)"""
+
+def media_type(content_type: Optional[str]) -> str:
+    """Media type of a Content-Type header, lowercased and without parameters"""
+    return (content_type or "").split(";")[0].strip().lower()
+
+def looks_binary(head: bytes) -> bool:
+    """Whether the first bytes of a body belong to a file format rather than text"""
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return False
+    return head.startswith(BINARY_SIGNATURES) or head[4:8] == b"ftyp" or b"\x00" in head[:1024]
+
+def check_content_type(content_type: Optional[str], kind: str) -> Optional[str]:
+    """Why a response with this Content-Type is not worth downloading for kind, or None"""
+    mime = media_type(content_type)
+    if mime in UNLABELLED_CONTENT_TYPES or mime.startswith(ACCEPTED_CONTENT_TYPES[kind]):
+        return None
+    return f"{mime} is not {kind}"
+
+def decode_body(body: bytes, content_type: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Decode a page by its BOM, else the charset the server declared, its <meta>
+    charset, UTF-8 if the bytes are valid UTF-8, a multi-byte encoding found by
+    charset detection and finally FALLBACK_ENCODING. Undecodable bytes are replaced.
+
+    Returns:
+        (text, encoding used)
+    """
+    candidates = []
+    for bom, encoding in ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+                          (codecs.BOM_UTF16_BE, "utf-16")):
+        if body.startswith(bom):
+            candidates.append(encoding)
+    for param in (content_type or "").split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            candidates.append(value.strip().strip('"\''))
+    head = body[:CHARSET_SNIFF_BYTES]
+    match = META_CHARSET.search(head)
+    if match:
+        candidates.append(match.group(1).decode("ascii"))
+
+    for encoding in candidates:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            continue
+        return body.decode(encoding, errors="replace"), encoding
+    try:
+        # Not final: the sample (or a size-capped body) may end inside a character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return body.decode("utf-8", errors="replace"), "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if detect_charset is not None:
+        best = detect_charset(head).best()
+        if best is not None and is_multi_byte_encoding(best.encoding):
+            return body.decode(best.encoding, errors="replace"), best.encoding
+    return body.decode(FALLBACK_ENCODING, errors="replace"), FALLBACK_ENCODING
+
+def _lxml_to_text(page_html: str) -> Tuple[str, List[str]]:
+    try:
+        tree = lxml_html.document_fromstring(XML_DECLARATION.sub("", page_html, count=1))
+    except (etree.ParserError, ValueError):
+        return "", []
+    title = tree.findtext(".//title") or ""
+    etree.strip_elements(tree, *NON_CONTENT_TAGS, with_tail=False)
+    return title, list(tree.itertext())
+
+class _TextParser(HTMLParser):
+    """Title and text outside NON_CONTENT_TAGS, collected while parsing (no tree is built)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.chunks = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in NON_CONTENT_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag in NON_CONTENT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title and not self.title:
+            self.title = data
+        if not self._skip_depth:
+            self.chunks.append(data)
+
+def _stdlib_to_text(page_html: str) -> Tuple[str, List[str]]:
+    parser = _TextParser()
+    parser.feed(page_html)
+    parser.close()
+    return parser.title, parser.chunks
+
+def html_to_text(page_html: str, parser: str = PARSER) -> Tuple[str, str]:
+    """
+    Title and visible text of a page without building a BeautifulSoup tree.
+
+    Returns:
+        (stripped <title> text, text with NON_CONTENT_TAGS removed: stripped
+        strings joined by single spaces, as BeautifulSoup's get_text(' ', strip=True))
+    """
+    if parser == "lxml" and lxml_html is not None:
+        title, chunks = _lxml_to_text(page_html)
+    else:
+        title, chunks = _stdlib_to_text(page_html)
+    return title.strip(), " ".join(chunk.strip() for chunk in chunks if chunk.strip())
+
+class FetchedPage:
+    """
+    One downloaded URL. The body is decoded and parsed at most once and shared by
+    all consumers; bytes downloaded and download/parse times are kept per URL.
+    """
+
+    def __init__(self, url: str, response: Optional[requests.Response] = None,
+                 error: Optional[Exception] = None, body: bytes = b"", truncated: bool = False,
+                 download_seconds: float = 0.0, bytes_downloaded: Optional[int] = None):
+        self.url = url
+        self.response = response
+        self.error = error
+        self.status_code = response.status_code if response is not None else None
+        self.content_type = response.headers.get("Content-Type") if response is not None else None
+        self.bytes_downloaded = len(body) if bytes_downloaded is None else bytes_downloaded
+        self.truncated = truncated
+        self.download_seconds = download_seconds
+        self.parse_seconds = 0.0
+        self.encoding = None
+        self._body = body
+        self._title = None
+        self._text = None
+        self._lock = threading.Lock()
+
+    @property
+    def content(self) -> bytes:
+        return self._body
+
+    def raise_for_status(self):
+        """Re-raise the download error or HTTP error status, like requests does"""
+        if self.error is not None:
+            raise self.error
+        self.response.raise_for_status()
+
+    def _parse(self):
+        """Decode and extract title and text once. Caller holds self._lock."""
+        if self._title is None:
+            start = time.perf_counter()
+            page_html, self.encoding = decode_body(self._body, self.content_type)
+            self._title, text = html_to_text(page_html)
+            self._text = text.lower()
+            self.parse_seconds = time.perf_counter() - start
+
+    @property
+    def title(self) -> str:
+        """Stripped <title> text, or empty string"""
+        with self._lock:
+            self._parse()
+            return self._title
+
+    @property
+    def text(self) -> str:
+        """Lowercased visible text with non-content elements removed"""
+        with self._lock:
+            self._parse()
+            return self._text
+
+    def release(self):
+        """Drop the body once every consumer is done; title/text stay cached"""
+        with self._lock:
+            self._body = b""
+            self.response = None
+
+    def record(self) -> Dict:
+        """What fetching and parsing this URL cost"""
+        return {"url": self.url, "status_code": self.status_code, "content_type": media_type(self.content_type),
+                "bytes": self.bytes_downloaded, "truncated": self.truncated,
+                "download_seconds": self.download_seconds, "parse_seconds": self.parse_seconds,
+                "encoding": self.encoding, "error": str(self.error) if self.error else None}
+
+class PageFetcher:
+    """
+    Per-run page cache so every URL is downloaded once, even across worker threads.
+    Bodies are streamed: responses of the wrong type are dropped after the headers
+    or first chunk, HTML stops at max_page_bytes and images over max_image_bytes
+    are rejected.
+    """
+
+    def __init__(self, max_page_bytes: int = MAX_PAGE_BYTES, max_image_bytes: int = MAX_IMAGE_BYTES):
+        self.max_bytes = {"html": max_page_bytes, "image": max_image_bytes}
+        self.fetches = 0
+        self.fetches_avoided = 0
+        self._pages: Dict[str, FetchedPage] = {}
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+
+    def _download(self, url: str, timeout: float, kind: str) -> FetchedPage:
+        start = time.perf_counter()
+        response = requests.get(url, headers=HEADERS, timeout=timeout, stream=True)
+        try:
+            if response.status_code >= 400:
+                # Callers only look at the status of an error response
+                return FetchedPage(url, response, download_seconds=time.perf_counter() - start)
+            max_bytes = self.max_bytes[kind]
+            reason = check_content_type(response.headers.get("Content-Type"), kind)
+            length = response.headers.get("Content-Length", "")
+            if not reason and kind == "image" and length.isdigit() and int(length) > max_bytes:
+                reason = f"{length} bytes is over the {max_bytes} byte limit"
+
+            body = bytearray()
+            received = 0
+            truncated = False
+            if not reason:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    received += len(chunk)
+                    if not body and kind == "html" and looks_binary(chunk):
+                        reason = "body is binary, not HTML"
+                        break
+                    body += chunk
+                    if len(body) > max_bytes:
+                        if kind == "image":
+                            reason = f"over the {max_bytes} byte limit"
+                            break
+                        del body[max_bytes:]
+                        truncated = True
+                        break
+            error = UnsupportedContent(f"Skipped {url}: {reason}") if reason else None
+            return FetchedPage(url, response, error=error, body=b"" if reason else bytes(body),
+                               truncated=truncated, download_seconds=time.perf_counter() - start,
+                               bytes_downloaded=received)
+        finally:
+            response.close()
+
+    def get(self, url: str, timeout: float = 10, kind: str = "html") -> FetchedPage:
+        """
+        Return the page for url, downloading it only the first time it is requested.
+        kind ("html" or "image") decides which content types are accepted and the size cap.
+        """
+        with self._lock:
+            page = self._pages.get(url)
+            if page is not None:
+                self.fetches_avoided += 1
+                return page
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+
+        with url_lock:
+            with self._lock:
+                page = self._pages.get(url)
+                if page is not None:
+                    self.fetches_avoided += 1
+                    return page
+
+            try:
+                page = self._download(url, timeout, kind)
+            except Exception as e:
+                page = FetchedPage(url, error=e)
+
+            with self._lock:
+                self.fetches += 1
+                self._pages[url] = page
+                self._url_locks.pop(url, None)
+        return page
+
+    def release(self, url: str):
+        """Free the body of a cached page, if it was downloaded"""
+        with self._lock:
+            page = self._pages.get(url)
+        if page is not None:
+            page.release()
+
+    def records(self) -> List[Dict]:
+        """FetchedPage.record() of every URL downloaded so far"""
+        with self._lock:
+            pages = list(self._pages.values())
+        return [page.record() for page in pages]
+
+    def stats(self) -> Dict[str, float]:
+        """Return downloads made and avoided by reuse, with bytes, rejections and parse time"""
+        with self._lock:
+            pages = list(self._pages.values())
+            stats = {"fetches": self.fetches, "fetches_avoided": self.fetches_avoided}
+        stats["bytes_downloaded"] = sum(page.bytes_downloaded for page in pages)
+        stats["truncated"] = sum(page.truncated for page in pages)
+        stats["rejected"] = sum(isinstance(page.error, UnsupportedContent) for page in pages)
+        stats["parse_seconds"] = sum(page.parse_seconds for page in pages)
+        return stats
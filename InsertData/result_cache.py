@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds a ranked list stays valid even without inserts touching its keywords
+RESULT_CACHE_TTL = 10 * 60
+# Maximum number of keyword sets kept before least recently used ones are evicted
+RESULT_CACHE_SIZE = 256
+
+class RankedEntry:
+    """Full ranking for one keyword set plus the page payloads built from it so far"""
+
+    def __init__(self, ranked_ids: List[int]):
+        self.created_at = time.time()
+        self.ranked_ids = ranked_ids
+        self.pages: Dict[int, List[Dict]] = {}
+
+class RankedResultCache:
+    """Thread-safe LRU cache of ranked UrlIDs keyed by the normalized keyword set"""
+
+    def __init__(self, ttl: float = RESULT_CACHE_TTL, max_size: int = RESULT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Tuple[str, ...], RankedEntry]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(keywords: Iterable[str]) -> Tuple[str, ...]:
+        """Order- and case-insensitive key for a keyword set"""
+        return tuple(sorted({kw.lower().strip() for kw in keywords if kw and kw.strip()}))
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every invalidation; read it before computing a ranking to pass to put()"""
+        return self._generation
+
+    def get(self, keywords: Iterable[str]) -> Optional[RankedEntry]:
+        key = self.key(keywords)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.created_at > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, keywords: Iterable[str], ranked_ids: List[int], generation: int) -> RankedEntry:
+        """Store a ranking unless an insert invalidated the cache while it was computed"""
+        entry = RankedEntry(ranked_ids)
+        with self._lock:
+            if generation != self._generation:
+                return entry
+            self._entries[self.key(keywords)] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate_keywords(self, keywords: Iterable[str]) -> int:
+        """Drop every entry whose keyword set shares a keyword with an insert"""
+        touched = set(self.key(keywords))
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if touched.intersection(key)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "invalidations": self.invalidations, "entries": len(self._entries)}
+
+_result_cache = RankedResultCache()
+
+def get_result_cache() -> RankedResultCache:
+    """Return the process-wide ranked-result cache"""
+    return _result_cache
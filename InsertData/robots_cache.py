@@ -0,0 +1,223 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+
+# Seconds a parsed robots.txt stays valid, and the shorter lifetime for fetch failures
+ROBOTS_CACHE_TTL = 24 * 60 * 60
+ROBOTS_ERROR_TTL = 5 * 60
+# Maximum number of hosts kept before least recently used entries are evicted
+ROBOTS_CACHE_SIZE = 2048
+# Optional JSON file so parsed rules survive between runs (unset = memory only)
+ROBOTS_CACHE_PATH = os.getenv("ROBOTS_CACHE_PATH")
+
+class RobotsRules:
+    """Allow/Disallow rules for each user-agent group of one robots.txt, compiled once"""
+
+    def __init__(self, groups: Dict[str, List[Tuple[bool, str]]]):
+        self.groups = groups
+        self._compiled = {
+            agent: sorted(
+                ((len(path), allow, self._compile(path)) for allow, path in rules),
+                key=lambda rule: (-rule[0], not rule[1])  # Longest match first, Allow wins ties
+            )
+            for agent, rules in groups.items()
+        }
+
+    @staticmethod
+    def _compile(path: str) -> "re.Pattern":
+        """Turn a robots path (with * wildcards and optional $ anchor) into a prefix regex"""
+        anchored = path.endswith("$")
+        pattern = ".*".join(re.escape(part) for part in path.rstrip("$").split("*"))
+        return re.compile(pattern + ("$" if anchored else ""))
+
+    @classmethod
+    def parse(cls, text: str) -> "RobotsRules":
+        """Parse robots.txt text into per-agent rule lists"""
+        groups: Dict[str, List[Tuple[bool, str]]] = {}
+        current_agents: List[str] = []
+        in_rules = False
+
+        for raw_line in text.splitlines():
+            line = raw_line.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            field, value = line.split(":", 1)
+            field = field.strip().lower()
+            value = value.strip()
+
+            if field == "user-agent":
+                # Consecutive user-agent lines share the rules that follow them
+                if in_rules:
+                    current_agents = []
+                    in_rules = False
+                agent = value.lower()
+                current_agents.append(agent)
+                groups.setdefault(agent, [])
+            elif field in ("allow", "disallow"):
+                in_rules = True
+                if value:  # An empty Disallow allows everything
+                    for agent in current_agents:
+                        groups[agent].append((field == "allow", value))
+
+        return cls(groups)
+
+    def allows(self, path: str, user_agent: str = "*") -> bool:
+        """Check a path (with query string) against the group for user_agent"""
+        agent = user_agent.lower()
+        rules = self._compiled.get(agent) if agent in self._compiled else self._compiled.get("*")
+        for _, allow, pattern in rules or ():
+            if pattern.match(path):
+                return allow
+        return True
+
+class RobotsCache:
+    """Thread-safe LRU cache of parsed robots.txt rules keyed by scheme+host"""
+
+    def __init__(self, ttl: float = ROBOTS_CACHE_TTL, max_size: int = ROBOTS_CACHE_SIZE,
+                 path: Optional[str] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, float, RobotsRules]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        if path:
+            self.load(path)
+
+    def _lookup(self, key: str) -> Optional[RobotsRules]:
+        """Return fresh cached rules for key, or None. Caller holds self._lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        fetched_at, ttl, rules = entry
+        if time.time() - fetched_at > ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return rules
+
+    def _store(self, key: str, rules: RobotsRules, ttl: float, fetched_at: Optional[float] = None):
+        """Insert an entry and evict the least recently used ones. Caller holds self._lock."""
+        self._entries[key] = (fetched_at or time.time(), ttl, rules)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_rules(self, scheme: str, netloc: str) -> RobotsRules:
+        """Return parsed rules for a host, downloading robots.txt only on a miss"""
+        key = f"{scheme.lower()}://{netloc.lower()}"
+        with self._lock:
+            rules = self._lookup(key)
+            if rules is not None:
+                self.hits += 1
+                return rules
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        # One download per host even when several workers miss at once
+        with fetch_lock:
+            with self._lock:
+                rules = self._lookup(key)
+                if rules is not None:
+                    self.hits += 1
+                    return rules
+                self.misses += 1
+
+            rules, ttl = self._fetch(key)
+            with self._lock:
+                self._store(key, rules, ttl)
+                self._fetch_locks.pop(key, None)
+        return rules
+
+    def _fetch(self, key: str) -> Tuple[RobotsRules, float]:
+        """Download and parse robots.txt; missing or unreachable files allow everything"""
+        try:
+            response = requests.get(f"{key}/robots.txt", timeout=10)
+            if response.status_code != 200:
+                return RobotsRules({}), self.ttl
+            return RobotsRules.parse(response.text), self.ttl
+        except Exception:
+            return RobotsRules({}), ROBOTS_ERROR_TTL
+
+    def allowed(self, url: str, user_agent: str = "*") -> bool:
+        """Check whether robots.txt for the URL's host permits fetching it"""
+        parsed = urlparse(url)
+        rules = self.get_rules(parsed.scheme, parsed.netloc)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        return rules.allows(path, user_agent)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def load(self, path: str):
+        """Load unexpired entries saved by save(); an unreadable or malformed file is ignored"""
+        now = time.time()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            loaded = []
+            for key, entry in data.items():
+                if now - entry["fetched_at"] <= entry["ttl"]:
+                    groups = {agent: [tuple(rule) for rule in rules]
+                              for agent, rules in entry["groups"].items()}
+                    loaded.append((key, RobotsRules(groups), entry["ttl"], entry["fetched_at"]))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, AttributeError, KeyError, TypeError) as e:
+            print(f"Ignoring robots cache file {path}: {str(e)}")
+            return
+        with self._lock:
+            for key, rules, ttl, fetched_at in loaded:
+                self._store(key, rules, ttl, fetched_at)
+
+    def save(self, path: Optional[str] = None):
+        """
+        Write cached entries to a JSON file (defaults to the path given at creation).
+        The file is written under a temporary name and swapped in, so a failed or
+        concurrent write never leaves a truncated cache behind.
+        """
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            data = {
+                key: {"fetched_at": fetched_at, "ttl": ttl, "groups": rules.groups}
+                for key, (fetched_at, ttl, rules) in self._entries.items()
+            }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".robots-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+_robots_cache: Optional[RobotsCache] = None
+_robots_cache_lock = threading.Lock()
+
+def get_robots_cache() -> RobotsCache:
+    """Return the process-wide robots cache, creating it on first use"""
+    global _robots_cache
+    if _robots_cache is None:
+        with _robots_cache_lock:
+            if _robots_cache is None:
+                _robots_cache = RobotsCache(path=ROBOTS_CACHE_PATH)
+    return _robots_cache
@@ -0,0 +1,128 @@
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = {
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "igshid", "srsltid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref_src",
+}
+TRACKING_PREFIXES = ("utm_",)
+# Redirect wrappers engines put around result links: (host suffix, path, parameter with the target)
+REDIRECT_WRAPPERS = [
+    ("duckduckgo.com", "/l/", "uddg"),
+    ("google.com", "/url", "q"),
+    ("google.com", "/url", "url"),
+]
+# Yahoo keeps the target in the path instead: /_ylt=.../RU=<quoted url>/RK=...
+YAHOO_REDIRECT = re.compile(r'/RU=([^/]+)')
+# Wrappers unwrapped at most this deep (a redirect to a redirect ...)
+MAX_UNWRAP = 3
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# What OCR leaves at the end of a truncated breadcrumb (https://site.com › docs › page...)
+OCR_TRAILING = re.compile(r'(?:\.{2,}|…|[.,;:!?»›>\'"])+$')
+WHITESPACE = re.compile(r'\s+')
+
+def unwrap_redirect(url: str) -> str:
+    """Target of an engine redirect link (e.g. DuckDuckGo's /l/?uddg=...), or url unchanged"""
+    for _ in range(MAX_UNWRAP):
+        try:
+            parts = urlsplit(url)
+        except ValueError:  # Unbalanced IPv6 bracket and the like; not a wrapper we know
+            return url
+        host = (parts.hostname or "").lower()
+        target = None
+        for suffix, path, param in REDIRECT_WRAPPERS:
+            if (host == suffix or host.endswith("." + suffix)) and parts.path.startswith(path):
+                target = dict(parse_qsl(parts.query)).get(param)
+                if target:
+                    break
+        if host == "r.search.yahoo.com" and (match := YAHOO_REDIRECT.search(parts.path)):
+            target = unquote(match.group(1))
+        if not target or not target.startswith(("http://", "https://", "//")):
+            return url
+        url = target
+    return url
+
+def trim_ocr_debris(url: str) -> str:
+    """
+    OCR-read URL without the punctuation a truncated breadcrumb leaves at its end
+    ("page...", "page›", an unbalanced ")"). Only for URLs read off a screenshot:
+    in a URL taken from a link, "Yahoo!" or "Washington,_D.C." is the real path.
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if parts.query or parts.fragment:
+        return url
+    path = parts.path
+    while True:
+        trimmed = OCR_TRAILING.sub("", path)
+        # A ')' closing nothing is OCR debris; Python_(language) keeps its own
+        while trimmed.endswith(")") and trimmed.count(")") > trimmed.count("("):
+            trimmed = trimmed[:-1]
+        if trimmed == path:
+            break
+        path = trimmed
+    return urlunsplit(parts._replace(path=path))
+
+def clean_url(url: str) -> str:
+    """
+    Fetchable form of a result URL: redirect wrappers removed, whitespace dropped,
+    scheme and host lowercased, default port, fragment and tracking parameters
+    dropped. The page it points to does not change, and clean_url(clean_url(url))
+    == clean_url(url). A URL too malformed to split comes back with only its
+    whitespace removed.
+    """
+    url = WHITESPACE.sub("", url or "")
+    url = unwrap_redirect(url)
+    if url.startswith("//"):
+        url = "https:" + url
+
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").rstrip(".")
+        if ":" in host:  # IPv6 literal, which hostname returns without its brackets
+            host = f"[{host}]"
+        if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{parts.port}"
+    except ValueError:  # Port out of range or not a number, unbalanced IPv6 bracket
+        return url
+
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    kept = [(key, value) for key, value in params
+            if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)]
+    # Re-encode the query only when a parameter was dropped, so the fetched URL stays as given
+    query = parts.query if len(kept) == len(params) else urlencode(kept)
+    return urlunsplit((scheme, host, parts.path, query, ""))
+
+def canonical_url(url: str) -> str:
+    """
+    Identity key of a result URL: clean_url with http/https, a leading "www.",
+    duplicate and trailing slashes and query order all ignored. Two results with
+    the same key are the same page; the key itself is not meant to be fetched.
+    """
+    try:
+        parts = urlsplit(clean_url(url))
+    except ValueError:
+        return clean_url(url)
+    host = parts.netloc
+    if host.startswith("www."):
+        host = host[4:]
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip("/")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    scheme = "https" if parts.scheme in ("http", "https", "") else parts.scheme
+    return f"{scheme}://{host}{path}" + (f"?{query}" if query else "")
+
+def canonical_hash(url: str) -> bytes:
+    """MD5 of canonical_url, the value stored in search_urls.CanonicalHash"""
+    return hashlib.md5(canonical_url(url).encode("utf-8")).digest()
+
+def preferred_url(current: Optional[str], candidate: str) -> str:
+    """Which of two cleaned variants of one page to keep: the first seen, unless only the other is https"""
+    if current is None or (current.startswith("http://") and candidate.startswith("https://")):
+        return candidate
+    return current
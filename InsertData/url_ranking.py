@@ -1,13 +1,87 @@
+import copy
+import json
+import os
 from typing import List, Dict, Tuple
 from InsertData.DataBase import MY_CUSTOM_BOT
+from InsertData.result_cache import RankedEntry, get_result_cache
+from InsertData.inverted_index import get_inverted_index, index_available
 
-def rank_urls_by_keywords(keywords: List[str], page_number: int = 1) -> Tuple[List[Dict], int, bool]:
+RESULTS_PER_PAGE = 5
+
+# Serve rankings from the in-process RankedResultCache (invalidated by inserts)
+RESULT_CACHE_ENABLED = True
+# Ranking engine: "sql" aggregates KeyWords in MySQL, "index" scores the in-memory
+# inverted index with NumPy (falls back to "sql" if NumPy is missing or it fails)
+RANKING_ENGINE = os.getenv("RANKING_ENGINE", "sql")
+
+# Ranked rows with each URL's matching keywords (JSON array). Ties on total_occurrences
+# are broken by UrlID so pagination is stable.
+RANKING_SELECT = """
+    SELECT 
+        su.UrlID,
+        su.Url,
+        su.Title,
+        su.Description,
+        su.Domain,
+        su.Type,
+        su.IsScrappable,
+        su.SearchEngine,
+        SUM(kw.Occurrence) AS total_occurrences,
+        SUM(CASE WHEN kw.ContentType = 'TEXT' THEN kw.Occurrence ELSE 0 END) AS text_matches,
+        SUM(CASE WHEN kw.ContentType = 'IMAGE' THEN kw.Occurrence ELSE 0 END) AS image_matches,
+        JSON_ARRAYAGG(JSON_OBJECT(
+            'keyword', kw.KeyWordInSearchQuery,
+            'count', kw.Occurrence,
+            'source', kw.ContentType
+        )) AS keyword_details,
+        {total_column} AS total_results
+    FROM search_urls su
+    JOIN KeyWords kw ON su.UrlID = kw.UrlID
+    WHERE kw.KeyWordInSearchQuery IN ({keyword_placeholders}) {url_filter}
+    GROUP BY 
+        su.UrlID, su.Url, su.Title, su.Description, 
+        su.Domain, su.Type, su.IsScrappable, su.SearchEngine
+    ORDER BY total_occurrences DESC, su.UrlID
+"""
+
+# Every matching UrlID in rank order, for the result cache
+RANKED_IDS_QUERY = """
+    SELECT kw.UrlID, SUM(kw.Occurrence) AS total_occurrences
+    FROM KeyWords kw
+    WHERE kw.KeyWordInSearchQuery IN ({keyword_placeholders})
+    GROUP BY kw.UrlID
+    ORDER BY total_occurrences DESC, kw.UrlID
+"""
+
+def _placeholders(count: int) -> str:
+    return ", ".join(["%s"] * count)
+
+def _page_query(keyword_count: int) -> str:
+    """One page of ranked rows plus the total number of matching URLs (window count)"""
+    return RANKING_SELECT.format(
+        total_column="COUNT(*) OVER ()",
+        keyword_placeholders=_placeholders(keyword_count),
+        url_filter=""
+    ) + "    LIMIT %s OFFSET %s"
+
+def _rows_for_ids_query(keyword_count: int, id_count: int) -> str:
+    """Ranked rows restricted to the given UrlIDs"""
+    return RANKING_SELECT.format(
+        total_column="NULL",
+        keyword_placeholders=_placeholders(keyword_count),
+        url_filter=f"AND su.UrlID IN ({_placeholders(id_count)})"
+    )
+
+def rank_urls_by_keywords(keywords: List[str], page_number: int = 1,
+                          use_cache: bool = RESULT_CACHE_ENABLED) -> Tuple[List[Dict], int, bool]:
     """
     Ranks URLs by keyword occurrences including title and description with pagination support.
     
     Args:
         keywords: List of keywords to search for
         page_number: Page number to return (1-based), 5 results per page
+        use_cache: Serve the ranking from the result cache, querying only
+            for pages that have not been built yet
         
     Returns:
         Tuple containing:
@@ -15,70 +89,40 @@ def rank_urls_by_keywords(keywords: List[str], page_number: int = 1) -> Tuple[Li
         - Total number of pages
         - Boolean indicating if more results are available
     """
+    keywords = normalize_keywords(keywords)
     if not keywords:
         return [], 0, False
 
     # Validate and normalize inputs
     page_number = max(1, int(page_number))
-    results_per_page = 5
+    results_per_page = RESULTS_PER_PAGE
     offset = (page_number - 1) * results_per_page
 
+    if use_cache or RANKING_ENGINE == "index":
+        return _rank_by_ids(keywords, page_number, use_cache)
+
     bot_db = MY_CUSTOM_BOT()
     try:
-        bot_db.begin_transaction()
-        
-        # Create temporary keyword table
-        bot_db.query("""
-            CREATE TEMPORARY TABLE temp_keywords (
-                keyword VARCHAR(255) PRIMARY KEY
-            )
-        """, auto_commit=False)
-        
-        # Insert keywords with case-insensitive matching
-        for keyword in keywords:
-            if keyword.strip():  # Skip empty keywords
-                bot_db.query(
-                    "INSERT IGNORE INTO temp_keywords VALUES (%s)",
-                    (keyword.lower().strip(),),
-                    auto_commit=False
-                )
-        
-        # Get total count for pagination
-        count_query = """
-            SELECT COUNT(DISTINCT su.UrlID)
-            FROM search_urls su
-            JOIN KeyWords kw ON su.UrlID = kw.UrlID
-            JOIN temp_keywords tk ON kw.KeyWordInSearchQuery = tk.keyword
-        """
-        total_results = int(bot_db.query(count_query, fetch=True)[0][0] or 0)
+        # Page rows, per-URL keyword breakdown and total match count in one statement
+        url_results = bot_db.query(
+            _page_query(len(keywords)),
+            (*keywords, results_per_page, offset),
+            fetch=True
+        ) or []
+
+        if url_results:
+            total_results = int(url_results[0][-1] or 0)
+        else:
+            # Page past the end: the window count is unavailable, so ask for it directly
+            count_query = f"""
+                SELECT COUNT(DISTINCT UrlID)
+                FROM KeyWords
+                WHERE KeyWordInSearchQuery IN ({_placeholders(len(keywords))})
+            """
+            total_results = int(bot_db.query(count_query, tuple(keywords), fetch=True)[0][0] or 0)
+
         total_pages = max(1, (total_results + results_per_page - 1) // results_per_page)
         has_more = (page_number * results_per_page) < total_results
-
-        # Main ranking query
-        query = """
-            SELECT 
-                su.UrlID,
-                su.Url,
-                su.Title,
-                su.Description,
-                su.Domain,
-                su.Type,
-                su.IsScrappable,
-                su.SearchEngine,
-                SUM(kw.Occurrence) AS total_occurrences,
-                SUM(CASE WHEN kw.ContentType = 'TEXT' THEN kw.Occurrence ELSE 0 END) AS text_matches,
-                SUM(CASE WHEN kw.ContentType = 'IMAGE' THEN kw.Occurrence ELSE 0 END) AS image_matches
-            FROM search_urls su
-            JOIN KeyWords kw ON su.UrlID = kw.UrlID
-            JOIN temp_keywords tk ON kw.KeyWordInSearchQuery = tk.keyword
-            GROUP BY 
-                su.UrlID, su.Url, su.Title, su.Description, 
-                su.Domain, su.Type, su.IsScrappable, su.SearchEngine
-            ORDER BY total_occurrences DESC
-            LIMIT %s OFFSET %s
-        """
-        
-        url_results = bot_db.query(query, (results_per_page, offset), fetch=True) or []
         
         # Adjust has_more if we got fewer results than requested
         if len(url_results) < results_per_page:
@@ -88,62 +132,122 @@ def rank_urls_by_keywords(keywords: List[str], page_number: int = 1) -> Tuple[Li
         ranked_urls = []
         for row in url_results:
             try:
-                (url_id, url, title, description, domain, 
-                 url_type, scrapable, search_engines, total, 
-                 text_matches, image_matches) = row
-                
-                # Get keyword details
-                kw_query = """
-                    SELECT 
-                        KeyWordInSearchQuery, 
-                        Occurrence, 
-                        ContentType
-                    FROM KeyWords
-                    WHERE UrlID = %s
-                    AND KeyWordInSearchQuery IN (
-                        SELECT keyword FROM temp_keywords
-                    )
-                    ORDER BY Occurrence DESC
-                """
-                kw_results = bot_db.query(kw_query, (url_id,), fetch=True) or []
-                
-                # Ensure numeric values
-                total = int(total) if total is not None else 0
-                text_matches = int(text_matches) if text_matches is not None else 0
-                image_matches = int(image_matches) if image_matches is not None else 0
-                
-                ranked_urls.append({
-                    'url_id': int(url_id),
-                    'url': str(url or ""),
-                    'title': str(title or ""),
-                    'description': str(description or ""),
-                    'domain': str(domain or ""),
-                    'type': str(url_type or ""),
-                    'scrapable': bool(scrapable),
-                    'search_engines': [str(se) for se in (search_engines.split(',') if search_engines else [])],
-                    'total_occurrences': total,
-                    'text_matches': text_matches,
-                    'image_matches': image_matches,
-                    'keywords': [{
-                        'keyword': str(kw[0] or ""),
-                        'count': int(kw[1] or 0),
-                        'source': str(kw[2] or "")
-                    } for kw in kw_results]
-                })
+                ranked_urls.append(_format_row(row))
             except Exception as e:
                 print(f"Error processing result row: {e}")
                 continue
         
-        bot_db.commit()
         return ranked_urls, total_pages, has_more
     
     except Exception as e:
-        bot_db.rollback()
         print(f"Error ranking URLs: {str(e)}")
         raise
     finally:
-        try:
-            bot_db.query("DROP TEMPORARY TABLE IF EXISTS temp_keywords", auto_commit=False)
+        bot_db.close()
+
+def _ranked_ids(bot_db: MY_CUSTOM_BOT, keywords: List[str]) -> List[int]:
+    """Every matching UrlID, best first, from the configured ranking engine"""
+    if RANKING_ENGINE == "index":
+        if index_available():
+            try:
+                index = get_inverted_index()
+                index.refresh(bot_db)
+                return index.rank(keywords)
+            except Exception as e:
+                print(f"Inverted index ranking failed, using SQL: {str(e)}")
+        else:
+            print("NumPy is not installed, using SQL ranking engine")
+
+    rows = bot_db.query(
+        RANKED_IDS_QUERY.format(keyword_placeholders=_placeholders(len(keywords))),
+        tuple(keywords),
+        fetch=True
+    ) or []
+    return [int(row[0]) for row in rows]
+
+def _rank_by_ids(keywords: List[str], page_number: int, use_cache: bool) -> Tuple[List[Dict], int, bool]:
+    """
+    Rank by UrlID list: the full ordered list is computed once per keyword set
+    (and cached when use_cache is set), then each page's rows are fetched by UrlID
+    the first time that page is requested.
+    """
+    cache = get_result_cache()
+    entry = cache.get(keywords) if use_cache else None
+    results_per_page = RESULTS_PER_PAGE
+    offset = (page_number - 1) * results_per_page
+    bot_db = None
+    try:
+        if entry is None:
+            generation = cache.generation
+            bot_db = MY_CUSTOM_BOT()
+            ranked_ids = _ranked_ids(bot_db, keywords)
+            entry = cache.put(keywords, ranked_ids, generation) if use_cache else RankedEntry(ranked_ids)
+
+        page = entry.pages.get(page_number)
+        if page is None:
+            page_ids = entry.ranked_ids[offset:offset + results_per_page]
+            page_rows = {}
+            if page_ids:
+                bot_db = bot_db or MY_CUSTOM_BOT()
+                for row in bot_db.query(
+                    _rows_for_ids_query(len(keywords), len(page_ids)),
+                    (*keywords, *page_ids),
+                    fetch=True
+                ) or []:
+                    try:
+                        page_rows[int(row[0])] = _format_row(row)
+                    except Exception as e:
+                        print(f"Error processing result row: {e}")
+            page = [page_rows[url_id] for url_id in page_ids if url_id in page_rows]
+            entry.pages[page_number] = page
+
+        total_results = len(entry.ranked_ids)
+        total_pages = max(1, (total_results + results_per_page - 1) // results_per_page)
+        has_more = (page_number * results_per_page) < total_results and len(page) == results_per_page
+        return copy.deepcopy(page), total_pages, has_more
+
+    except Exception as e:
+        print(f"Error ranking URLs: {str(e)}")
+        raise
+    finally:
+        if bot_db:
             bot_db.close()
-        except Exception as e:
-            print(f"Error during cleanup: {str(e)}")
\ No newline at end of file
+
+def normalize_keywords(keywords: List[str]) -> List[str]:
+    """Lowercase, strip and dedupe keywords, keeping their order"""
+    return list(dict.fromkeys(kw.lower().strip() for kw in keywords if kw and kw.strip()))
+
+def _format_row(row: tuple) -> Dict:
+    """Convert a RANKING_SELECT row into the result dictionary used by the front end"""
+    (url_id, url, title, description, domain,
+     url_type, scrapable, search_engines, total,
+     text_matches, image_matches, keyword_details, _) = row
+
+    if isinstance(keyword_details, (bytes, bytearray)):
+        keyword_details = keyword_details.decode('utf-8')
+    kw_results = json.loads(keyword_details) if keyword_details else []
+    kw_results.sort(key=lambda kw: -int(kw.get('count') or 0))
+
+    # Ensure numeric values
+    total = int(total) if total is not None else 0
+    text_matches = int(text_matches) if text_matches is not None else 0
+    image_matches = int(image_matches) if image_matches is not None else 0
+
+    return {
+        'url_id': int(url_id),
+        'url': str(url or ""),
+        'title': str(title or ""),
+        'description': str(description or ""),
+        'domain': str(domain or ""),
+        'type': str(url_type or ""),
+        'scrapable': bool(scrapable),
+        'search_engines': [str(se) for se in (search_engines.split(',') if search_engines else [])],
+        'total_occurrences': total,
+        'text_matches': text_matches,
+        'image_matches': image_matches,
+        'keywords': [{
+            'keyword': str(kw.get('keyword') or ""),
+            'count': int(kw.get('count') or 0),
+            'source': str(kw.get('source') or "")
+        } for kw in kw_results]
+    }
@@ -0,0 +1,249 @@
+import logging
+import os
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+import psutil
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Warm browsers kept per pool; searches run one at a time, so one is usually enough
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+# A browser is restarted after loading this many pages ...
+DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", "50"))
+# ... or once its processes use this much more memory than right after startup
+DRIVER_MAX_MEMORY_GROWTH_MB = int(os.getenv("DRIVER_MAX_MEMORY_GROWTH_MB", "300"))
+# Seconds acquire() waits for a busy browser before giving up
+DRIVER_ACQUIRE_TIMEOUT = 120
+ACQUIRE_POLL = 0.5
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+_pools = []
+
+def chromedriver_path():
+    """Resolve (downloading if needed) the chromedriver binary once per process"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+def driver_pids(driver):
+    """PIDs of a driver's chromedriver process and every browser process it started"""
+    try:
+        service = psutil.Process(driver.service.process.pid)
+        return [service.pid] + [child.pid for child in service.children(recursive=True)]
+    except (AttributeError, psutil.Error):
+        return []
+
+def driver_memory_mb(driver):
+    """Resident memory of a driver's processes together, in MB"""
+    total = 0
+    for pid in driver_pids(driver):
+        try:
+            total += psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+class PooledDriver:
+    """A pooled browser and what it has done since it started"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.uses = 0
+        self.origins = set()  # Origins loaded since the last reset, whose storage reset clears
+        self.started_memory_mb = driver_memory_mb(driver)
+
+    def visited(self, url):
+        """Count a page load and remember its origin for the reset"""
+        self.pages += 1
+        parts = urlsplit(url or "")
+        if parts.scheme in ("http", "https") and parts.netloc:
+            self.origins.add(f"{parts.scheme}://{parts.netloc}")
+
+class DriverPool:
+    """
+    Warm browsers handed out one scrape at a time. factory() starts a browser;
+    acquire() returns an idle one (starting one while fewer than size exist) and
+    release() clears its cookies, cache and the storage of every origin it visited
+    (plus reset_origins) for the next scrape, or quits it once it has loaded
+    max_pages pages or grown by max_memory_growth_mb. Scrapes report page loads
+    through PooledDriver.visited().
+    """
+
+    def __init__(self, name, factory, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES,
+                 max_memory_growth_mb=DRIVER_MAX_MEMORY_GROWTH_MB, reset_origins=()):
+        self.name = name
+        self.factory = factory
+        self.reset_origins = set(reset_origins)
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self._idle = queue.LifoQueue()  # Most recently used first
+        self._drivers = []
+        self._starting = 0
+        self._lock = threading.Lock()
+        self._stats = {"acquisitions": 0, "waited": 0.0, "max_wait": 0.0, "cold_starts": 0,
+                       "started": 0, "recycled": 0}
+        _pools.append(self)
+
+    def _start(self):
+        """Start a browser in a slot already reserved through self._starting"""
+        try:
+            pooled = PooledDriver(self.factory())
+        finally:
+            with self._lock:
+                self._starting -= 1
+        with self._lock:
+            self._drivers.append(pooled)
+            self._stats["started"] += 1
+        return pooled
+
+    def _reserve(self):
+        with self._lock:
+            if len(self._drivers) + self._starting < self.size:
+                self._starting += 1
+                return True
+        return False
+
+    def warm(self, count=None):
+        """Start browsers up front so the first scrapes don't wait for them"""
+        for _ in range(self.size if count is None else count):
+            if not self._reserve():
+                break
+            self._idle.put(self._start())
+
+    def acquire(self, timeout=DRIVER_ACQUIRE_TIMEOUT):
+        """
+        Borrow a browser; give it back with release().
+
+        Raises:
+            queue.Empty: every browser stayed busy for timeout seconds
+        """
+        start = time.perf_counter()
+        cold = False
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve():
+                    cold = True
+                    pooled = self._start()
+                    break
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    raise
+                try:
+                    # Wake up now and then: a recycled browser frees a slot without returning to the queue
+                    pooled = self._idle.get(timeout=min(remaining, ACQUIRE_POLL))
+                except queue.Empty:
+                    continue
+            if self._alive(pooled):
+                break
+            logging.warning(f"{self.name} driver pool: replacing a browser that stopped responding")
+            self._discard(pooled)
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._stats["acquisitions"] += 1
+            self._stats["waited"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+            self._stats["cold_starts"] += cold
+        return pooled
+
+    def release(self, pooled, broken=False):
+        """Return a borrowed browser; broken (the scrape failed) quits it instead of reusing it"""
+        pooled.uses += 1
+        reason = "failed scrape" if broken else self._recycle_reason(pooled)
+        if not reason:
+            try:
+                self._reset(pooled.driver, pooled.origins | self.reset_origins)
+                pooled.origins.clear()
+            except Exception as e:
+                reason = f"reset failed: {e}"
+        if reason:
+            logging.info(f"{self.name} driver pool: recycling browser after {pooled.uses} uses "
+                         f"and {pooled.pages} pages ({reason})")
+            self._discard(pooled)
+            with self._lock:
+                self._stats["recycled"] += 1
+            return
+        self._idle.put(pooled)
+
+    def _recycle_reason(self, pooled):
+        if pooled.pages >= self.max_pages:
+            return f"{pooled.pages} pages"
+        growth = driver_memory_mb(pooled.driver) - pooled.started_memory_mb
+        if growth > self.max_memory_growth_mb:
+            return f"memory grew {growth:.0f} MB"
+        return None
+
+    @staticmethod
+    def _alive(pooled):
+        try:
+            pooled.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver, origins):
+        """Leave the browser as a fresh one would be: one blank tab, no cookies, cache or storage for origins"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get("about:blank")
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        for origin in sorted(origins):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+    def _discard(self, pooled):
+        with self._lock:
+            if pooled in self._drivers:
+                self._drivers.remove(pooled)
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def pids(self):
+        """Processes of every browser this pool holds, for kill_chrome to spare"""
+        with self._lock:
+            drivers = list(self._drivers)
+        return [pid for pooled in drivers for pid in driver_pids(pooled.driver)]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, browsers=len(self._drivers))
+        stats["mean_wait"] = stats["waited"] / stats["acquisitions"] if stats["acquisitions"] else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for pooled in drivers:
+            try:
+                pooled.driver.quit()
+            except Exception:
+                pass
+        self._idle = queue.LifoQueue()
+
+def pooled_pids():
+    """Processes of every pooled browser in this process"""
+    return {pid for pool in _pools for pid in pool.pids()}
+
+def log_driver_pool_report():
+    """Log acquisition latency and browser churn for every pool used so far"""
+    for pool in _pools:
+        stats = pool.stats()
+        if not stats["acquisitions"]:
+            continue
+        logging.info(f"{pool.name} driver pool: {stats['acquisitions']} acquisitions, "
+                     f"mean wait {stats['mean_wait'] * 1000:.0f} ms (max {stats['max_wait'] * 1000:.0f} ms), "
+                     f"{stats['cold_starts']} cold starts, {stats['started']} browsers started, "
+                     f"{stats['recycled']} recycled")
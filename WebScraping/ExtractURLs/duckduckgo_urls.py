@@ -1,111 +1,192 @@
 import requests
 from bs4 import BeautifulSoup
-import json
-from urllib.parse import urlparse, urljoin
-import time
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from InsertData.url_canonical import unwrap_redirect
+from ..pacing import get_pacer
 
-def scrape_duckduckgo(query, num_results):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    base_url = "https://duckduckgo.com/html/"
+try:
+    from lxml import html as lxml_html
+except ImportError:  # Optional: without lxml pages are parsed with BeautifulSoup's html.parser
+    lxml_html = None
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+BASE_URL = "https://duckduckgo.com/html/"
+# Responses DuckDuckGo's HTML endpoint sends instead of results when rate limiting
+THROTTLE_STATUS = (202, 403, 429)
+MAX_THROTTLE_RETRIES = 3
+# "lxml" or "html.parser"; lxml is used whenever it is installed
+PARSER = "lxml" if lxml_html is not None else "html.parser"
+
+# XPath equivalents of the BeautifulSoup lookups (class tests match one class token)
+_RESULT_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' result ')]"
+_TITLE_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' result__a ')]"
+_SNIPPET_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' result__snippet ')]"
+_AD_BADGE_XPATH = ".//span[@class='badge--ad js-badge--ad']"
+_NEXT_XPATH = "//input[@type='submit' and @class='btn btn--alt' and @value='Next']"
+
+_sessions = threading.local()
+
+def get_session() -> requests.Session:
+    """Keep-alive session for the calling thread, reused across pages and queries"""
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        _sessions.session = session
+    return session
+
+def resolve_result_url(href: Optional[str]) -> Optional[str]:
+    """Target of a result link; DuckDuckGo wraps them as //duckduckgo.com/l/?uddg=<target>"""
+    if not href:
+        return None
+    url = unwrap_redirect(href)
+    return "https:" + url if url.startswith("//") else url
+
+def _parse_lxml(page_html: str) -> Tuple[List[Dict], Optional[Dict]]:
+    tree = lxml_html.fromstring(page_html)
+    results = []
+    for div in tree.xpath(_RESULT_XPATH):
+        title_elem = div.xpath(_TITLE_XPATH)
+        snippet = div.xpath(_SNIPPET_XPATH)
+        results.append({
+            "url": resolve_result_url(title_elem[0].get("href")) if title_elem else None,
+            "title": title_elem[0].text_content().strip() if title_elem else None,
+            "description": snippet[0].text_content().strip() if snippet else None,
+            "is_ad": bool(div.xpath(_AD_BADGE_XPATH)),
+        })
+
+    next_form = None
+    next_button = tree.xpath(_NEXT_XPATH)
+    form = next_button[0].xpath("ancestor::form[1]") if next_button else []
+    if form:
+        next_form = {tag.get("name"): tag.get("value", "") for tag in form[0].xpath(".//input[@name]")}
+    return results, next_form
+
+def _parse_soup(page_html: str) -> Tuple[List[Dict], Optional[Dict]]:
+    soup = BeautifulSoup(page_html, 'html.parser')
+    results = []
+    for div in soup.find_all('div', class_='result'):
+        title_elem = div.find('a', class_='result__a')
+        snippet = div.find('a', class_='result__snippet')
+        results.append({
+            "url": resolve_result_url(title_elem.get('href')) if title_elem else None,
+            "title": title_elem.text.strip() if title_elem else None,
+            "description": snippet.text.strip() if snippet else None,
+            "is_ad": div.find('span', class_='badge--ad js-badge--ad') is not None,
+        })
+
+    next_form = None
+    next_button = soup.find('input', {'type': 'submit', 'class': 'btn btn--alt', 'value': 'Next'})
+    form = next_button.find_parent('form') if next_button else None
+    if form:
+        next_form = {tag['name']: tag.get('value', '') for tag in form.find_all('input') if tag.get('name')}
+    return results, next_form
+
+def parse_results_page(page_html: str, parser: str = PARSER) -> Tuple[List[Dict], Optional[Dict]]:
+    """
+    Parse one page of DuckDuckGo's HTML results.
+
+    Returns:
+        (results, next_form): one dict per result div with url (redirect resolved;
+        None if the result has no link), title, description and is_ad, in page order;
+        and the form fields that request the next page (None on the last page)
+    """
+    if parser == "lxml" and lxml_html is not None:
+        return _parse_lxml(page_html)
+    return _parse_soup(page_html)
+
+def scrape_duckduckgo(query, num_results, on_page=None):
+    # on_page(urls_added_from_page) -> bool may end paging early by returning False
+    session = get_session()
     params = {'q': query, 'kl': 'us-en'}
-    
+
     results = []
+    seen_urls = set()
     ad_urls_removed = 0
     ad_urls_details = {}
     line_counter = 1
     page = 1
-    
+    pacer = get_pacer("duckduckgo")
+    throttle_retries = 0
+
     try:
         while len(results) < num_results:
             print(f"Fetching page {page}...")  # Debug
-            
-            response = requests.get(base_url, headers=headers, params=params)
+
+            pacer.acquire()
+            response = session.get(BASE_URL, params=params)
+            if response.status_code in THROTTLE_STATUS and throttle_retries < MAX_THROTTLE_RETRIES:
+                throttle_retries += 1
+                pacer.throttled(f"HTTP {response.status_code}")
+                continue
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            search_results = soup.find_all('div', class_='result')
-            
+            pacer.succeeded()
+
+            search_results, next_form = parse_results_page(response.text)
+
             print(f"Found {len(search_results)} results on page {page}")  # Debug
-            
+
             if not search_results:
                 print("No results found, ending scrape")
                 break
-                
+
             new_results_added = 0
             for result in search_results:
                 if len(results) >= num_results:
                     break
-                    
-                # Ad detection
-                is_ad = result.find('span', class_='badge--ad js-badge--ad') is not None
-                
-                title_elem = result.find('a', class_='result__a')
-                if not title_elem:
-                    line_counter += 1
-                    continue
-                    
-                url = title_elem.get('href')
+
+                url = result['url']
                 if not url:
                     line_counter += 1
                     continue
-                    
+
                 domain = urlparse(url).netloc
-                
-                if is_ad:
+
+                # Ad detection
+                if result['is_ad']:
                     ad_urls_removed += 1
                     ad_urls_details[domain] = ad_urls_details.get(domain, 0) + 1
                     line_counter += 1
                     continue
-                    
-                title = title_elem.text.strip()
-                desc_elem = result.find('a', class_='result__snippet')
-                description = desc_elem.text.strip() if desc_elem else None
-                
-                if any(r['url'] == url for r in results):
+
+                if url in seen_urls:
                     line_counter += 1
                     continue
-                    
+                seen_urls.add(url)
+
                 results.append({
                     'url': url,
                     'domain': domain,
-                    'title': title,
-                    'description': description
+                    'title': result['title'],
+                    'description': result['description']
                 })
                 new_results_added += 1
                 line_counter += 1
-            
+
             if new_results_added == 0 and len(results) < num_results:
                 print("No new results added on this page, ending scrape")
                 break
-                
-            # Find the next page button and its parent form
-            next_button = soup.find('input', {'type': 'submit', 'class': 'btn btn--alt', 'value': 'Next'})
-            if not next_button:
-                print("No more pages available, ending scrape")
+
+            if on_page and not on_page([r['url'] for r in results[len(results) - new_results_added:]]):
+                print("Enough new results for this query, ending scrape")
                 break
-                
-            form = next_button.find_parent('form')
-            if not form:
-                print("Next button form not found, ending scrape")
+
+            # The Next button's form holds every input for the next request
+            if not next_form:
+                print("No more pages available, ending scrape")
                 break
-                
-            # Get all form inputs for the next request
-            form_data = {}
-            for input_tag in form.find_all('input'):
-                if input_tag.get('name'):
-                    form_data[input_tag['name']] = input_tag.get('value', '')
-            
+
             # Update params for next request
-            params = form_data
+            params = next_form
             page += 1
-            time.sleep(2)  # Be polite with delay between requests
-            
+
     except Exception as e:
         print(f"Error during scraping: {e}")
-    
+
     # Prepare statistics to match the provided structure
     stats = {
         'total_urls_found': line_counter - 1,
@@ -114,11 +195,11 @@ def scrape_duckduckgo(query, num_results):
         'final_urls_count': len(results),
         'pages_scraped': page - 1
     }
-    
+
     # Create the final JSON structure matching your example
     output = {
         'results': results,
         'statistics': stats
     }
-    
+
     return output
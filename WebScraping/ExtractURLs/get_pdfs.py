@@ -4,6 +4,7 @@ import webbrowser
 import pyautogui
 import platform
 import logging
+from ..pacing import pacing_config, wait_until
 
 def get_pdfs(query, engine, page, save_dir="WebScraping/ScreenCaptures"):
     """
@@ -33,21 +34,16 @@ def get_pdfs(query, engine, page, save_dir="WebScraping/ScreenCaptures"):
         elif engine == "yahoo":
             url = f"https://search.yahoo.com/search?p={query}&b={(page-1)*10+1}"
 
+        pacing = pacing_config(engine)
+
         # Open browser with timeout handling
         webbrowser.open(url, new=2)
-        start_time = time.time()
-        while time.time() - start_time < 10:  # 10 second timeout
-            try:
-                if pyautogui.getActiveWindowTitle():
-                    break
-            except:
-                pass
-            time.sleep(1)
-        else:
+        if not wait_until(pyautogui.getActiveWindowTitle, 10):  # 10 second timeout
             raise TimeoutError("Browser didn't open in time")
 
-        # Wait for page to load (with more precise waiting)
-        time.sleep(3)
+        # Wait for page to load: results pages put the query in the window title
+        wait_until(lambda: query.lower() in (pyautogui.getActiveWindowTitle() or "").lower(), 3,
+                   engine=engine, baseline=3)
 
         # OS-specific print handling (original logic)
         if platform.system() == "Darwin":  # macOS
@@ -57,7 +53,7 @@ def get_pdfs(query, engine, page, save_dir="WebScraping/ScreenCaptures"):
             pyautogui.hotkey("command", "p")
         else:  # Windows/Linux
             pyautogui.hotkey("ctrl", "p")
-        time.sleep(1)
+        time.sleep(pacing["print_dialog"])
 
         # Save as PDF (original logic with safeguards)
         pdf_path = os.path.join(save_dir, f"{engine}_page_{page}.pdf")
@@ -67,21 +63,21 @@ def get_pdfs(query, engine, page, save_dir="WebScraping/ScreenCaptures"):
             os.remove(pdf_path)
 
         pyautogui.press("enter")  # Select PDF option
-        time.sleep(3)
+        time.sleep(pacing["save_dialog"])
 
         # Type filename (platform-specific as original)
         if platform.system() == "Darwin":
             pyautogui.write(f"{engine}_page_{page}.pdf")
         else:
             pyautogui.write(os.path.abspath(pdf_path))
-        time.sleep(3)
+        time.sleep(pacing["filename_entry"])
         
         # Finalize save
         pyautogui.press("enter")
-        time.sleep(0.5)
 
         # Verify PDF was created
-        if not os.path.exists(pdf_path):
+        if not wait_until(lambda: os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 0, 10,
+                          engine=engine, baseline=0.5):
             raise FileNotFoundError(f"PDF not created at {pdf_path}")
 
         return True
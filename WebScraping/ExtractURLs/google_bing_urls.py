@@ -1,33 +1,106 @@
 import re
+import bisect
 import json
 import os
 from urllib.parse import urlparse, urlunparse
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import threading
 from pdf2image import convert_from_path
+from PIL import Image
 import pytesseract
 import platform
+from InsertData.url_canonical import trim_ocr_debris
 
-def extract_search_results(pdf_path, output_json_path=None):
+if platform.system() == "Darwin":
+    pytesseract.pytesseract.tesseract_cmd = '/opt/homebrew/bin/tesseract'
+
+# Processes running tesseract on the pages of one SERP (1 = OCR in the calling thread)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "1"))
+
+# Regular expressions for URL detection and processing
+BASE_URL_PATTERN = re.compile(r'\bhttps?://(?:www\.)?[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)+')
+CONTINUATION_PATTERN = re.compile(r'\s*(?:>|»)\s*')
+PATH_SEGMENT_PATTERN = re.compile(r'[^\s>»]+')
+SEARCH_ENGINE_PATTERN = re.compile(r'(google|bing|duckduckgo|yahoo)\.', re.IGNORECASE)
+URL_LIKE_PATTERN = re.compile(r'(https?://|www\.|\.com|\.org|\.net|/)')
+# Lines that are an ad label and nothing else ("Sponsored", "Ad · Block ads ..."), so prose
+# that mentions ads, like "how each service handles ads", does not count
+AD_MARKER_PATTERN = re.compile(r'^\s*(?:sponsored|ad|promoted|advertisement)\b\s*(?:[·•:]|$)', re.IGNORECASE)
+# Headings over a group of ads ("Ads", "Sponsored results"); every URL below one is an ad
+AD_HEADING_PATTERN = re.compile(r'^\s*(?:ads|sponsored\s+(?:results|ads|links))\s*(?:[·•:]|$)', re.IGNORECASE)
+# Section headings that start organic content, ending an ad group
+ORGANIC_SECTION_PATTERN = re.compile(
+    r'^\s*(?:people also ask|people also search for|related searches|search results|web results|'
+    r'top stories|explore further)\s*$', re.IGNORECASE)
+# Furthest an ad label may sit from the URL line it marks
+AD_WINDOW = 6
+# Most URLs one ad heading marks when no boundary ends its group first (engines show up to 4)
+AD_BLOCK_MAX = 4
+
+_ocr_pool = None
+_ocr_pool_workers = 0
+_ocr_pool_lock = threading.Lock()
+
+def ocr_image(image):
+    """Tesseract text for one page image (module level so pool processes can run it)"""
+    return pytesseract.image_to_string(image)
+
+def _get_ocr_pool(workers):
+    """Shared process pool, recreated only when the worker count changes"""
+    global _ocr_pool, _ocr_pool_workers
+    with _ocr_pool_lock:
+        if _ocr_pool is None or _ocr_pool_workers != workers:
+            if _ocr_pool is not None:
+                _ocr_pool.shutdown(wait=False)
+            _ocr_pool = ProcessPoolExecutor(max_workers=workers)
+            _ocr_pool_workers = workers
+        return _ocr_pool
+
+def ocr_images(images, workers=None):
+    """OCR text of each image, in input order, using up to workers processes"""
+    workers = OCR_WORKERS if workers is None else workers
+    if workers > 1 and len(images) > 1:
+        return list(_get_ocr_pool(workers).map(ocr_image, images))
+    return [ocr_image(image) for image in images]
+
+def load_page_images(source):
+    """
+    Images to OCR from a PDF path, image bytes (e.g. PNG), a PIL image,
+    or a list of any of those. Only PDF paths are rasterized.
     """
-    Extract search results from a PDF containing search engine results pages (SERPs).
+    if isinstance(source, (list, tuple)):
+        return [image for item in source for image in load_page_images(item)]
+    if isinstance(source, (bytes, bytearray)):
+        return [Image.open(BytesIO(source))]
+    if isinstance(source, Image.Image):
+        return [source]
+
+    # Convert PDF to images
+    if platform.system() == "Darwin":
+        return convert_from_path(
+            source,
+            poppler_path="/opt/homebrew/bin"  # ← Your actual path
+        )
+    return convert_from_path(source)
+
+def extract_search_results(source, output_json_path=None, ocr_workers=None):
+    """
+    Extract search results from search engine results pages (SERPs).
     Handles both organic results and ads, with statistics tracking.
     
     Args:
-        pdf_path: Path to the PDF file to process
+        source: Path to a PDF of the SERP, or the page already in memory as
+            image bytes / a PIL image (or a list of them), which skips rasterization
         output_json_path: Optional path to JSON file to save/merge results
+        ocr_workers: Processes to OCR pages with (default OCR_WORKERS); pages are
+            still parsed in order, so the output matches serial OCR
         
     Returns:
         Dictionary containing extracted results and statistics
     """
-    # Convert PDF to images and process each page
-    if platform.system() == "Darwin":
-        pytesseract.pytesseract.tesseract_cmd = '/opt/homebrew/bin/tesseract'
-        images = convert_from_path(
-            pdf_path,
-            poppler_path="/opt/homebrew/bin"  # ← Your actual path
-        )
-    else:
-        images = convert_from_path(pdf_path)
+    images = load_page_images(source)
     new_results = []
     new_stats = {
         'total_urls_found': 0,
@@ -36,74 +109,8 @@ def extract_search_results(pdf_path, output_json_path=None):
         'final_urls_count': 0
     }
     
-    # Regular expressions for URL detection and processing
-    base_url_pattern = re.compile(r'\bhttps?://(?:www\.)?[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)+')
-    continuation_pattern = re.compile(r'\s*(?:>|»)\s*')
-    search_engine_pattern = re.compile(r'(google|bing|duckduckgo|yahoo)\.', re.IGNORECASE)
-
-    for img in images:
-        text = pytesseract.image_to_string(img)
-        lines = text.split("\n")
-
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            base_match = base_url_pattern.search(line)
-            
-            if base_match and not search_engine_pattern.search(line):
-                new_stats['total_urls_found'] += 1
-                url_start = base_match.start()
-                url_parts = [base_match.group(0), '', '', '', '', '']
-                remaining_text = line[base_match.end():]
-                
-                # Handle URL continuations (like path segments separated by >)
-                while True:
-                    sep_match = continuation_pattern.match(remaining_text)
-                    if not sep_match:
-                        break
-                    remaining_text = remaining_text[sep_match.end():]
-                    path_match = re.match(r'[^\s>»]+', remaining_text)
-                    if not path_match:
-                        break
-                    url_parts[2] = (url_parts[2] + '/' + path_match.group(0)).lstrip('/')
-                    remaining_text = remaining_text[path_match.end():]
-                
-                full_url = urlunparse(url_parts)
-                normalized_url = normalize_url(full_url)
-                
-                # Check if this is an ad URL
-                if is_ad_url(i, lines):
-                    new_stats['ad_urls_removed'] += 1
-                    domain = urlparse(normalized_url).netloc
-                    new_stats['ad_urls_details'][domain] += 1
-                    i += 1
-                    continue
-                
-                parsed_url = urlparse(normalized_url)
-                
-                # Get title from next non-URL lines
-                title = None
-                j = i + 1
-                while j < len(lines) and (title is None or is_url_like(title)):
-                    if lines[j] and not is_url_like(lines[j]):
-                        title = clean_text(lines[j])
-                    j += 1
-                
-                # Get description from next non-URL lines after title
-                description = None
-                while j < len(lines) and (description is None or is_url_like(description)):
-                    if lines[j] and not is_url_like(lines[j]):
-                        description = clean_text(lines[j])
-                    j += 1
-                
-                if title or description:
-                    new_results.append({
-                        "url": normalized_url,
-                        "domain": parsed_url.hostname,
-                        "title": title,
-                        "description": description
-                    })
-            i += 1
+    for text in ocr_images(images, ocr_workers):
+        parse_serp_lines(text.split("\n"), new_results, new_stats)
 
     new_stats['final_urls_count'] = len(new_results)
     new_stats['ad_urls_details'] = dict(new_stats['ad_urls_details'])
@@ -156,9 +163,118 @@ def extract_search_results(pdf_path, output_json_path=None):
     
     return output_data
 
+def parse_serp_lines(lines, new_results, new_stats):
+    """
+    Resolve the results on one OCR page in a single pass. Every line is
+    labelled once (URL, ad label, ad heading, section boundary, title/description
+    text). Each ad label is given to the nearest URL line within AD_WINDOW, so a
+    "Sponsored" above one result or an "Ad ·" under another does not spill onto
+    its neighbours. An ad heading marks every URL below it up to the first
+    boundary: the next ad label or heading, an organic section heading, two
+    blank lines in a row, or AD_BLOCK_MAX URLs. Every URL takes its title and
+    description from a next-text index instead of walking forward.
+
+    Args:
+        lines: OCR text of the page split into lines
+        new_results: List the organic results are appended to
+        new_stats: Statistics dict updated in place (see extract_search_results)
+    """
+    n = len(lines)
+    url_matches = {}
+    ad_label_lines = []
+    ad_heading_lines = []
+    boundary_lines = []  # Where an ad heading's group ends
+    texts = [None] * (n + 1)  # Title/description text per line (texts[n] stays None)
+    for k, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            if k > 0 and not lines[k - 1].strip():
+                boundary_lines.append(k)
+            continue
+        # Substring checks first: the patterns only run on lines that could match
+        if 'http' in line:
+            base_match = BASE_URL_PATTERN.search(line)
+            if base_match and not SEARCH_ENGINE_PATTERN.search(line):
+                url_matches[k] = base_match
+        lowered = stripped.lower()
+        if lowered.startswith(('ad', 'sponsored', 'promoted')):
+            if AD_HEADING_PATTERN.match(lowered):
+                ad_heading_lines.append(k)
+                boundary_lines.append(k)
+            elif AD_MARKER_PATTERN.match(lowered):
+                ad_label_lines.append(k)
+                boundary_lines.append(k)
+        elif len(stripped) < 30 and ORGANIC_SECTION_PATTERN.match(stripped):
+            boundary_lines.append(k)
+        if stripped[0] not in 'hw./' or not URL_LIKE_PATTERN.match(stripped):
+            # All clean_text changes on a line that is not URL-like
+            texts[k] = (stripped[:-1] if stripped[-1] in '.,;:!?' else stripped) or None
+
+    # next_text[k]: first line at or after k with text (n if none)
+    next_text = [n] * (n + 2)
+    for k in range(n - 1, -1, -1):
+        next_text[k] = k if texts[k] is not None else next_text[k + 1]
+
+    # Give each ad label to the closest URL line, the following one on a tie
+    url_lines = list(url_matches)
+    ad_lines = set()
+    u = 0
+    for k in ad_label_lines:
+        while u < len(url_lines) and url_lines[u] < k:
+            u += 1
+        before = k - url_lines[u - 1] if u > 0 else n + 1
+        after = url_lines[u] - k if u < len(url_lines) else n + 1
+        if min(before, after) <= AD_WINDOW:
+            ad_lines.add(url_lines[u] if after <= before else url_lines[u - 1])
+
+    # Give each ad heading the URLs below it, up to the next boundary line
+    for k in ad_heading_lines:
+        end = boundary_lines[bisect.bisect_right(boundary_lines, k)] if boundary_lines[-1] > k else n
+        first = bisect.bisect_right(url_lines, k)
+        ad_lines.update(line for line in url_lines[first:first + AD_BLOCK_MAX] if line < end)
+
+    for i, base_match in url_matches.items():
+        new_stats['total_urls_found'] += 1
+        normalized_url = normalize_url(join_url_segments(base_match, lines[i]))
+        parsed_url = urlparse(normalized_url)
+
+        if i in ad_lines:
+            new_stats['ad_urls_removed'] += 1
+            new_stats['ad_urls_details'][parsed_url.netloc] += 1
+            continue
+
+        title_line = next_text[i + 1]
+        title = texts[title_line]
+        description = texts[next_text[title_line + 1]]
+        if title or description:
+            new_results.append({
+                "url": normalized_url,
+                "domain": parsed_url.hostname,
+                "title": title,
+                "description": description
+            })
+
+def join_url_segments(base_match, line):
+    """URL from a base match plus the path segments OCR shows after it (like site > docs > page)"""
+    url_parts = [base_match.group(0), '', '', '', '', '']
+    remaining_text = line[base_match.end():]
+    while True:
+        sep_match = CONTINUATION_PATTERN.match(remaining_text)
+        if not sep_match:
+            break
+        remaining_text = remaining_text[sep_match.end():]
+        path_match = PATH_SEGMENT_PATTERN.match(remaining_text)
+        if not path_match:
+            break
+        url_parts[2] = (url_parts[2] + '/' + path_match.group(0)).lstrip('/')
+        remaining_text = remaining_text[path_match.end():]
+    return urlunparse(url_parts)
+
 def normalize_url(url):
     """
-    Normalize URLs by handling special cases and malformations.
+    Normalize URLs by handling special cases and malformations: colons OCR read
+    in place of path slashes, and the punctuation a truncated breadcrumb leaves
+    at the end.
     
     Args:
         url: The URL string to normalize
@@ -182,11 +298,13 @@ def normalize_url(url):
     
     # Recombine the parts
     modified_url = before_colon + modified_after_colon
-    return modified_url
+    return trim_ocr_debris(modified_url)
 
 def is_ad_url(line_number, text_lines):
     """
     Detect if a URL is an advertisement based on surrounding text.
+    Rescans the window per URL with substring tests; parse_serp_lines labels
+    lines once instead. Kept for comparison in benchmarks.serp_classifier.
     
     Args:
         line_number: The line number where the URL was found
@@ -225,7 +343,7 @@ def is_url_like(text):
     """
     if not text:
         return False
-    return bool(re.match(r'(https?://|www\.|\.com|\.org|\.net|/)', text.strip()))
+    return bool(URL_LIKE_PATTERN.match(text.strip()))
 
 def clean_text(text):
     """
@@ -0,0 +1,145 @@
+import base64
+import os
+import queue
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from .driver_pool import chromedriver_path
+
+# Headless browsers capturing SERP pages side by side; scrape_web captures one page per
+# engine at a time, so it uses at most one per engine (google and bing)
+CAPTURE_TABS = int(os.getenv("CAPTURE_TABS", "2"))
+# Seconds allowed for one SERP page to load
+PAGE_LOAD_TIMEOUT = 20
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+
+# SERP URL per engine; {query} is URL-quoted, {start} is the 0-based result offset.
+# Override (e.g. with a local fixture server) through url_templates.
+SERP_URL_TEMPLATES = {
+    "google": "https://www.google.com/search?q={query}&start={start}",
+    "bing": "https://www.bing.com/search?q={query}&first={start_1}",
+    "duckduckgo": "https://duckduckgo.com/?q={query}&s={start_30}",
+    "yahoo": "https://search.yahoo.com/search?p={query}&b={start_1}",
+}
+
+# Full-page screenshots: device pixels per CSS pixel (2 keeps small SERP text legible
+# to tesseract) and the tallest page captured, in CSS pixels
+SCREENSHOT_SCALE = 2
+MAX_SCREENSHOT_HEIGHT = 8000
+
+# Page.printToPDF parameters; a tall page keeps each SERP to as few PDF pages as possible
+PRINT_OPTIONS = {
+    "printBackground": True,
+    "paperWidth": 8.5,
+    "paperHeight": 22,
+    "marginTop": 0.2,
+    "marginBottom": 0.2,
+}
+
+def serp_url(engine, query, page, url_templates=None):
+    """Results page URL for a 1-based page number"""
+    template = (url_templates or SERP_URL_TEMPLATES)[engine]
+    start = (page - 1) * 10
+    return template.format(query=urllib.parse.quote_plus(query), page=page,
+                           start=start, start_1=start + 1, start_30=(page - 1) * 30)
+
+def new_headless_driver():
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1280,2000")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+class HeadlessCapture:
+    """
+    Pool of headless Chrome instances saving SERP pages through the DevTools
+    protocol instead of the desktop print dialog. Each capture borrows one browser,
+    so up to `tabs` pages load and print at once. Browsers start on first use.
+    """
+
+    def __init__(self, tabs=CAPTURE_TABS, url_templates=None):
+        self.tabs = max(1, tabs)
+        self.url_templates = url_templates
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _borrow(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._drivers) < self.tabs:
+                driver = new_headless_driver()
+                self._drivers.append(driver)
+                return driver
+        return self._idle.get()
+
+    def print_pdf(self, url):
+        """Load url in a pooled browser and return it printed to PDF bytes"""
+        driver = self._borrow()
+        try:
+            driver.get(url)
+            result = driver.execute_cdp_cmd("Page.printToPDF", PRINT_OPTIONS)
+            return base64.b64decode(result["data"])
+        finally:
+            self._idle.put(driver)
+
+    def screenshot_png(self, url):
+        """Load url in a pooled browser and return a full-page PNG screenshot"""
+        driver = self._borrow()
+        try:
+            driver.get(url)
+            metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+            size = metrics.get("cssContentSize") or metrics["contentSize"]
+            result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+                "format": "png",
+                "captureBeyondViewport": True,
+                "clip": {"x": 0, "y": 0, "width": size["width"],
+                         "height": min(size["height"], MAX_SCREENSHOT_HEIGHT), "scale": SCREENSHOT_SCALE},
+            })
+            return base64.b64decode(result["data"])
+        finally:
+            self._idle.put(driver)
+
+    def capture_png(self, query, engine, page):
+        """Screenshot one SERP page and return the PNG bytes without touching disk"""
+        return self.screenshot_png(serp_url(engine, query, page, self.url_templates))
+
+    def capture(self, query, engine, page, save_dir="WebScraping/ScreenCaptures"):
+        """
+        Save one SERP page as {engine}_page_{page}.pdf in save_dir, the file
+        get_pdfs would have produced.
+
+        Returns:
+            Path of the written PDF
+        """
+        os.makedirs(save_dir, exist_ok=True)
+        pdf_path = os.path.join(save_dir, f"{engine}_page_{page}.pdf")
+        data = self.print_pdf(serp_url(engine, query, page, self.url_templates))
+        with open(pdf_path, "wb") as f:
+            f.write(data)
+        return pdf_path
+
+    def capture_many(self, query, engine, pages, save_dir="WebScraping/ScreenCaptures"):
+        """Capture several pages of one engine in parallel; returns {page: pdf_path}"""
+        with ThreadPoolExecutor(max_workers=self.tabs) as pool:
+            paths = pool.map(lambda page: self.capture(query, engine, page, save_dir), pages)
+            return dict(zip(pages, paths))
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._idle = queue.Queue()
@@ -5,7 +5,9 @@ import platform
 import psutil
 import os
 
-def kill_chrome():
+def kill_chrome(spare_pids=()):
+    # spare_pids: processes to leave running (warm browsers from driver_pool.pooled_pids())
+    spare_pids = set(spare_pids)
     os_name = platform.system()
     chrome_names = {
         'Windows': 'chrome.exe',
@@ -21,6 +23,8 @@ def kill_chrome():
     killed = 0
     for proc in psutil.process_iter(['pid', 'name']):
         try:
+            if proc.info['pid'] in spare_pids:
+                continue
             if target_name.lower() in proc.info['name'].lower():
                 proc.kill()
                 print(f"Closed process {proc.info['name']} with PID {proc.info['pid']}")
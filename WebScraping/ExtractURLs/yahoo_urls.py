@@ -1,4 +1,7 @@
 import json
+import atexit
+import os
+import threading
 import urllib.parse
 import time
 from urllib.parse import urlparse
@@ -6,22 +9,76 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from .driver_pool import DriverPool, chromedriver_path
+from ..pacing import get_pacer, wait_until
 
-def setup_driver(headless=True):
+# Seconds to wait for organic results before treating the page as empty/blocked
+RESULTS_TIMEOUT = 10
+MAX_THROTTLE_RETRIES = 3
+# Lightweight profile: eager page loads (DOM ready, subresources still loading) and
+# images, media, fonts and trackers blocked. Set YAHOO_LIGHT_PROFILE=0 to load pages in full.
+LIGHT_PROFILE = os.getenv("YAHOO_LIGHT_PROFILE", "1") != "0"
+# Network.setBlockedURLs patterns for the lightweight profile; stylesheets still load
+# because the extracted text depends on what the page's CSS hides
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*doubleclick.net*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*analytics.yahoo.com*", "*ads.yahoo.com*", "*scorecardresearch.com*",
+    "*bat.bing.com*", "*facebook.net*", "*criteo.com*",
+]
+ADS_CONTAINER_XPATH = '/html/body/div[1]/div[3]/div/div/div[1]/div/div/div/ol[1]'
+# Everything a results page yields, read in one round trip: organic results, the
+# ads container's items and the next page link (innerText is what WebElement.text reports)
+EXTRACT_PAGE_JS = """
+const text = el => el ? el.innerText : null;
+const row = (item, titleSelector, descriptionSelector) => {
+    const title = item.querySelector(titleSelector), link = item.querySelector("a[href]");
+    return title && link ? {url: link.href, title: title.innerText,
+                            description: text(item.querySelector(descriptionSelector))} : null;
+};
+const organic = [...document.querySelectorAll("div.algo-sr")]
+    .map(item => row(item, "h3.title", "div.compText")).filter(Boolean);
+const container = document.evaluate(arguments[0], document, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const ads = container ? [...container.children].filter(item => item.tagName === "LI")
+    .map(item => row(item, "h3", "p")).filter(Boolean) : [];
+const next = document.querySelector("a.next");
+return {organic: organic, ads: ads, next: next && next.hasAttribute("href") ? next.href : null};
+"""
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+def setup_driver(headless=True, light=LIGHT_PROFILE):
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless")
+    if light:
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920x1080")
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+        service=Service(chromedriver_path()),
         options=chrome_options
     )
+    if light:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
     return driver
 
+def get_driver_pool():
+    """Process-wide pool of warm headless browsers shared by Yahoo scrapes"""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool("yahoo", setup_driver, reset_origins=("https://search.yahoo.com",))
+            atexit.register(_driver_pool.close)
+        return _driver_pool
+
 def clean_text(text):
     """Clean text by removing unwanted characters and prefixes"""
     if not text:
@@ -35,94 +92,74 @@ def clean_text(text):
     
     return text
 
-def scrape_ads_container(driver):
-    ads_data = []
-    try:
-        container = driver.find_element(By.XPATH, '/html/body/div[1]/div[3]/div/div/div[1]/div/div/div/ol[1]')
-        ad_items = container.find_elements(By.XPATH, './li')
-        
-        for ad in ad_items:
-            try:
-                title = clean_text(ad.find_element(By.XPATH, './/h3').text)
-                url = ad.find_element(By.XPATH, './/a').get_attribute('href')
-                domain = urlparse(url).netloc
-                
-                try:
-                    description = clean_text(ad.find_element(By.XPATH, './/p').text)
-                except:
-                    description = None
-                
-                ads_data.append({
-                    "url": url,
-                    "domain": domain,
-                    "title": title,
-                    "description": description
-                })
-            except Exception as e:
-                print(f"Error processing ad item: {e}")
-    except Exception as e:
-        print(f"Error finding ads container: {e}")
-    return ads_data
+def _result_rows(items):
+    return [{
+        "url": item["url"],
+        "domain": urlparse(item["url"]).netloc,
+        "title": clean_text(item["title"]),
+        "description": clean_text(item["description"])
+    } for item in items]
 
-def scrape_organic_results(driver):
-    organic_data = []
-    try:
-        organic_items = driver.find_elements(By.CSS_SELECTOR, "div.algo-sr")
-        
-        for item in organic_items:
-            try:
-                title = clean_text(item.find_element(By.CSS_SELECTOR, "h3.title").text)
-                url = item.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-                domain = urlparse(url).netloc
-                
-                try:
-                    description = clean_text(item.find_element(By.CSS_SELECTOR, "div.compText").text)
-                except:
-                    description = None
-                
-                organic_data.append({
-                    "url": url,
-                    "domain": domain,
-                    "title": title,
-                    "description": description
-                })
-            except Exception as e:
-                print(f"Error processing organic result: {e}")
-    except Exception as e:
-        print(f"Error finding organic results: {e}")
-    return organic_data
+def extract_page(driver):
+    """
+    Organic results, ads and the next page URL from one execute_script call
+    instead of a find_element round trip per field.
 
-def get_next_page(driver):
+    Returns:
+        (organic, ads, next_url)
+    """
     try:
-        next_button = driver.find_element(By.CSS_SELECTOR, "a.next")
-        return next_button.get_attribute("href")
-    except NoSuchElementException:
-        return None
+        page = driver.execute_script(EXTRACT_PAGE_JS, ADS_CONTAINER_XPATH)
+    except Exception as e:
+        print(f"Error extracting results page: {e}")
+        return [], [], None
+    return _result_rows(page["organic"]), _result_rows(page["ads"]), page["next"]
 
-def scrape_yahoo_search(query, num_results=10):
-    driver = setup_driver()
+def scrape_yahoo_search(query, num_results=10, on_page=None):
+    # on_page(organic_urls_from_page) -> bool may end paging early by returning False
+    pool = get_driver_pool()
+    pooled = pool.acquire()
+    driver = pooled.driver
+    broken = False
     base_url = f"https://search.yahoo.com/search?p={urllib.parse.quote(query)}"
     current_url = base_url
     all_organic = []
     all_ads = []
+    pacer = get_pacer("yahoo")
+    throttle_retries = 0
     
     try:
         while current_url and len(all_organic) < num_results:
             print(f"Scraping page... Current results: {len(all_organic)}/{num_results}")
+            pacer.acquire()
+            page_start = time.perf_counter()
             driver.get(current_url)
-            time.sleep(2)
+            pooled.visited(driver.current_url)
+            loaded = time.perf_counter()
+            if wait_until(lambda: driver.find_elements(By.CSS_SELECTOR, "div.algo-sr"), RESULTS_TIMEOUT,
+                          engine="yahoo", baseline=2):
+                pacer.succeeded()
+            elif throttle_retries < MAX_THROTTLE_RETRIES and any(
+                    marker in driver.page_source.lower() for marker in ("captcha", "unusual traffic")):
+                throttle_retries += 1
+                pacer.throttled("challenge page")
+                continue
+            ready = time.perf_counter()
             
-            page_ads = scrape_ads_container(driver)
+            page_organic, page_ads, next_url = extract_page(driver)
             all_ads.extend(page_ads)
-            
-            page_organic = scrape_organic_results(driver)
+            done = time.perf_counter()
+            print(f"Yahoo page latency: load {(loaded - page_start) * 1000:.0f} ms, "
+                  f"results {(ready - loaded) * 1000:.0f} ms, extract {(done - ready) * 1000:.0f} ms")
             
             remaining = num_results - len(all_organic)
             if remaining > 0:
                 all_organic.extend(page_organic[:remaining])
             
-            current_url = get_next_page(driver)
-            time.sleep(1)
+            if on_page and not on_page([result["url"] for result in page_organic[:remaining]]):
+                break
+            
+            current_url = next_url
         
         # Process ad domains for statistics
         ad_domains = {}
@@ -142,5 +179,8 @@ def scrape_yahoo_search(query, num_results=10):
         }
         
         return results_data
+    except Exception:
+        broken = True
+        raise
     finally:
-        driver.quit()
+        pool.release(pooled, broken)
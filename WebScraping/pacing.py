@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+
+# Pacing per engine:
+#   rate/burst      token bucket for SERP page requests (pages per second, pages allowed back to back)
+#   baseline        fixed sleep the bucket replaces, used to report idle time saved
+#   backoff_base    first penalty in seconds after the engine signals throttling (doubles per signal)
+#   backoff_max     ceiling for that penalty
+#   print_dialog, save_dialog, filename_entry
+#                   settle times for the browser print dialog steps (GUI engines only)
+DEFAULT_PACING = {
+    "rate": 0.5,
+    "burst": 1,
+    "baseline": 2.0,
+    "backoff_base": 5.0,
+    "backoff_max": 60.0,
+    "print_dialog": 1.0,
+    "save_dialog": 3.0,
+    "filename_entry": 3.0,
+}
+ENGINE_PACING = {
+    "google": {},
+    "bing": {},
+    "duckduckgo": {"rate": 0.5, "burst": 1},
+    "yahoo": {"rate": 1.0, "burst": 1, "baseline": 1.0},
+}
+# Seconds between condition checks in wait_until
+POLL_INTERVAL = 0.1
+
+def pacing_config(engine):
+    """DEFAULT_PACING overlaid with ENGINE_PACING[engine]"""
+    return {**DEFAULT_PACING, **ENGINE_PACING.get(engine, {})}
+
+class EnginePacer:
+    """
+    Token bucket for one engine's page requests plus exponential backoff that is
+    only armed when the engine reports throttling. Tracks time actually waited
+    against the fixed sleeps the waits replaced.
+    """
+
+    def __init__(self, engine):
+        config = pacing_config(engine)
+        self.engine = engine
+        self.config = config
+        self.tokens = float(config["burst"])
+        self.backoff = 0.0
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.waits = 0
+        self.waited = 0.0
+        self.baseline = 0.0
+        self.throttle_signals = 0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the engine may send its next page request"""
+        with self._lock:
+            now = time.monotonic()
+            rate = self.config["rate"]
+            self.tokens = min(float(self.config["burst"]), self.tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            self.tokens -= 1  # Reserve now; a negative balance is the wait owed
+            wait = max(-self.tokens / rate if self.tokens < 0 else 0.0, self.blocked_until - now)
+            # The fixed sleeps sat between requests, so the first request replaced none
+            baseline = self.config["baseline"] if self.requests else 0.0
+            self.requests += 1
+        if wait > 0:
+            time.sleep(wait)
+        self.record_wait(wait, baseline)
+
+    def throttled(self, reason=""):
+        """The engine answered with a rate-limit response; back off before the next request"""
+        with self._lock:
+            self.throttle_signals += 1
+            self.backoff = min(self.config["backoff_max"], max(self.config["backoff_base"], self.backoff * 2))
+            self.blocked_until = time.monotonic() + self.backoff
+        logging.warning(f"{self.engine} throttled{f' ({reason})' if reason else ''}, backing off {self.backoff:.1f}s")
+
+    def succeeded(self):
+        """A request went through normally; drop any backoff"""
+        with self._lock:
+            self.backoff = 0.0
+
+    def record_wait(self, waited, baseline):
+        with self._lock:
+            self.waits += 1
+            self.waited += waited
+            self.baseline += baseline
+
+    def stats(self):
+        with self._lock:
+            return {"waits": self.waits, "waited": self.waited, "baseline": self.baseline,
+                    "saved": self.baseline - self.waited, "throttle_signals": self.throttle_signals}
+
+_pacers = {}
+_pacers_lock = threading.Lock()
+
+def get_pacer(engine):
+    """Return the process-wide pacer for engine"""
+    with _pacers_lock:
+        if engine not in _pacers:
+            _pacers[engine] = EnginePacer(engine)
+        return _pacers[engine]
+
+def wait_until(condition, timeout, engine=None, baseline=None, poll=POLL_INTERVAL):
+    """
+    Poll condition() until it returns a truthy value or timeout seconds pass.
+    Exceptions from condition() count as not yet. If engine and baseline are
+    given, the wait is recorded against that fixed sleep for the savings report.
+
+    Returns:
+        The truthy value, or None on timeout
+    """
+    start = time.monotonic()
+    result = None
+    while True:
+        try:
+            result = condition()
+        except Exception:
+            result = None
+        if result or time.monotonic() - start >= timeout:
+            break
+        time.sleep(poll)
+    if engine and baseline is not None:
+        get_pacer(engine).record_wait(time.monotonic() - start, baseline)
+    return result or None
+
+def reset_pacing_stats():
+    """Start a fresh savings report (pacers keep their token and backoff state)"""
+    with _pacers_lock:
+        for pacer in _pacers.values():
+            with pacer._lock:
+                pacer.requests = 0
+                pacer.waits = 0
+                pacer.waited = 0.0
+                pacer.baseline = 0.0
+                pacer.throttle_signals = 0
+
+def log_pacing_report():
+    """Log per-engine waits against the fixed sleeps they replaced"""
+    with _pacers_lock:
+        pacers = list(_pacers.values())
+    total_saved = 0.0
+    for pacer in pacers:
+        stats = pacer.stats()
+        total_saved += stats["saved"]
+        logging.info(f"{pacer.engine} pacing: waited {stats['waited']:.1f}s over {stats['waits']} waits "
+                     f"vs {stats['baseline']:.1f}s of fixed sleeps "
+                     f"({stats['throttle_signals']} throttle signals)")
+    logging.info(f"Idle wait eliminated this search: {total_saved:.1f}s")
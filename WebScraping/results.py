@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, Iterable, List, Optional
+
+# Folder each engine's results are also written to as {engine}_results.json once the
+# engine finishes, in the format the URL_JSON files had (unset = memory only)
+RESULTS_EXPORT_DIR = os.getenv("RESULTS_EXPORT_DIR") or None
+
+@dataclass
+class SearchResult:
+    """One organic result as an engine reported it"""
+    url: str
+    domain: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SearchResult":
+        return cls(url=data.get("url"), domain=data.get("domain"),
+                   title=data.get("title"), description=data.get("description"))
+
+@dataclass
+class EngineResults:
+    """Every page one engine returned for a search, with the ad and URL counts"""
+    engine: str
+    results: List[SearchResult] = field(default_factory=list)
+    total_urls_found: int = 0
+    ad_urls_removed: int = 0
+    ad_urls_details: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, output: Dict) -> List[SearchResult]:
+        """
+        Append one scraper output: a page from extract_search_results, or the whole
+        run from scrape_duckduckgo / scrape_yahoo_search ({"results", "statistics"}).
+
+        Returns:
+            The results that output added, in order
+        """
+        added = [SearchResult.from_dict(result) for result in output.get("results", []) if result.get("url")]
+        self.results.extend(added)
+        stats = output.get("statistics", {})
+        self.total_urls_found += stats.get("total_urls_found", 0)
+        self.ad_urls_removed += stats.get("ad_urls_removed", 0)
+        for domain, count in stats.get("ad_urls_details", {}).items():
+            self.ad_urls_details[domain] = self.ad_urls_details.get(domain, 0) + count
+        return added
+
+    def to_dict(self) -> Dict:
+        """The {"results", "statistics"} structure of an engine's results file"""
+        return {
+            "results": [asdict(result) for result in self.results],
+            "statistics": {
+                "total_urls_found": self.total_urls_found,
+                "ad_urls_removed": self.ad_urls_removed,
+                "ad_urls_details": dict(self.ad_urls_details),
+                "final_urls_count": len(self.results),
+            },
+        }
+
+class SearchResults:
+    """
+    In-memory results of one search, per engine. Engine threads add pages as they
+    are scraped and consolidate_search_results reads a snapshot, replacing the
+    per-engine JSON files that were re-read and rewritten on every page.
+    """
+
+    def __init__(self):
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def add(self, engine: str, output: Dict) -> List[SearchResult]:
+        """Add one scraper output to engine's results (see EngineResults.add)"""
+        with self._lock:
+            if engine not in self._engines:
+                self._engines[engine] = EngineResults(engine)
+            return self._engines[engine].add(output)
+
+    def total_urls_found(self, engine: str) -> int:
+        with self._lock:
+            entry = self._engines.get(engine)
+            return entry.total_urls_found if entry else 0
+
+    def snapshot(self) -> List[EngineResults]:
+        """Copies of every engine's results so far, safe to read while scraping continues"""
+        with self._lock:
+            return [replace(entry, results=list(entry.results), ad_urls_details=dict(entry.ad_urls_details))
+                    for entry in self._engines.values()]
+
+    def export(self, engines: Optional[Iterable[str]] = None, folder: Optional[str] = RESULTS_EXPORT_DIR) -> bool:
+        """Write {engine}_results.json into folder for the given engines (default all); no-op without a folder"""
+        if not folder:
+            return False
+        wanted = set(engines) if engines is not None else None
+        try:
+            os.makedirs(folder, exist_ok=True)
+            for entry in self.snapshot():
+                if wanted is None or entry.engine in wanted:
+                    with open(os.path.join(folder, f"{entry.engine}_results.json"), "w", encoding="utf-8") as f:
+                        json.dump(entry.to_dict(), f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            logging.error(f"Error exporting results to {folder}: {str(e)}")
+            return False
+
+    @classmethod
+    def load(cls, folder: str) -> "SearchResults":
+        """Read {engine}_results.json files (an export, or the old URL_JSON folder) back in"""
+        loaded = cls()
+        for filename in sorted(os.listdir(folder)):
+            if not filename.endswith("_results.json"):
+                continue
+            path = os.path.join(folder, filename)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    loaded.add(filename[:-len("_results.json")], json.load(f))
+            except FileNotFoundError:
+                print(f"Warning: File {path} not found. Skipping.")
+            except json.JSONDecodeError:
+                print(f"Warning: Could not parse {path}. Skipping.")
+            except Exception as e:
+                print(f"Warning: Error processing {path}: {str(e)}. Skipping.")
+        return loaded
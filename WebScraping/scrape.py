@@ -1,11 +1,15 @@
-import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from .ExtractURLs.get_pdfs import get_pdfs
 from .ExtractURLs.google_bing_urls import extract_search_results
 from .ExtractURLs.kill_chrome import kill_chrome
+from .ExtractURLs.driver_pool import pooled_pids, log_driver_pool_report
 from .ExtractURLs.duckduckgo_urls import scrape_duckduckgo
 from .ExtractURLs.yahoo_urls import scrape_yahoo_search
+from .ExtractURLs.headless_capture import CAPTURE_TABS, HeadlessCapture
+from .pacing import get_pacer, reset_pacing_stats, log_pacing_report
+from .results import SearchResults
 import logging
 
 # Configure logging
@@ -14,94 +18,148 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def scrape_google_bing(query, engine, page_counter, max_retries=3):
-    """Enhanced with retries but same core logic"""
+# Engines captured through the desktop browser with pyautogui; they must run one at a time
+GUI_ENGINES = ["google", "bing"]
+# Engines scraped over HTTP or headless Selenium, run alongside the GUI engines
+BACKGROUND_ENGINES = ["duckduckgo", "yahoo"]
+# False runs every engine in sequence, as before
+CONCURRENT_ENGINES = True
+# "desktop" prints google/bing through the system browser with pyautogui (get_pdfs);
+# "headless" prints them through headless Chrome, so they can run in parallel as well
+CAPTURE_BACKEND = os.getenv("CAPTURE_BACKEND", "desktop")
+# Headless backend only: "png" hands a screenshot straight to OCR; "pdf" writes and
+# rasterizes the ScreenCaptures PDF like the desktop path (useful for debugging)
+CAPTURE_FORMAT = os.getenv("CAPTURE_FORMAT", "png")
+
+def scrape_google_bing(query, engine, page_counter, max_retries=3, capture=None):
+    """Enhanced with retries but same core logic.
+    capture, a HeadlessCapture, replaces the desktop print dialog when given.
+    Returns the page's extract_search_results output, or None if every attempt failed."""
+    pacer = get_pacer(engine)
     for attempt in range(max_retries):
+        pacer.acquire()  # Paces pages and retries alike
         try:
+            if capture and CAPTURE_FORMAT == "png":
+                return extract_search_results(capture.capture_png(query, engine, page_counter))
+            
             # Original logic
-            get_pdfs(query, engine, page_counter)
+            if capture:
+                capture.capture(query, engine, page_counter)
+            else:
+                get_pdfs(query, engine, page_counter)
             pdf_path = os.path.join("WebScraping", "ScreenCaptures", f"{engine}_page_{page_counter}.pdf")
-            output_path = os.path.join("WebScraping", "URL_JSON", f"{engine}_results.json")
             
             # Ensure directories exist
             os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            extract_search_results(pdf_path, output_path)
-            return True
+            return extract_search_results(pdf_path)
         except Exception as e:
             logging.warning(f"Attempt {attempt + 1} failed for {engine} page {page_counter}: {str(e)}")
-            if attempt == max_retries - 1:
-                return False
-            time.sleep(2)  # Wait before retrying
-    return False
-
-def check_number_urls(engine):
-    """Original function with added safety checks"""
-    json_path = os.path.join("WebScraping", "URL_JSON", f"{engine}_results.json")
-    try:
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                return data.get('statistics', {}).get('total_urls_found', 0)
-        return 0
-    except Exception as e:
-        logging.error(f"Error reading {json_path}: {str(e)}")
-        return 0
+    return None
 
-def save_to_json(data, filename):
-    """Original function with added error handling"""
-    try:
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, "w", encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        logging.error(f"Error saving to {filename}: {str(e)}")
-        return False
-
-def scrape_web(query, num_results):
-    """Main function with enhanced reliability but same logic"""
-    engines = ["google", "bing"]
+def scrape_gui_engine(query, engine, num_results, results, depth=None, capture=None):
+    """Page through google or bing with the print-to-PDF capture (original logic),
+    adding each page to results"""
     min_results_per_page = 5  # Expected minimum results per page
     max_pages = 10  # Safety limit
+    page_counter = 1
+    total_urls = 0
+    attempts = 0
+    max_attempts = min(max_pages, num_results/min_results_per_page)
     
-    # Scrape google and bing with retries
-    for engine in engines:
-        page_counter = 1
-        total_urls = 0
-        attempts = 0
-        max_attempts = min(max_pages, num_results/min_results_per_page)
+    while attempts < max_attempts and total_urls < num_results:
+        page = scrape_google_bing(query, engine, page_counter, capture=capture)
+        attempts += 1
         
-        while attempts < max_attempts and total_urls < num_results:
-            success = scrape_google_bing(query, engine, page_counter)
-            attempts += 1
-            
-            if success:
-                current_urls = check_number_urls(engine)
-                if current_urls > total_urls:  # Only increment if we got new results
-                    total_urls = current_urls
-                    page_counter += 1
-                time.sleep(2)  # Be polite between requests
-            else:
-                break  # Move to next engine if scraping fails
-
-    # Clean up browsers
-    kill_chrome()
-    time.sleep(1)  # Ensure browsers are closed
+        if page is not None:
+            page_results = results.add(engine, page)
+            current_urls = results.total_urls_found(engine)
+            if current_urls > total_urls:  # Only increment if we got new results
+                total_urls = current_urls
+                page_counter += 1
+                if depth and not depth.record_page(engine, [result.url for result in page_results]):
+                    break
+        else:
+            break  # Move to next engine if scraping fails
 
-    # Scrape duckduckgo (original logic)
+def scrape_background_engine(query, engine, num_results, results, depth=None):
+    """Scrape duckduckgo (requests) or yahoo (headless Selenium) into results"""
+    on_page = (lambda urls: depth.record_page(engine, urls)) if depth else None
     try:
-        ddg_data = scrape_duckduckgo(query, num_results)
-        save_to_json(ddg_data, os.path.join("WebScraping", "URL_JSON", "duckduckgo_results.json"))
+        if engine == "duckduckgo":
+            data = scrape_duckduckgo(query, num_results, on_page=on_page)
+        else:
+            data = scrape_yahoo_search(query, num_results, on_page=on_page)
+        results.add(engine, data)
     except Exception as e:
-        logging.error(f"DuckDuckGo scrape failed: {str(e)}")
+        logging.error(f"{engine} scrape failed: {str(e)}")
+
+def log_engine_timings(timings, wall_time):
+    """Log each engine's wall time and how much running engines side by side saved"""
+    for engine, (start, end) in sorted(timings.items(), key=lambda item: item[1][0]):
+        logging.info(f"{engine}: {end - start:.1f}s (started at +{start:.1f}s)")
+    engine_total = sum(end - start for start, end in timings.values())
+    logging.info(f"Scrape wall time {wall_time:.1f}s for {engine_total:.1f}s of engine time "
+                 f"(overlap saved {max(0.0, engine_total - wall_time):.1f}s)")
 
-    # Scrape yahoo (original logic)
+def scrape_web(query, num_results, on_engine_done=None, depth=None, results=None):
+    """Main function with enhanced reliability but same logic.
+    DuckDuckGo and Yahoo don't use the desktop browser, so they run in background threads
+    while google and bing are captured one page at a time. With the headless capture
+    backend google and bing run in the background as well. Every engine adds its pages
+    to results (a SearchResults, created if not given), which is returned for
+    consolidate_search_results; with RESULTS_EXPORT_DIR set each engine is also written
+    out as {engine}_results.json when it finishes.
+    on_engine_done(engine), if given, is called as each engine's results are complete.
+    depth, an optional DepthController, limits and ends paging per engine."""
+    if depth:
+        depth.log_plan(GUI_ENGINES + BACKGROUND_ENGINES)
+    
+    start_time = time.time()
+    timings = {}
+    reset_pacing_stats()
+    results = results if results is not None else SearchResults()
+    # Each GUI engine captures one page at a time, so more browsers than engines would sit idle
+    capture = HeadlessCapture(tabs=min(CAPTURE_TABS, len(GUI_ENGINES))) if CAPTURE_BACKEND == "headless" else None
+    scrapers = {engine: scrape_background_engine for engine in BACKGROUND_ENGINES}
+    scrapers.update({
+        engine: lambda query, engine, num_results, results, depth: scrape_gui_engine(query, engine, num_results, results, depth, capture)
+        for engine in GUI_ENGINES
+    })
+    # Engines that must take turns on the calling thread; the rest run in the pool
+    serial_engines = [] if capture else list(GUI_ENGINES)
+    if not CONCURRENT_ENGINES:
+        serial_engines = GUI_ENGINES + BACKGROUND_ENGINES
+    parallel_engines = [engine for engine in GUI_ENGINES + BACKGROUND_ENGINES if engine not in serial_engines]
+    
+    def run_engine(engine):
+        engine_start = time.time() - start_time
+        scrapers[engine](query, engine, num_results, results, depth)
+        timings[engine] = (engine_start, time.time() - start_time)
+        results.export([engine])
+        if on_engine_done:
+            on_engine_done(engine)
+    
     try:
-        yahoo_data = scrape_yahoo_search(query, num_results)
-        save_to_json(yahoo_data, os.path.join("WebScraping", "URL_JSON", "yahoo_results.json"))
-    except Exception as e:
-        logging.error(f"Yahoo scrape failed: {str(e)}")
+        with ThreadPoolExecutor(max_workers=max(1, len(parallel_engines)), thread_name_prefix="scrape") as pool:
+            background = [pool.submit(run_engine, engine) for engine in parallel_engines]
+            
+            # Scrape google and bing with retries
+            for engine in serial_engines:
+                run_engine(engine)
+            for future in background:
+                future.result()
+    finally:
+        if capture:
+            capture.close()
+
+    if not capture:
+        # Clean up browsers. kill_chrome also ends headless Chrome, so only once every engine is
+        # done, and it leaves the warm pooled browsers (Yahoo) running for the next search
+        kill_chrome(spare_pids=pooled_pids())
+        time.sleep(1)  # Ensure browsers are closed
 
-    return True
\ No newline at end of file
+    log_engine_timings(timings, time.time() - start_time)
+    log_pacing_report()
+    log_driver_pool_report()
+    return results
@@ -0,0 +1,78 @@
+import logging
+import math
+import threading
+from InsertData.url_canonical import canonical_url
+
+# Fresh scored URLs at which a query counts as fully covered by the database
+COVERAGE_TARGET = 100
+# Pages always scraped per engine, however well the query is covered
+MIN_PAGES = 1
+# A SERP page adding fewer unseen URLs than this ends paging for that engine
+MIN_UNSEEN_PER_PAGE = 3
+# Organic results per SERP page, used to turn num_results into a page count
+RESULTS_PER_SERP_PAGE = {"google": 5, "bing": 5, "duckduckgo": 10, "yahoo": 7}
+# Hard page limits per engine (None = page until num_results is reached)
+ENGINE_MAX_PAGES = {"google": 10, "bing": 10, "duckduckgo": None, "yahoo": None}
+
+class DepthController:
+    """
+    Chooses how many SERP pages each engine scrapes from how well the database
+    already covers the query, and stops an engine early once its pages stop
+    turning up URLs that are neither stored nor already seen in this run.
+    URLs are compared by canonical_url, since stored URLs are cleaned and SERP
+    URLs are not.
+    """
+
+    def __init__(self, known_urls, num_results):
+        self.known_urls = {canonical_url(url) for url in known_urls}
+        self.num_results = num_results
+        self.coverage = min(1.0, len(self.known_urls) / COVERAGE_TARGET) if COVERAGE_TARGET else 0.0
+        self.pages_scraped = {}
+        self.stopped = {}
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def full_depth(self, engine):
+        """Pages the engine would scrape without any coverage (the original behaviour)"""
+        pages = math.ceil(self.num_results / RESULTS_PER_SERP_PAGE.get(engine, 10))
+        limit = ENGINE_MAX_PAGES.get(engine)
+        return min(pages, limit) if limit else pages
+
+    def max_pages(self, engine):
+        """Pages to scrape for engine, shrinking linearly as coverage approaches COVERAGE_TARGET"""
+        full = self.full_depth(engine)
+        return max(MIN_PAGES, min(full, math.ceil(full * (1 - self.coverage))))
+
+    def log_plan(self, engines):
+        logging.info(
+            f"Scrape depth: {len(self.known_urls)} fresh scored URLs in DB "
+            f"(coverage {self.coverage:.0%} of {COVERAGE_TARGET}); "
+            + ", ".join(f"{engine} {self.max_pages(engine)}/{self.full_depth(engine)} pages" for engine in engines)
+        )
+
+    def record_page(self, engine, page_urls):
+        """
+        Register the URLs one SERP page returned.
+
+        Returns:
+            True if the engine should fetch another page, False to stop it here
+        """
+        keys = {canonical_url(url) for url in page_urls}
+        with self._lock:
+            unseen = [key for key in keys if key not in self.known_urls and key not in self._seen]
+            self._seen.update(keys)
+            pages = self.pages_scraped.get(engine, 0) + 1
+            self.pages_scraped[engine] = pages
+
+        limit = self.max_pages(engine)
+        if pages >= limit:
+            reason = f"reached depth {limit}"
+        elif pages > MIN_PAGES and len(unseen) < MIN_UNSEEN_PER_PAGE:
+            reason = f"page added {len(unseen)} unseen URLs (< {MIN_UNSEEN_PER_PAGE})"
+        else:
+            logging.info(f"{engine} page {pages}: {len(page_urls)} URLs, {len(unseen)} unseen, continuing")
+            return True
+
+        self.stopped[engine] = reason
+        logging.info(f"{engine} page {pages}: {len(page_urls)} URLs, {len(unseen)} unseen, stopping ({reason})")
+        return False
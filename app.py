@@ -1,5 +1,7 @@
-from flask import Flask, request, render_template, jsonify, redirect, url_for, session
+from flask import Flask, request, render_template, jsonify, redirect, url_for, session, Response
 from run_search import run_search, get_results
+from search_jobs import SearchJobQueue, QueueFullError
+import json
 import math
 import time
 from datetime import timedelta
@@ -13,6 +15,11 @@ app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)  # Using timede
 RESULTS_PER_ENGINE = 250
 NUM_ENGINES = 4
 RESULTS_PER_PAGE = 5
+STREAM_PARTIAL_RESULTS = True  # Insert engine by engine and push provisional rankings over SSE
+STREAM_KEEPALIVE = 15          # Seconds between SSE keep-alive comments while nothing happens
+
+# Background pool running searches so requests return immediately
+search_jobs = SearchJobQueue()
 
 @app.before_request
 def refresh_session():
@@ -47,9 +54,31 @@ def search():
                          query=query,
                          current_page=page)
 
+def _search_task(query: str, job) -> dict:
+    """Background job body: full search pipeline, then the first page of results"""
+    def publish_results(results, total_pages):
+        job.publish('results', {'results': results, 'total_pages': total_pages})
+    
+    # Run search with RESULTS_PER_ENGINE from each of NUM_ENGINES
+    scrape_time, _ = run_search(query, RESULTS_PER_ENGINE, progress=job.update,
+                                on_results=publish_results if STREAM_PARTIAL_RESULTS else None)
+    
+    # Get first page of ranked results
+    job.update("Ranking results", 98)
+    first_page_results, total_pages, _ = get_results(query, 1)
+    
+    return {
+        'all_results': first_page_results,
+        'result_count': len(first_page_results),
+        'time_scrape': scrape_time,
+        'query': query,
+        'total_pages': total_pages,
+        'current_page': 1
+    }
+
 @app.route('/run-backend-task', methods=['POST'])
 def run_backend_task():
-    """Endpoint that performs the actual search/scraping"""
+    """Queue the search/scraping job and return its id immediately"""
     data = request.get_json()
     query = data.get('query')
     page = data.get('page', 1)
@@ -58,36 +87,64 @@ def run_backend_task():
         return jsonify({'status': 'error', 'message': 'Invalid search request'}), 400
     
     try:
-        # Run search with RESULTS_PER_ENGINE from each of NUM_ENGINES
-        scrape_time, _ = run_search(query, RESULTS_PER_ENGINE)
-        
-        # Get first page of ranked results
-        first_page_results, total_pages, _ = get_results(query, 1)
-        
-        # Store results in session
-        session['search_data'] = {
-            'all_results': first_page_results,
-            'result_count': len(first_page_results),
-            'time_scrape': scrape_time,
-            'query': query,
-            'total_pages': total_pages,
-            'current_page': 1
-        }
-        
-        # Clear pending search
-        session.pop('pending_search', None)
-        
-        return jsonify({
-            'status': 'success',
-            'redirect_url': url_for('show_results', q=query),
-            'scrape_time': scrape_time
-        })
-        
-    except Exception as e:
+        job = search_jobs.submit(query, lambda job: _search_task(query, job))
+    except QueueFullError as e:
         return jsonify({
             'status': 'error',
-            'message': f"Search failed: {str(e)}"
-        }), 500
+            'message': f"Search queue is full, try again shortly ({str(e)})"
+        }), 503
+    
+    pending = session['pending_search']
+    pending['job_id'] = job.id
+    session['pending_search'] = pending
+    
+    return jsonify({
+        'status': 'queued',
+        'job_id': job.id,
+        'status_url': url_for('search_status', job_id=job.id),
+        'stream_url': url_for('search_stream', job_id=job.id)
+    }), 202
+
+@app.route('/search-status/<job_id>', methods=['GET'])
+def search_status(job_id):
+    """Report stage, percent complete and any error for a queued search"""
+    job = search_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown or expired search job'}), 404
+    
+    status = job.to_dict()
+    if status['status'] == 'done':
+        # Store results in session and clear the pending search
+        session['search_data'] = job.result
+        session.pop('pending_search', None)
+        status['redirect_url'] = url_for('show_results', q=job.query)
+        status['scrape_time'] = job.result['time_scrape']
+    elif status['status'] == 'error':
+        status['message'] = f"Search failed: {status['error']}"
+    
+    return jsonify(status)
+
+@app.route('/search-stream/<job_id>', methods=['GET'])
+def search_stream(job_id):
+    """Server-Sent Events feed of a search's progress and provisional results"""
+    job = search_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown or expired search job'}), 404
+    
+    def stream():
+        sent = 0
+        while True:
+            events, finished = job.wait_for_events(sent, STREAM_KEEPALIVE)
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            sent += len(events)
+            if finished and not events:
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/results')
 def show_results():
@@ -0,0 +1,121 @@
+"""
+DuckDuckGo result page parsing: previous loop against parse_results_page.
+
+Parses the saved DuckDuckGo HTML result pages in benchmarks/fixtures/ddg the way
+scrape_duckduckgo used to (BeautifulSoup html.parser, any() duplicate scan over
+the results so far, redirect links kept) and with parse_results_page on the
+lxml and html.parser paths, checks both yield the previous results once the
+redirect links are resolved and repeats dropped, and reports pages parsed per
+second. Then times the duplicate check alone for growing result counts.
+
+    python -m benchmarks.ddg_parse [--repeat 50] [--dedupe-sizes 100,1000,5000]
+"""
+import argparse
+import os
+import time
+from bs4 import BeautifulSoup
+from WebScraping.ExtractURLs.duckduckgo_urls import lxml_html, parse_results_page, resolve_result_url
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "ddg")
+
+def load_pages():
+    names = sorted(name for name in os.listdir(FIXTURE_DIR) if name.endswith(".html"))
+    pages = []
+    for name in names:
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+def previous_parse(pages):
+    """Organic results across pages as the previous scrape_duckduckgo loop built them"""
+    results = []
+    for page_html in pages:
+        soup = BeautifulSoup(page_html, 'html.parser')
+        for result in soup.find_all('div', class_='result'):
+            if result.find('span', class_='badge--ad js-badge--ad') is not None:
+                continue
+            title_elem = result.find('a', class_='result__a')
+            if not title_elem or not title_elem.get('href'):
+                continue
+            url = title_elem.get('href')
+            desc_elem = result.find('a', class_='result__snippet')
+            if any(r['url'] == url for r in results):
+                continue
+            results.append({'url': url, 'title': title_elem.text.strip(),
+                            'description': desc_elem.text.strip() if desc_elem else None})
+        soup.find('input', {'type': 'submit', 'class': 'btn btn--alt', 'value': 'Next'})
+    return results
+
+def current_parse(pages, parser):
+    """The same results through parse_results_page and a seen-URL set"""
+    results = []
+    seen_urls = set()
+    for page_html in pages:
+        page_results, _ = parse_results_page(page_html, parser)
+        for result in page_results:
+            if result['is_ad'] or not result['url'] or result['url'] in seen_urls:
+                continue
+            seen_urls.add(result['url'])
+            results.append({'url': result['url'], 'title': result['title'], 'description': result['description']})
+    return results
+
+def pages_per_second(parse, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(pages)
+    return len(pages) * repeat / (time.perf_counter() - start)
+
+def dedupe_seconds(size, use_set):
+    urls = [f"https://site{n}.example.org/page" for n in range(size)]
+    start = time.perf_counter()
+    results, seen = [], set()
+    for url in urls:
+        if use_set:
+            if url in seen:
+                continue
+            seen.add(url)
+        elif any(r['url'] == url for r in results):
+            continue
+        results.append({'url': url})
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--dedupe-sizes", default="100,1000,5000")
+    args = parser.parse_args()
+
+    pages = load_pages()
+    previous = [dict(result, url=resolve_result_url(result['url'])) for result in previous_parse(pages)]
+    # Repeated results carry a fresh rut= token, so the raw-href check let them through
+    baseline, seen_urls = [], set()
+    for result in previous:
+        if result['url'] not in seen_urls:
+            seen_urls.add(result['url'])
+            baseline.append(result)
+    print(f"{len(pages)} saved pages, {len(baseline)} organic results "
+          f"({len(previous) - len(baseline)} repeats the previous loop kept as new)")
+
+    runs = [("previous (html.parser, any() dedupe)", previous_parse),
+            ("parse_results_page html.parser", lambda p: current_parse(p, "html.parser"))]
+    if lxml_html is not None:
+        runs.append(("parse_results_page lxml", lambda p: current_parse(p, "lxml")))
+    else:
+        print("lxml not installed; skipping the lxml path")
+
+    previous_rate = None
+    for label, parse in runs:
+        rate = pages_per_second(parse, pages, args.repeat)
+        previous_rate = previous_rate or rate
+        if parse is previous_parse:
+            print(f"{label}: {rate:.1f} pages/s")
+        else:
+            print(f"{label}: {rate:.1f} pages/s ({rate / previous_rate:.2f}x), "
+                  f"same results: {parse(pages) == baseline}")
+
+    for size in (int(size) for size in args.dedupe_sizes.split(",")):
+        print(f"dedupe {size} URLs: any() scan {dedupe_seconds(size, False) * 1000:.1f} ms, "
+              f"set {dedupe_seconds(size, True) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
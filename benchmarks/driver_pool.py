@@ -0,0 +1,122 @@
+"""
+Yahoo browser startup: a new Chrome per scrape against the warm driver pool.
+
+Runs --scrapes short "scrapes" of --pages page loads each (a page from a local
+HTTP server, so only browser overhead is timed), first the way
+scrape_yahoo_search used to (ChromeDriverManager().install() and a new Chrome
+every time, quit afterwards), then through a DriverPool. Reports how long each
+scrape waited for its browser and the pool's acquisition statistics. The page
+counts its visits in localStorage, so a pooled browser that was reset properly
+sees 1 on every scrape's first load; a reset that fails shows up as recycled
+browsers. Needs Chrome and network access for the first chromedriver download.
+
+    python -m benchmarks.driver_pool [--scrapes 10] [--pages 3] [--pool-size 1]
+"""
+import argparse
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from WebScraping.ExtractURLs.driver_pool import DriverPool
+from WebScraping.ExtractURLs.yahoo_urls import setup_driver
+
+PAGE = (b"<html><body><div class='algo-sr'><h3 class='title'>Result</h3></div><script>"
+        b"localStorage.visits = String(Number(localStorage.visits || 0) + 1);"
+        b"document.cookie = 'seen=1';</script></body></html>")
+
+def serve():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def cold_driver():
+    """setup_driver as it was before the pool: resolve the driver binary on every call"""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920x1080")
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+def run_cold(page_url, scrapes, pages):
+    waits = []
+    for _ in range(scrapes):
+        start = time.perf_counter()
+        driver = cold_driver()
+        waits.append(time.perf_counter() - start)
+        try:
+            for _ in range(pages):
+                driver.get(page_url)
+        finally:
+            driver.quit()
+    return waits
+
+def run_pooled(pool, page_url, scrapes, pages):
+    """Browser waits, and whether every scrape started with empty storage and cookies"""
+    waits = []
+    clean = True
+    for _ in range(scrapes):
+        start = time.perf_counter()
+        pooled = pool.acquire()
+        waits.append(time.perf_counter() - start)
+        try:
+            for page in range(pages):
+                pooled.driver.get(page_url)
+                pooled.visited(pooled.driver.current_url)
+                if page == 0:
+                    visits = pooled.driver.execute_script("return localStorage.visits")
+                    cookies = pooled.driver.execute_script("return document.cookie")
+                    clean = clean and visits == "1" and cookies == "seen=1"
+        finally:
+            pool.release(pooled)
+    return waits, clean
+
+def report(label, waits, total):
+    print(f"{label}: browser wait mean {statistics.mean(waits) * 1000:.0f} ms, "
+          f"median {statistics.median(waits) * 1000:.0f} ms, max {max(waits) * 1000:.0f} ms; "
+          f"{total:.1f}s for {len(waits)} scrapes")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrapes", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--pool-size", type=int, default=1)
+    args = parser.parse_args()
+
+    server = serve()
+    page_url = f"http://127.0.0.1:{server.server_address[1]}/results"
+    pool = DriverPool("benchmark", setup_driver, size=args.pool_size)
+    try:
+        start = time.perf_counter()
+        cold_waits = run_cold(page_url, args.scrapes, args.pages)
+        cold_total = time.perf_counter() - start
+        report("new Chrome per scrape", cold_waits, cold_total)
+
+        start = time.perf_counter()
+        pool_waits, clean = run_pooled(pool, page_url, args.scrapes, args.pages)
+        pool_total = time.perf_counter() - start
+        report("driver pool", pool_waits, pool_total)
+        stats = pool.stats()
+        print(f"pool: {stats['cold_starts']} cold starts, {stats['started']} browsers started, "
+              f"{stats['recycled']} recycled (expected 0); storage and cookies reset between scrapes: {clean}; "
+              f"{cold_total / pool_total:.1f}x faster overall")
+    finally:
+        pool.close()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
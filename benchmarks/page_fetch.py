@@ -0,0 +1,125 @@
+"""
+Page downloads and text extraction: full reads and BeautifulSoup against PageFetcher.
+
+Serves a set of responses from a local HTTP server (a normal page, a page far
+over the size cap, a PDF labelled as a PDF, a PDF sent without a Content-Type,
+a video, a cp1252 page with no declared charset) and fetches each the way
+get_html_frequencies used to (requests.get, whole body, response.text) and
+through PageFetcher, reporting bytes downloaded, time and outcome per URL.
+Then parses the saved result pages in benchmarks/fixtures/ddg with
+BeautifulSoup html.parser and with html_to_text, checks they extract the same
+title and text, and reports pages parsed per second.
+
+    python -m benchmarks.page_fetch [--big-mb 20] [--repeat 50]
+"""
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from bs4 import BeautifulSoup
+from InsertData.page_fetch import NON_CONTENT_TAGS, PageFetcher, html_to_text, lxml_html
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "ddg")
+PARAGRAPH = b"<p>Learn how to read files and download data with Python and pandas.</p>\n"
+
+def make_responses(big_mb):
+    page = b"<html><head><title>Python tutorial</title></head><body>" + PARAGRAPH * 200 + b"</body></html>"
+    big_page = b"<html><head><title>Huge page</title></head><body>" + PARAGRAPH * (big_mb * 1024 * 1024 // len(PARAGRAPH)) + b"</body></html>"
+    pdf = b"%PDF-1.7\n" + os.urandom(big_mb * 1024 * 1024)
+    video = b"\x00\x00\x00\x18ftypmp42" + os.urandom(big_mb * 1024 * 1024)
+    cp1252 = "<html><head><title>Café crème</title></head><body><p>Naïve résumé "
+    cp1252 = (cp1252 + "à la française</p></body></html>").encode("cp1252")
+    return {
+        "/page.html": ("text/html; charset=utf-8", page),
+        "/big.html": ("text/html", big_page),
+        "/report.pdf": ("application/pdf", pdf),
+        "/unlabelled": (None, pdf),
+        "/video.mp4": ("video/mp4", video),
+        "/cp1252.html": ("text/html", cp1252),
+    }
+
+def serve(responses):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            content_type, body = responses[self.path]
+            self.send_response(200)
+            if content_type:
+                self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                for start in range(0, len(body), 64 * 1024):
+                    self.wfile.write(body[start:start + 64 * 1024])
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client stopped reading, which is the point
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def previous_fetch(url):
+    start = time.perf_counter()
+    response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
+    soup = BeautifulSoup(response.text, 'html.parser')
+    title = soup.title.string.strip() if soup.title and soup.title.string else ""
+    return len(response.content), time.perf_counter() - start, f"title {title!r}"
+
+def current_fetch(url):
+    start = time.perf_counter()
+    page = PageFetcher().get(url, timeout=30)
+    outcome = f"skipped: {page.error}" if page.error else f"title {page.title!r} ({page.encoding})"
+    if page.truncated:
+        outcome += ", cut at the size cap"
+    return page.bytes_downloaded, time.perf_counter() - start, outcome
+
+def previous_parse(page_html):
+    soup = BeautifulSoup(page_html, 'html.parser')
+    title = soup.title.string.strip() if soup.title and soup.title.string else ""
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+    return title, soup.get_text(separator=' ', strip=True)
+
+def pages_per_second(parse, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page_html in pages:
+            parse(page_html)
+    return len(pages) * repeat / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--big-mb", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    responses = make_responses(args.big_mb)
+    server = serve(responses)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for path in responses:
+            for label, fetch in (("previous", previous_fetch), ("PageFetcher", current_fetch)):
+                size, seconds, outcome = fetch(base + path)
+                print(f"{path:<14} {label:<11} {size / 1024:>9.0f} KB {seconds * 1000:>7.0f} ms  {outcome}")
+    finally:
+        server.shutdown()
+
+    pages = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            pages.append(f.read())
+    baseline = [previous_parse(page_html) for page_html in pages]
+    previous_rate = pages_per_second(previous_parse, pages, args.repeat)
+    print(f"BeautifulSoup html.parser: {previous_rate:.1f} pages/s")
+    parsers = ["html.parser"] + (["lxml"] if lxml_html is not None else [])
+    for name in parsers:
+        rate = pages_per_second(lambda page_html: html_to_text(page_html, name), pages, args.repeat)
+        same = [html_to_text(page_html, name) for page_html in pages] == baseline
+        print(f"html_to_text {name}: {rate:.1f} pages/s ({rate / previous_rate:.2f}x), same text: {same}")
+
+if __name__ == "__main__":
+    main()
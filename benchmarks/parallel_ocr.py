@@ -0,0 +1,90 @@
+"""
+Serial vs process-pool OCR in extract_search_results on a fixture SERP PDF.
+
+Renders a multi-page PDF of SERP-like text (URL line, title, description per
+result, with a "Sponsored" block per page), then runs extract_search_results
+on it with 1, 2, 4 ... up to --max-workers OCR processes. Every run must
+produce the same results and statistics as the serial run.
+
+    python -m benchmarks.parallel_ocr [--pages 8] [--max-workers <cpu count>] [--repeat 3]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from PIL import Image, ImageDraw, ImageFont
+from WebScraping.ExtractURLs.google_bing_urls import extract_search_results
+
+PAGE_SIZE = (1700, 2200)  # Letter at 200 DPI, like convert_from_path output
+RESULTS_PER_PAGE = 8
+
+def _font(size: int):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+def fixture_lines(page: int):
+    lines = ["Sponsored", f"https://www.shop-example.com > deals > {page}", "Great deals today",
+             "Limited offer on everything", ""]
+    for n in range(RESULTS_PER_PAGE):
+        rank = page * RESULTS_PER_PAGE + n
+        lines += [f"https://www.site{rank}.example.org > docs > page{rank}",
+                  f"Python tutorial part {rank}",
+                  f"Learn how to read files and download data, lesson {rank}.", ""]
+    return lines
+
+def write_fixture_pdf(path: str, pages: int):
+    font = _font(34)
+    images = []
+    for page in range(pages):
+        image = Image.new("RGB", PAGE_SIZE, "white")
+        draw = ImageDraw.Draw(image)
+        y = 80
+        for line in fixture_lines(page):
+            draw.text((100, y), line, fill="black", font=font)
+            y += 52
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=200)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="parallel_ocr_")
+    pdf_path = os.path.join(work_dir, "fixture_serp.pdf")
+    try:
+        write_fixture_pdf(pdf_path, args.pages)
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= args.max_workers:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != args.max_workers:
+            worker_counts.append(args.max_workers)
+
+        baseline = None
+        serial_time = None
+        for workers in worker_counts:
+            extract_search_results(pdf_path, ocr_workers=workers)  # Start the pool outside the timing
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                output = extract_search_results(pdf_path, ocr_workers=workers)
+                times.append(time.perf_counter() - start)
+            median = statistics.median(times)
+            baseline = baseline or output
+            serial_time = serial_time or median
+            print(f"{workers} worker(s): {median:.2f}s for {args.pages} pages, "
+                  f"speedup {serial_time / median:.2f}x, "
+                  f"same output: {output == baseline}")
+        stats = baseline["statistics"]
+        print(f"Found {stats['final_urls_count']} results, {stats['ad_urls_removed']} ads removed")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Before/after benchmark for the schema migrations on a synthetic corpus.
+
+Builds a scratch database (default 100,000 URLs x 10 keywords = 1M KeyWords rows),
+then EXPLAINs and times the ranking queries and the URL duplicate lookup
+before and after apply_migrations(). After, the lookup is the CanonicalHash
+query insert_url runs.
+
+    python -m benchmarks.schema_indexes [--urls 100000] [--keywords-per-url 10] [--keep]
+"""
+import argparse
+import random
+import statistics
+import time
+from mysql import connector
+from InsertData.DataBase import _connection_config, create_schema
+from InsertData.migrations import apply_migrations
+from InsertData.url_canonical import canonical_hash
+from InsertData.url_ranking import RANKED_IDS_QUERY, _page_query, _placeholders
+
+BENCH_DATABASE = "MY_CUSTOM_BOT_BENCH"
+VOCABULARY_SIZE = 5000
+INSERT_CHUNK = 5000
+
+def populate(cursor, database, num_urls: int, keywords_per_url: int):
+    """Fill search_urls and KeyWords with Zipf-distributed keywords"""
+    rng = random.Random(42)
+    vocabulary = [f"word{i}" for i in range(VOCABULARY_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+
+    cursor.execute("INSERT INTO SearchQuery (Query) VALUES ('benchmark')")
+    search_query_id = cursor.lastrowid
+
+    for start in range(0, num_urls, INSERT_CHUNK):
+        count = min(INSERT_CHUNK, num_urls - start)
+        cursor.executemany(
+            """INSERT INTO search_urls (SearchQueryID, SearchEngine, Url, Type, Domain, Title)
+               VALUES (%s, %s, %s, %s, %s, %s)""",
+            [(search_query_id, "google", f"https://site{i % 997}.example.com/page/{i}",
+              "HTML", f"site{i % 997}.example.com", f"Page {i}")
+             for i in range(start, start + count)]
+        )
+        first_id = cursor.lastrowid
+        rows = []
+        for url_id in range(first_id, first_id + count):
+            words = set()
+            while len(words) < keywords_per_url:
+                words.update(rng.choices(vocabulary, weights, k=keywords_per_url - len(words)))
+            rows.extend((url_id, word, rng.randint(0, 40), "TEXT") for word in words)
+        cursor.executemany(
+            """INSERT INTO KeyWords (UrlID, KeyWordInSearchQuery, Occurrence, ContentType)
+               VALUES (%s, %s, %s, %s)""",
+            rows
+        )
+        database.commit()
+        print(f"\rPopulated {start + count}/{num_urls} URLs", end="")
+    print()
+    cursor.execute("ANALYZE TABLE search_urls, KeyWords")
+    cursor.fetchall()
+
+def explain(cursor, sql: str, params: tuple) -> str:
+    """Summarize EXPLAIN as table:access type:key:rows for each step"""
+    cursor.execute("EXPLAIN " + sql, params)
+    columns = [c[0] for c in cursor.description]
+    steps = []
+    for row in cursor.fetchall():
+        info = dict(zip(columns, row))
+        steps.append(f"{info['table']}:{info['type']}:{info['key'] or '-'}:{info['rows']}")
+    return " | ".join(steps)
+
+def time_query(cursor, sql: str, params: tuple, repeats: int = 5) -> float:
+    """Median wall time in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def benchmark_queries(cursor, migrated: bool, num_urls: int):
+    keywords = ("word0", "word17", "word250")
+    lookup_url = f"https://site{(num_urls // 2) % 997}.example.com/page/{num_urls // 2}"
+    if migrated:
+        lookup = ("""SELECT UrlID, SearchEngine FROM search_urls
+                     WHERE CanonicalHash = %s ORDER BY UrlID LIMIT 1""",
+                  (canonical_hash(lookup_url),))
+    else:
+        lookup = ("SELECT UrlID, SearchEngine FROM search_urls WHERE Url = %s LIMIT 1", (lookup_url,))
+
+    cases = {
+        "ranking page": (_page_query(len(keywords)), (*keywords, 5, 0)),
+        "ranked ids": (RANKED_IDS_QUERY.format(keyword_placeholders=_placeholders(len(keywords))), keywords),
+        "url lookup": lookup,
+    }
+    return {name: (explain(cursor, sql, params), time_query(cursor, sql, params))
+            for name, (sql, params) in cases.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=100_000)
+    parser.add_argument("--keywords-per-url", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    database = connector.connect(**_connection_config())
+    cursor = database.cursor()
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        create_schema(BENCH_DATABASE, migrate=False)
+        cursor.execute(f"USE {BENCH_DATABASE}")
+        populate(cursor, database, args.urls, args.keywords_per_url)
+
+        before = benchmark_queries(cursor, migrated=False, num_urls=args.urls)
+        apply_migrations(database)
+        cursor.execute("ANALYZE TABLE search_urls, KeyWords")
+        cursor.fetchall()
+        after = benchmark_queries(cursor, migrated=True, num_urls=args.urls)
+
+        print(f"\n{args.urls * args.keywords_per_url:,} KeyWords rows")
+        for name in before:
+            print(f"\n{name}")
+            print(f"  before: {before[name][1]:9.2f} ms  {before[name][0]}")
+            print(f"  after:  {after[name][1]:9.2f} ms  {after[name][0]}")
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.close()
+        database.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Headless SERP capture against a local fixture server.
+
+Serves generated results pages (organic results plus one ad block per page) on
+localhost, captures them through HeadlessCapture with one tab and with --tabs
+tabs, and runs extract_search_results on every PDF to check the capture is
+still readable by the OCR step. Then times each SERP page through the PDF file
+path (print, write, rasterize, OCR) against the in-memory PNG path
+(screenshot, decode, OCR).
+
+    python -m benchmarks.serp_capture [--pages 6] [--tabs 3] [--results-per-page 10]
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import tempfile
+import threading
+import statistics
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytesseract
+from WebScraping.ExtractURLs.google_bing_urls import extract_search_results, load_page_images
+from WebScraping.ExtractURLs.headless_capture import HeadlessCapture
+
+RESULTS_PER_PAGE = 10
+
+def fixture_page(query: str, page: int, results_per_page: int) -> str:
+    """A plain SERP-shaped page: URL line, title line, description line per result"""
+    items = ['<div class="result"><span>Sponsored</span>'
+             f'<div>https://www.ads-example.com › offer › {page}</div>'
+             f'<h3>Buy {html.escape(query)} now</h3><p>Advertisement</p></div>']
+    for n in range(results_per_page):
+        rank = (page - 1) * results_per_page + n
+        items.append(
+            f'<div class="result"><div>https://www.site{rank}.example.org › docs › page{rank}</div>'
+            f'<h3>{html.escape(query.title())} guide part {rank}</h3>'
+            f'<p>Everything about {html.escape(query)} in section {rank} of the guide.</p></div>'
+        )
+    return ('<html><head><title>' + html.escape(query) + ' - Fixture Search</title>'
+            '<style>body{font:18px Arial;margin:40px} .result{margin:0 0 28px} h3{margin:4px 0}</style>'
+            '</head><body>' + "".join(items) + '</body></html>')
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    results_per_page = RESULTS_PER_PAGE
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        query = params.get("q", ["fixture"])[0]
+        page = int(params.get("page", ["1"])[0])
+        body = fixture_page(query, page, self.results_per_page).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fixture_server(results_per_page: int = RESULTS_PER_PAGE) -> ThreadingHTTPServer:
+    FixtureHandler.results_per_page = results_per_page
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run(pages: int, tabs: int, save_dir: str, url_templates: dict) -> float:
+    capture = HeadlessCapture(tabs=tabs, url_templates=url_templates)
+    try:
+        capture.capture(query="warm up", engine="google", page=1, save_dir=save_dir)  # Start the first browser
+        start = time.perf_counter()
+        capture.capture_many("python tutorial", "google", list(range(1, pages + 1)), save_dir)
+        return time.perf_counter() - start
+    finally:
+        capture.close()
+
+def compare_formats(pages: int, save_dir: str, url_templates: dict):
+    """Median seconds per SERP page for each stage of the PDF and PNG OCR inputs"""
+    capture = HeadlessCapture(tabs=1, url_templates=url_templates)
+    timings = {"pdf": [], "png": []}
+    try:
+        capture.capture_png("warm up", "google", 1)
+        for page in range(1, pages + 1):
+            start = time.perf_counter()
+            pdf_path = capture.capture("python tutorial", "google", page, save_dir)
+            captured = time.perf_counter()
+            images = load_page_images(pdf_path)
+            loaded = time.perf_counter()
+            for image in images:
+                pytesseract.image_to_string(image)
+            timings["pdf"].append((captured - start, loaded - captured, time.perf_counter() - loaded,
+                                   os.path.getsize(pdf_path)))
+
+            start = time.perf_counter()
+            png = capture.capture_png("python tutorial", "google", page)
+            captured = time.perf_counter()
+            images = load_page_images(png)
+            loaded = time.perf_counter()
+            for image in images:
+                pytesseract.image_to_string(image)
+            timings["png"].append((captured - start, loaded - captured, time.perf_counter() - loaded, 0))
+    finally:
+        capture.close()
+
+    for mode, rows in timings.items():
+        capture_s, load_s, ocr_s, disk = (statistics.median(column) for column in zip(*rows))
+        print(f"{mode}: capture {capture_s:.3f}s, {'rasterize' if mode == 'pdf' else 'decode'} {load_s:.3f}s, "
+              f"OCR {ocr_s:.3f}s, {disk / 1024:.0f} KiB written per page")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--tabs", type=int, default=3)
+    parser.add_argument("--results-per-page", type=int, default=RESULTS_PER_PAGE)
+    args = parser.parse_args()
+
+    server = start_fixture_server(args.results_per_page)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    url_templates = {"google": base + "/search?q={query}&page={page}"}
+    save_dir = tempfile.mkdtemp(prefix="serp_capture_")
+    try:
+        for tabs in sorted({1, args.tabs}):
+            elapsed = run(args.pages, tabs, save_dir, url_templates)
+            print(f"{tabs} tab(s): {args.pages} pages in {elapsed:.2f}s ({elapsed / args.pages:.2f}s/page)")
+
+        output_path = os.path.join(save_dir, "google_results.json")
+        for page in range(1, args.pages + 1):
+            extract_search_results(os.path.join(save_dir, f"google_page_{page}.pdf"), output_path)
+        # The same pages handed over in memory must OCR to the same URLs
+        capture = HeadlessCapture(tabs=args.tabs, url_templates=url_templates)
+        try:
+            png_results = [extract_search_results(capture.capture_png("python tutorial", "google", page))
+                           for page in range(1, args.pages + 1)]
+        finally:
+            capture.close()
+        print(f"PNG OCR: {sum(len(r['results']) for r in png_results)}/{args.pages * args.results_per_page} organic URLs")
+        with open(output_path, encoding="utf-8") as f:
+            data = json.load(f)
+        stats = data["statistics"]
+        expected = args.pages * args.results_per_page
+        print(f"OCR: {stats['final_urls_count']}/{expected} organic URLs, "
+              f"{stats['ad_urls_removed']}/{args.pages} ads removed")
+
+        compare_formats(args.pages, save_dir, url_templates)
+    finally:
+        server.shutdown()
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Single-pass SERP line classifier against the per-URL window scan.
+
+Runs the OCR text pages in benchmarks/fixtures/serp_ocr through the previous
+parse loop (is_ad_url rescanning +-6 lines with substring tests, forward walks
+for title and description) and through parse_serp_lines, and reports lines
+parsed per second plus ad-detection precision and recall against the ad
+hostnames in labels.json.
+
+    python -m benchmarks.serp_classifier [--repeat 200]
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+from WebScraping.ExtractURLs.google_bing_urls import (
+    BASE_URL_PATTERN, SEARCH_ENGINE_PATTERN, clean_text, is_ad_url, is_url_like,
+    join_url_segments, normalize_url, parse_serp_lines,
+)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "serp_ocr")
+
+def load_corpus():
+    """[(name, lines, ad hostnames)] for every labelled fixture page"""
+    with open(os.path.join(FIXTURE_DIR, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+    corpus = []
+    for name, ads in labels.items():
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            corpus.append((name, f.read().split("\n"), set(ads)))
+    return corpus
+
+def window_scan_parse(lines, new_results, new_stats):
+    """The parse loop extract_search_results ran before parse_serp_lines"""
+    i = 0
+    while i < len(lines):
+        base_match = BASE_URL_PATTERN.search(lines[i])
+        if base_match and not SEARCH_ENGINE_PATTERN.search(lines[i]):
+            new_stats['total_urls_found'] += 1
+            normalized_url = normalize_url(join_url_segments(base_match, lines[i]))
+            if is_ad_url(i, lines):
+                new_stats['ad_urls_removed'] += 1
+                new_stats['ad_urls_details'][urlparse(normalized_url).netloc] += 1
+                i += 1
+                continue
+            title = None
+            j = i + 1
+            while j < len(lines) and (title is None or is_url_like(title)):
+                if lines[j] and not is_url_like(lines[j]):
+                    title = clean_text(lines[j])
+                j += 1
+            description = None
+            while j < len(lines) and (description is None or is_url_like(description)):
+                if lines[j] and not is_url_like(lines[j]):
+                    description = clean_text(lines[j])
+                j += 1
+            if title or description:
+                new_results.append({"url": normalized_url, "domain": urlparse(normalized_url).hostname,
+                                    "title": title, "description": description})
+        i += 1
+
+def parse_page(parse, lines):
+    results = []
+    stats = {'total_urls_found': 0, 'ad_urls_removed': 0, 'ad_urls_details': defaultdict(int)}
+    parse(lines, results, stats)
+    return results, stats
+
+def evaluate(parse, corpus):
+    """Ad-detection counts over the corpus: (true positives, false positives, false negatives, organic results)"""
+    tp = fp = fn = organic = 0
+    for _, lines, ads in corpus:
+        results, stats = parse_page(parse, lines)
+        flagged = set(stats['ad_urls_details'])
+        tp += len(flagged & ads)
+        fp += len(flagged - ads)
+        fn += len(ads - flagged)
+        organic += len(results)
+    return tp, fp, fn, organic
+
+def throughput(parse, corpus, repeat):
+    """Lines parsed per second over repeat passes of the corpus"""
+    total_lines = sum(len(lines) for _, lines, _ in corpus) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, lines, _ in corpus:
+            parse_page(parse, lines)
+    return total_lines / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    ad_count = sum(len(ads) for _, _, ads in corpus)
+    print(f"Corpus: {len(corpus)} pages, {sum(len(lines) for _, lines, _ in corpus)} lines, {ad_count} ads")
+    rates = {}
+    for label, parse in (("window scan", window_scan_parse), ("single pass", parse_serp_lines)):
+        tp, fp, fn, organic = evaluate(parse, corpus)
+        rates[label] = throughput(parse, corpus, args.repeat)
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        print(f"{label}: {rates[label]:,.0f} lines/s, ad precision {precision:.0%} ({fp} organic URLs flagged), "
+              f"recall {recall:.0%}, {organic} organic results kept")
+    print(f"Speedup: {rates['single pass'] / rates['window scan']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Yahoo per-page latency: full page loads against the lightweight profile.
+
+Loads --pages result pages for --query twice in fresh headless browsers: the way
+scrape_yahoo_search used to (normal page loads with every image, font and
+tracker, then one find_element round trip per result field) and with the
+lightweight profile (eager loads, blocked resources, one extract_page script
+call). Reports load, wait-for-results and extraction time per page and checks
+both runs read the same results. Needs Chrome and network access.
+
+    python -m benchmarks.yahoo_profile [--query "python tutorial"] [--pages 3] [--delay 2]
+"""
+import argparse
+import statistics
+import time
+import urllib.parse
+from urllib.parse import urlparse
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from InsertData.url_canonical import unwrap_redirect
+from WebScraping.pacing import wait_until
+from WebScraping.ExtractURLs.yahoo_urls import (ADS_CONTAINER_XPATH, RESULTS_TIMEOUT, clean_text,
+                                                extract_page, setup_driver)
+
+def previous_rows(items, by, title_selector, description_selector):
+    """Result rows the way scrape_yahoo_search read them before: one find_element per field"""
+    rows = []
+    for item in items:
+        try:
+            title = clean_text(item.find_element(by, title_selector).text)
+            url = item.find_element(by, "a" if by == By.CSS_SELECTOR else ".//a").get_attribute("href")
+            try:
+                description = clean_text(item.find_element(by, description_selector).text)
+            except NoSuchElementException:
+                description = None
+            rows.append({"url": url, "domain": urlparse(url).netloc, "title": title, "description": description})
+        except Exception as e:
+            print(f"Error processing result: {e}")
+    return rows
+
+def previous_extract(driver):
+    """Organic results, ads and next page URL as the previous find_element helpers read them"""
+    organic = previous_rows(driver.find_elements(By.CSS_SELECTOR, "div.algo-sr"),
+                            By.CSS_SELECTOR, "h3.title", "div.compText")
+    try:
+        ad_items = driver.find_element(By.XPATH, ADS_CONTAINER_XPATH).find_elements(By.XPATH, "./li")
+    except NoSuchElementException:
+        ad_items = []
+    ads = previous_rows(ad_items, By.XPATH, ".//h3", ".//p")
+    try:
+        next_url = driver.find_element(By.CSS_SELECTOR, "a.next").get_attribute("href")
+    except NoSuchElementException:
+        next_url = None
+    return organic, ads, next_url
+
+def run(query, pages, delay, light):
+    """Per-page (load, results, extract) seconds and the organic URLs read, for one profile"""
+    driver = setup_driver(light=light)
+    extract = extract_page if light else previous_extract
+    url = f"https://search.yahoo.com/search?p={urllib.parse.quote(query)}"
+    timings, urls = [], []
+    try:
+        for _ in range(pages):
+            if not url:
+                break
+            start = time.perf_counter()
+            driver.get(url)
+            loaded = time.perf_counter()
+            wait_until(lambda: driver.find_elements(By.CSS_SELECTOR, "div.algo-sr"), RESULTS_TIMEOUT)
+            ready = time.perf_counter()
+            organic, _, url = extract(driver)
+            done = time.perf_counter()
+            timings.append((loaded - start, ready - loaded, done - ready))
+            urls.extend(result["url"] for result in organic)
+            time.sleep(delay)
+    finally:
+        driver.quit()
+    return timings, urls
+
+def report(label, timings):
+    phases = list(zip(*timings))
+    load, results, extract = (statistics.mean(phase) * 1000 for phase in phases)
+    total = statistics.mean(sum(page) for page in timings) * 1000
+    print(f"{label}: {len(timings)} pages, per page load {load:.0f} ms, results {results:.0f} ms, "
+          f"extract {extract:.0f} ms, total {total:.0f} ms")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="python tutorial")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--delay", type=float, default=2.0, help="seconds between pages, to stay polite")
+    args = parser.parse_args()
+
+    full_timings, full_urls = run(args.query, args.pages, args.delay, light=False)
+    full_total = report("full page loads, find_element extraction", full_timings)
+    light_timings, light_urls = run(args.query, args.pages, args.delay, light=True)
+    light_total = report("lightweight profile, one-script extraction", light_timings)
+    # Result URLs carry per-request tracking tokens, so compare the pages they resolve to
+    same = [unwrap_redirect(url) for url in full_urls] == [unwrap_redirect(url) for url in light_urls]
+    print(f"{full_total / light_total:.1f}x faster per page, same results: {same}")
+
+if __name__ == "__main__":
+    main()
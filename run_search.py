@@ -1,8 +1,14 @@
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import queue
 import time
 from WebScraping.scrape import scrape_web
+from WebScraping.results import SearchResults
+from WebScraping.scrape_depth import DepthController
+from InsertData.coverage import fresh_scored_urls
 from InsertData.consolidate_urls import consolidate_search_results
-from InsertData.insert_url import insert_search_results, extract_keywords
+from InsertData.insert_url import insert_search_results, insert_search_results_incremental, extract_keywords
 from InsertData.url_ranking import rank_urls_by_keywords
 from clean_up import delete_files
 
@@ -10,34 +16,113 @@ from clean_up import delete_files
 RESULTS_PER_ENGINE = 10  # Number of results to scrape from each engine
 NUM_ENGINES = 4          # Number of search engines being used
 RESULTS_PER_PAGE = 5     # Number of results to show per page
+INSERT_WORKERS = 8       # Threads fetching/counting pages during insertion (1 = serial)
+INSERT_BATCH_SIZE = 200  # Rows per multi-row insert statement (0 = row at a time)
+INCREMENTAL_BATCH_SIZE = 0  # Incremental mode commits each URL so rankings grow page by page
+STREAM_INTERVAL = 1.0    # Minimum seconds between provisional rankings in incremental mode
+ADAPTIVE_DEPTH = True    # Scrape fewer SERP pages for queries the DB already covers
 
-def run_search(query: str, results_per_engine: int) -> Tuple[float, List[str]]:
+def run_search(query: str, results_per_engine: int,
+               progress: Optional[Callable[[str, int], None]] = None,
+               on_results: Optional[Callable[[List[Dict], int], None]] = None) -> Tuple[float, List[str]]:
     """
     Execute comprehensive search pipeline and return scrape time and keywords.
     
     Args:
         query: Search query string
         results_per_engine: Number of results to scrape from each engine
+        progress: Optional callback(stage, percent) for status reporting
+        on_results: Optional callback(first_page_results, total_pages). When given, the
+            search runs incrementally: each engine's URLs are inserted as soon as it
+            finishes, and the current first page is passed here as URLs are committed.
         
     Returns:
         Tuple of (scrape_time, extracted_keywords)
     """
+    progress = progress or (lambda stage, percent: None)
     start_time = time.time()
+    depth = plan_scrape_depth(query, results_per_engine) if ADAPTIVE_DEPTH else None
     
-    # Execute search pipeline (scrapes results_per_engine from each engine)
-    scrape_web(query, results_per_engine)
-    data = consolidate_search_results()
-    keywords = insert_search_results(data, query)
+    if on_results:
+        keywords = _run_incremental(query, results_per_engine, progress, on_results, depth)
+    else:
+        # Execute search pipeline (scrapes results_per_engine from each engine)
+        progress("Scraping search engines", 5)
+        results = scrape_web(query, results_per_engine, depth=depth)
+        progress("Consolidating results", 50)
+        data = consolidate_search_results(results)
+        keywords = insert_search_results(
+            data, query, workers=INSERT_WORKERS, batch_size=INSERT_BATCH_SIZE,
+            progress=lambda done, total: progress(f"Analyzing pages ({done}/{total})", 55 + 40 * done // total)
+        )
     
     # Calculate duration
     scrape_time = round(time.time() - start_time, 2)
     
     # Clean up files
+    progress("Cleaning up", 97)
     for folder in [r"WebScraping\URL_JSON", r"WebScraping\ScreenCaptures"]:
         delete_files(folder)
     
     return scrape_time, keywords
 
+def plan_scrape_depth(query: str, results_per_engine: int) -> Optional[DepthController]:
+    """Size the scrape from the fresh scored URLs already stored for the query's keywords"""
+    try:
+        known_urls = fresh_scored_urls(list(query_keywords(query)))
+    except Exception as e:
+        print(f"Coverage check failed, scraping at full depth: {str(e)}")
+        return None
+    return DepthController(known_urls, results_per_engine)
+
+def _run_incremental(query: str, results_per_engine: int,
+                     progress: Callable[[str, int], None],
+                     on_results: Callable[[List[Dict], int], None],
+                     depth: Optional[DepthController] = None) -> List[str]:
+    """Scrape on this thread while another inserts each engine's results as it finishes"""
+    finished_engines = queue.Queue()
+    results = SearchResults()
+    last_published = [0.0]
+
+    def consolidated_batches():
+        done = 0
+        while (engine := finished_engines.get()) is not None:
+            done += 1
+            progress(f"Analyzing {engine} results", 5 + 90 * done // NUM_ENGINES)
+            # Consolidation covers every engine so far; already inserted URLs are skipped
+            yield consolidate_search_results(results)
+
+    def publish(force: bool = False):
+        now = time.monotonic()
+        if not force and now - last_published[0] < STREAM_INTERVAL:
+            return
+        last_published[0] = now
+        try:
+            results, total_pages, _ = get_results(query, 1)
+            on_results(results, total_pages)
+        except Exception as e:
+            print(f"Provisional ranking failed: {str(e)}")
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="incremental-insert") as inserter:
+        inserting = inserter.submit(
+            insert_search_results_incremental, consolidated_batches(), query,
+            workers=INSERT_WORKERS, batch_size=INCREMENTAL_BATCH_SIZE, on_commit=publish
+        )
+        progress("Scraping search engines", 5)
+        try:
+            scrape_web(query, results_per_engine, on_engine_done=finished_engines.put, depth=depth, results=results)
+        finally:
+            finished_engines.put(None)
+        keywords = inserting.result()
+
+    publish(force=True)
+    return keywords
+
+@lru_cache(maxsize=256)
+def query_keywords(query: str) -> Tuple[str, ...]:
+    """Keywords for a query, extracted once per process (extract_keywords is deterministic)"""
+    return tuple(extract_keywords(query))
+
 def get_results(query: str, page_number: int = 1) -> Tuple[List[Dict], int, bool]:
     """
     Get paginated ranked results for a search query.
@@ -49,7 +134,7 @@ def get_results(query: str, page_number: int = 1) -> Tuple[List[Dict], int, bool
     Returns:
         Tuple of (results, total_pages, has_more)
     """
-    keywords = extract_keywords(query)
+    keywords = list(query_keywords(query))
     results, total_pages, has_more = rank_urls_by_keywords(keywords, page_number)
     return results, total_pages, has_more
 
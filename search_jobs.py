@@ -0,0 +1,131 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Searches running at once. Google/Bing capture drives the desktop browser, so keep this at 1
+# unless the headless capture backend is in use.
+SEARCH_WORKERS = 1
+# Queued + running searches allowed before new submissions are rejected
+MAX_PENDING_JOBS = 8
+# Seconds a finished job stays available for status polling
+JOB_RETENTION = 30 * 60
+
+class QueueFullError(Exception):
+    """Raised when MAX_PENDING_JOBS searches are already queued or running"""
+
+class SearchJob:
+    """State of one submitted search, updated by the worker and read by status polling"""
+
+    def __init__(self, query: str):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.status = "queued"   # queued -> running -> done | error
+        self.stage = "Waiting for a free search worker"
+        self.percent = 0
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: List[Tuple[str, Dict]] = []  # (event name, payload) in publish order
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def _publish(self, event: str, data: Dict):
+        """Append an event and wake stream readers. Caller holds self._lock."""
+        self.events.append((event, data))
+        self._changed.notify_all()
+
+    def update(self, stage: str, percent: int):
+        """Progress callback handed to the search pipeline"""
+        with self._lock:
+            self.stage = stage
+            self.percent = max(self.percent, min(100, int(percent)))
+            self._publish("progress", {"stage": self.stage, "percent": self.percent})
+
+    def publish(self, event: str, data: Dict):
+        """Send an event (e.g. provisional results) to anyone streaming this job"""
+        with self._lock:
+            self._publish(event, data)
+
+    def wait_for_events(self, start: int, timeout: float) -> Tuple[List[Tuple[str, Dict]], bool]:
+        """
+        Block until there are events after index start, the job finishes, or timeout passes.
+
+        Returns:
+            Tuple of (events[start:], finished)
+        """
+        with self._lock:
+            self._changed.wait_for(
+                lambda: len(self.events) > start or self.finished_at is not None, timeout)
+            return self.events[start:], self.finished_at is not None
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "query": self.query,
+                "status": self.status,
+                "stage": self.stage,
+                "percent": self.percent,
+                "error": self.error,
+                "elapsed": round((self.finished_at or time.time()) - self.created_at, 2)
+            }
+
+class SearchJobQueue:
+    """Bounded worker pool running search jobs in the background"""
+
+    def __init__(self, workers: int = SEARCH_WORKERS, max_pending: int = MAX_PENDING_JOBS):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search-job")
+        self._jobs: Dict[str, SearchJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, query: str, task: Callable[[SearchJob], Any]) -> SearchJob:
+        """
+        Queue task(job) and return the job immediately.
+
+        Raises:
+            QueueFullError: if max_pending jobs are already queued or running
+        """
+        job = SearchJob(query)
+        with self._lock:
+            self._prune()
+            active = sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+            if active >= self.max_pending:
+                raise QueueFullError(f"{active} searches already in progress")
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, task)
+        return job
+
+    def get(self, job_id: str) -> Optional[SearchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: SearchJob, task: Callable[[SearchJob], Any]):
+        with job._lock:
+            job.status = "running"
+        try:
+            result = task(job)
+            with job._lock:
+                job.result = result
+                job.status = "done"
+                job.stage = "Done"
+                job.percent = 100
+                job._publish("done", {"stage": job.stage, "percent": job.percent})
+                job.finished_at = time.time()
+        except Exception as e:
+            traceback.print_exc()
+            with job._lock:
+                job.status = "error"
+                job.error = str(e)
+                job._publish("failed", {"message": f"Search failed: {job.error}"})
+                job.finished_at = time.time()
+
+    def _prune(self):
+        """Forget finished jobs older than JOB_RETENTION. Caller holds self._lock."""
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
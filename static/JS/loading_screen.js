@@ -5,6 +5,10 @@ document.addEventListener('DOMContentLoaded', function() {
     const loadingText = document.querySelector('.loading-text');
     const loadingSpinner = document.querySelector('.loading-spinner');
     const loadingContent = document.querySelector('.loading-content');
+    const provisionalResults = document.getElementById('provisionalResults');
+    const provisionalList = document.getElementById('provisionalList');
+    
+    const POLL_INTERVAL_MS = 1000;
     
     const query = queryInput ? queryInput.value : '';
     const currentPage = currentPageInput ? parseInt(currentPageInput.value) : 1;
@@ -22,7 +26,7 @@ document.addEventListener('DOMContentLoaded', function() {
             // Update loading message
             updateLoadingMessage('Starting web scraping...');
             
-            // Start backend search task
+            // Queue backend search task
             const response = await fetch('/run-backend-task', {
                 method: 'POST',
                 headers: {
@@ -40,9 +44,12 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error(data.message || 'Failed to start search');
             }
 
-            if (data.status === 'success') {
-                // Redirect to results page when ready
-                window.location.href = data.redirect_url;
+            if (data.status === 'queued') {
+                if (data.stream_url && window.EventSource) {
+                    streamSearch(data.stream_url, data.status_url);
+                } else {
+                    pollSearchStatus(data.status_url);
+                }
             } else {
                 throw new Error(data.message || 'Search failed');
             }
@@ -52,6 +59,89 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Follow progress and provisional results pushed by the server; poll if the stream drops
+    function streamSearch(streamUrl, statusUrl) {
+        const source = new EventSource(streamUrl);
+        let closed = false;
+
+        function stop() {
+            closed = true;
+            source.close();
+        }
+
+        source.addEventListener('progress', (event) => {
+            const data = JSON.parse(event.data);
+            updateLoadingMessage(`${data.stage} (${data.percent}%)`);
+        });
+
+        source.addEventListener('results', (event) => {
+            renderProvisionalResults(JSON.parse(event.data).results);
+        });
+
+        source.addEventListener('done', () => {
+            stop();
+            // The status call stores the results in the session and gives the redirect
+            pollSearchStatus(statusUrl);
+        });
+
+        source.addEventListener('failed', (event) => {
+            stop();
+            showError(JSON.parse(event.data).message);
+        });
+
+        source.onerror = () => {
+            if (!closed) {
+                stop();
+                pollSearchStatus(statusUrl);
+            }
+        };
+    }
+
+    function renderProvisionalResults(results) {
+        if (!provisionalResults || !provisionalList || !results || !results.length) {
+            return;
+        }
+
+        provisionalList.replaceChildren(...results.map((result) => {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = result.url;
+            link.target = '_blank';
+            link.rel = 'noopener';
+            link.textContent = result.title || result.url;
+            const meta = document.createElement('span');
+            meta.className = 'provisional-meta';
+            meta.textContent = `${result.domain} · ${result.total_occurrences} matches`;
+            item.append(link, meta);
+            return item;
+        }));
+        provisionalResults.hidden = false;
+    }
+
+    // Poll the job status until the search finishes or fails
+    async function pollSearchStatus(statusUrl) {
+        try {
+            const response = await fetch(statusUrl);
+            const data = await response.json();
+
+            if (!response.ok || data.status === 'error') {
+                throw new Error(data.message || 'Search failed');
+            }
+
+            if (data.status === 'done') {
+                // Redirect to results page when ready
+                window.location.href = data.redirect_url;
+                return;
+            }
+
+            updateLoadingMessage(`${data.stage} (${data.percent}%)`);
+            setTimeout(() => pollSearchStatus(statusUrl), POLL_INTERVAL_MS);
+        } catch (error) {
+            console.error('Search error:', error);
+            showError(error.message);
+        }
+    }
+
     function updateLoadingMessage(message) {
         if (loadingText) {
             loadingText.textContent = message;
@@ -79,9 +169,4 @@ document.addEventListener('DOMContentLoaded', function() {
             loadingContent.appendChild(retryButton);
         }
     }
-
-    // Optional: Add progress simulation if search takes too long
-    setTimeout(() => {
-        updateLoadingMessage('Still working... this might take a moment');
-    }, 5000);
 });
\ No newline at end of file